@@ -1,798 +1,954 @@
-import sys
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
-                           QHBoxLayout, QGridLayout, QLabel, QLineEdit, QPushButton,
-                           QComboBox, QTableWidget, QTableWidgetItem, QTabWidget,
-                           QGroupBox, QMessageBox, QFileDialog, QHeaderView,
-                           QScrollArea, QFrame, QSplitter, QCheckBox) # Added QCheckBox
-from PyQt5.QtCore import Qt, QDate, pyqtSignal
-from PyQt5.QtGui import QFont, QPalette, QColor, QPixmap, QIcon
-import pandas as pd
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import numpy as np
-from dateutil.relativedelta import relativedelta
-import matplotlib
-matplotlib.use('Qt5Agg')
-
-class ModernButton(QPushButton):
-    def __init__(self, text, color="#2196F3"):
-        super().__init__(text)
-        self.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {color};
-                color: white;
-                border: none;
-                padding: 10px 20px;
-                border-radius: 5px;
-                font-weight: bold;
-                font-size: 11px;
-            }}
-            QPushButton:hover {{
-                background-color: {self.darken_color(color)};
-            }}
-            QPushButton:pressed {{
-                background-color: {self.darken_color(color, 0.3)};
-            }}
-        """)
-
-    def darken_color(self, color, factor=0.2):
-        # Simple color darkening
-        if color == "#2196F3":
-            return "#1976D2"
-        elif color == "#4CAF50":
-            return "#388E3C"
-        elif color == "#FF9800":
-            return "#F57C00"
-        return color
-
-class MatplotlibWidget(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.figure = Figure(facecolor='white')
-        self.canvas = FigureCanvas(self.figure)
-        layout = QVBoxLayout()
-        layout.addWidget(self.canvas)
-        self.setLayout(layout)
-
-class SWPCalculator(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.results_data = []
-        self.init_ui()
-        self.set_default_values()
-        self.apply_styles()
-
-    def init_ui(self):
-        self.setWindowTitle(" SWP Calculator")
-        self.setGeometry(100, 100, 1400, 900)
-
-        # Central widget
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-
-        # Main layout
-        main_layout = QHBoxLayout(central_widget)
-
-        # Create splitter for resizable panels
-        splitter = QSplitter(Qt.Horizontal)
-        main_layout.addWidget(splitter)
-
-        # Left panel - Input parameters
-        self.create_input_panel(splitter)
-
-        # Right panel - Results and charts
-        self.create_results_panel(splitter)
-
-        # Set splitter proportions
-        splitter.setSizes([450, 950])
-
-    def create_input_panel(self, parent):
-        # Input panel widget
-        input_widget = QWidget()
-        input_layout = QVBoxLayout(input_widget)
-
-        # Title
-        title_label = QLabel("Investment Parameters")
-        title_label.setFont(QFont("Arial", 16, QFont.Bold))
-        title_label.setAlignment(Qt.AlignCenter)
-        input_layout.addWidget(title_label)
-
-        # Scroll area for inputs
-        scroll_area = QScrollArea()
-        scroll_widget = QWidget()
-        scroll_layout = QVBoxLayout(scroll_widget)
-
-        # Input group box
-        input_group = QGroupBox("Core Parameters")
-        input_group_layout = QGridLayout(input_group)
-
-        # Input fields for core parameters
-        self.input_fields = {}
-        core_fields_config = [
-            ("Initial Investment Amount (₹):", 'initial_amount', "line_edit"),
-            ("Investment Date (DD/MM/YYYY):", 'investment_date', "line_edit"),
-            ("SWP Amount (₹):", 'swp_amount', "line_edit"),
-            ("SWP Start Date (DD/MM/YYYY):", 'swp_start_date', "line_edit"),
-            ("SWP End Date (DD/MM/YYYY):", 'swp_end_date', "line_edit"),
-            ("Expected Annual Return (%):", 'annual_return', "line_edit"),
-            ("SWP Frequency:", 'frequency', "combo_box")
-        ]
-
-        for i, (label_text, field_name, field_type) in enumerate(core_fields_config):
-            label = QLabel(label_text)
-            label.setFont(QFont("Arial", 12)) # Larger font
-            input_group_layout.addWidget(label, i, 0, Qt.AlignRight)
-
-            if field_type == "line_edit":
-                field = QLineEdit()
-                field.setPlaceholderText("Enter value...")
-            elif field_type == "combo_box":
-                field = QComboBox()
-                field.addItems(["Monthly", "Quarterly", "Half-Yearly", "Yearly"])
-
-            field.setMinimumHeight(35) # Slightly larger height
-            input_group_layout.addWidget(field, i, 1)
-            self.input_fields[field_name] = field
-
-        scroll_layout.addWidget(input_group)
-
-        # Additional Parameters Checkbox
-        self.additional_params_checkbox = QCheckBox("Show Additional Parameters")
-        self.additional_params_checkbox.setFont(QFont("Arial", 11, QFont.Bold))
-        self.additional_params_checkbox.setChecked(False) # Default to unchecked
-        self.additional_params_checkbox.toggled.connect(self.toggle_additional_parameters)
-        scroll_layout.addWidget(self.additional_params_checkbox)
-
-        # Additional parameters group box
-        self.additional_params_group = QGroupBox("Additional Parameters")
-        self.additional_params_group_layout = QGridLayout(self.additional_params_group)
-        self.additional_params_group.setVisible(False) # Hidden by default
-
-        self.additional_input_fields = {} # Separate dictionary for additional fields
-        additional_fields_config = [
-            ("Expense Ratio (%):", 'expense_ratio', "line_edit"),
-            ("Exit Load (%):", 'exit_load', "line_edit"),
-            ("Inflation Rate (%):", 'inflation_rate', "line_edit"),
-            ("Tax Rate on Gains (%):", 'tax_rate', "line_edit")
-        ]
-
-        for i, (label_text, field_name, field_type) in enumerate(additional_fields_config):
-            label = QLabel(label_text)
-            label.setFont(QFont("Arial", 12)) # Larger font
-            self.additional_params_group_layout.addWidget(label, i, 0, Qt.AlignRight)
-
-            field = QLineEdit()
-            field.setPlaceholderText("Enter value...")
-            field.setMinimumHeight(35) # Slightly larger height
-            self.additional_params_group_layout.addWidget(field, i, 1)
-            self.additional_input_fields[field_name] = field
-
-        scroll_layout.addWidget(self.additional_params_group)
-
-        # Buttons
-        button_layout = QHBoxLayout()
-
-        self.calc_button = ModernButton("Calculate SWP", "#2196F3")
-        self.calc_button.clicked.connect(self.calculate_swp)
-        button_layout.addWidget(self.calc_button)
-
-        self.export_button = ModernButton("Export to Excel", "#4CAF50")
-        self.export_button.clicked.connect(self.export_to_excel)
-        button_layout.addWidget(self.export_button)
-
-        self.reset_button = ModernButton("Reset", "#FF9800")
-        self.reset_button.clicked.connect(self.reset_fields)
-        button_layout.addWidget(self.reset_button)
-
-        scroll_layout.addLayout(button_layout)
-        scroll_layout.addStretch()
-
-        scroll_area.setWidget(scroll_widget)
-        scroll_area.setWidgetResizable(True)
-        input_layout.addWidget(scroll_area)
-
-        parent.addWidget(input_widget)
-
-    def toggle_additional_parameters(self, checked):
-        self.additional_params_group.setVisible(checked)
-
-    def create_results_panel(self, parent):
-        # Results panel widget
-        results_widget = QWidget()
-        results_layout = QVBoxLayout(results_widget)
-
-        # Title
-        title_label = QLabel("Analysis Results")
-        title_label.setFont(QFont("Arial", 16, QFont.Bold))
-        title_label.setAlignment(Qt.AlignCenter)
-        results_layout.addWidget(title_label)
-
-        # Summary panel
-        self.create_summary_panel(results_layout)
-
-        # Tab widget for results
-        self.tab_widget = QTabWidget()
-        results_layout.addWidget(self.tab_widget)
-
-        # Table tab
-        self.create_table_tab()
-
-        # Chart tab
-        self.create_chart_tab()
-
-        parent.addWidget(results_widget)
-
-    def create_summary_panel(self, parent_layout):
-        summary_group = QGroupBox("Summary")
-        summary_layout = QGridLayout(summary_group)
-
-        # Summary labels
-        self.summary_labels = {}
-        summary_fields = [
-            ("Total Amount Withdrawn:", 'total_withdrawn'),
-            ("Remaining Corpus:", 'remaining_corpus'),
-            ("Months Sustainable:", 'months_sustainable'),
-            ("Final Portfolio Value:", 'final_value')
-        ]
-
-        for i, (label_text, field_name) in enumerate(summary_fields):
-            label = QLabel(label_text)
-            label.setFont(QFont("Arial", 10, QFont.Bold))
-            value_label = QLabel("₹0")
-            value_label.setFont(QFont("Arial", 10, QFont.Bold))
-            value_label.setStyleSheet("color: #2196F3;")
-
-            row = i // 2
-            col = (i % 2) * 2
-
-            summary_layout.addWidget(label, row, col)
-            summary_layout.addWidget(value_label, row, col + 1)
-
-            self.summary_labels[field_name] = value_label
-
-        parent_layout.addWidget(summary_group)
-
-    def create_table_tab(self):
-        # Table widget
-        self.table_widget = QTableWidget()
-
-        # Set up columns
-        columns = ['Month', 'Date', 'Opening Balance', 'Growth', 'SWP Amount',
-                  'Tax', 'Closing Balance', 'Real Value']
-        self.table_widget.setColumnCount(len(columns))
-        self.table_widget.setHorizontalHeaderLabels(columns)
-
-        # Configure table appearance
-        header = self.table_widget.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.Stretch)
-        self.table_widget.setAlternatingRowColors(True)
-        self.table_widget.setSelectionBehavior(QTableWidget.SelectRows)
-
-        self.tab_widget.addTab(self.table_widget, "Monthly Analysis")
-
-    def create_chart_tab(self):
-        # Chart widget
-        self.chart_widget = MatplotlibWidget()
-        self.tab_widget.addTab(self.chart_widget, "Graphical Analysis")
-
-    def set_default_values(self):
-        """Set default values"""
-        defaults = {
-            'initial_amount': '10000000',  # 1 crore
-            'investment_date': '01/06/2025',
-            'swp_amount': '75000',
-            'swp_start_date': '01/07/2025',
-            'swp_end_date': '22/05/2035',
-            'annual_return': '15.0',
-            'frequency': 'Monthly'
-        }
-
-        additional_defaults = {
-            'expense_ratio': '0.0',
-            'exit_load': '0.0',
-            'inflation_rate': '0.0',
-            'tax_rate': '0.0'
-        }
-
-        for field_name, value in defaults.items():
-            if isinstance(self.input_fields[field_name], QLineEdit):
-                self.input_fields[field_name].setText(value)
-            elif isinstance(self.input_fields[field_name], QComboBox):
-                self.input_fields[field_name].setCurrentText(value)
-
-        for field_name, value in additional_defaults.items():
-            if field_name in self.additional_input_fields:
-                self.additional_input_fields[field_name].setText(value)
-
-
-    def get_input_values(self):
-        """Get values from input fields"""
-        values = {}
-        for field_name, field_widget in self.input_fields.items():
-            if isinstance(field_widget, QLineEdit):
-                text = field_widget.text().strip()
-                if field_name in ['initial_amount', 'swp_amount', 'annual_return']:
-                    values[field_name] = float(text) if text else 0.0
-                else:
-                    values[field_name] = text
-            elif isinstance(field_widget, QComboBox):
-                values[field_name] = field_widget.currentText()
-
-        # Get values from additional input fields
-        for field_name, field_widget in self.additional_input_fields.items():
-            text = field_widget.text().strip()
-            values[field_name] = float(text) if text else 0.0 # These are always numeric
-
-        return values
-
-    def calculate_swp(self):
-        try:
-            # Get input values
-            inputs = self.get_input_values()
-
-            initial_amount = inputs['initial_amount']
-            investment_date = datetime.strptime(inputs['investment_date'], "%d/%m/%Y")
-            swp_amount = inputs['swp_amount']
-            swp_start_date = datetime.strptime(inputs['swp_start_date'], "%d/%m/%Y")
-            swp_end_date = datetime.strptime(inputs['swp_end_date'], "%d/%m/%Y")
-            annual_return = inputs['annual_return'] / 100
-            expense_ratio = inputs.get('expense_ratio', 0.0) / 100 # Use .get() with default
-            exit_load = inputs.get('exit_load', 0.0) / 100 # Use .get() with default
-            inflation_rate = inputs.get('inflation_rate', 0.0) / 100 # Use .get() with default
-            tax_rate = inputs.get('tax_rate', 0.0) / 100 # Use .get() with default
-            frequency = inputs['frequency']
-
-            # Calculate frequency factor
-            freq_map = {"Monthly": 12, "Quarterly": 4, "Half-Yearly": 2, "Yearly": 1}
-            freq_factor = freq_map[frequency]
-
-            # Calculate monthly return (net of expense ratio)
-            monthly_return = ((1 + annual_return - expense_ratio) ** (1/12)) - 1
-            monthly_inflation = ((1 + inflation_rate) ** (1/12)) - 1
-
-            # Initialize variables
-            current_balance = initial_amount
-            current_date = swp_start_date
-            results = []
-            month_counter = 0
-            total_withdrawn = 0
-            initial_investment_remaining = initial_amount # For capital gain calculation
-
-            # Calculate SWP month by month
-            while current_date <= swp_end_date and current_balance > 0:
-                month_counter += 1
-
-                # Calculate opening balance
-                opening_balance = current_balance
-
-                # Apply monthly growth
-                growth = opening_balance * monthly_return
-                balance_after_growth = opening_balance + growth
-
-                swp_withdrawal_this_month = 0
-                tax_amount_this_month = 0
-                exit_load_amount_this_month = 0
-
-                # Calculate SWP withdrawal (adjust for frequency)
-                if month_counter % (12 // freq_factor) == 0: # Corrected logic for first withdrawal and subsequent
-                    # Calculate actual SWP amount for the period
-                    swp_period_amount = swp_amount
-                    
-                    # Ensure we don't withdraw more than available balance
-                    actual_swp_to_withdraw = min(swp_period_amount, balance_after_growth)
-
-                    # Determine capital gain portion
-                    # This is a simplified calculation and might need refinement for precise tax implications
-                    # For a more accurate gain, you'd track unit cost
-                    # Here, we assume gain is pro-rata from total capital vs. total investment
-                    if initial_investment_remaining > 0:
-                         capital_gain_ratio = (balance_after_growth - initial_investment_remaining) / balance_after_growth if balance_after_growth > 0 else 0
-                         capital_gain = actual_swp_to_withdraw * capital_gain_ratio
-                    else:
-                         capital_gain = actual_swp_to_withdraw # If initial investment is depleted, all is gain
-
-
-                    tax_amount_this_month = capital_gain * tax_rate
-
-                    # Apply exit load if applicable (simplified: for first year from investment_date)
-                    if (current_date - investment_date).days < 365:
-                        exit_load_amount_this_month = actual_swp_to_withdraw * exit_load
-
-                    final_withdrawal_deductions = actual_swp_to_withdraw + tax_amount_this_month + exit_load_amount_this_month
-
-                    # Ensure we don't withdraw more than available balance (after accounting for tax/load)
-                    if balance_after_growth >= final_withdrawal_deductions:
-                        current_balance = balance_after_growth - final_withdrawal_deductions
-                        swp_withdrawal_this_month = actual_swp_to_withdraw
-                    else:
-                        swp_withdrawal_this_month = balance_after_growth / (1 + tax_rate + exit_load) # Withdraw as much as possible net of charges
-                        tax_amount_this_month = swp_withdrawal_this_month * tax_rate
-                        exit_load_amount_this_month = swp_withdrawal_this_month * exit_load
-                        current_balance = 0 # Portfolio depleted
-                    
-                    total_withdrawn += swp_withdrawal_this_month
-                    initial_investment_remaining -= swp_withdrawal_this_month # Reduce initial investment part
-
-                else:
-                    # No SWP withdrawal this month, only growth
-                    current_balance = balance_after_growth
-
-                # Calculate real value (inflation adjusted)
-                months_from_start = ((current_date.year - swp_start_date.year) * 12 +
-                                   current_date.month - swp_start_date.month)
-                
-                # Handle division by zero for inflation adjustment if months_from_start is negative or zero
-                if months_from_start >= 0:
-                    real_value = current_balance / ((1 + monthly_inflation) ** months_from_start)
-                else:
-                    real_value = current_balance # No inflation adjustment if before start date
-
-                # Store results
-                results.append({
-                    'Month': month_counter,
-                    'Date': current_date.strftime("%d/%m/%Y"),
-                    'Opening Balance': opening_balance,
-                    'Growth': growth,
-                    'SWP Amount': swp_withdrawal_this_month,
-                    'Tax': tax_amount_this_month,
-                    'Closing Balance': current_balance,
-                    'Real Value': real_value
-                })
-
-                # Move to next month
-                current_date += relativedelta(months=1)
-
-                # Break if balance becomes too low and SWP is due
-                if current_balance < swp_amount * 0.1 and month_counter % (12 // freq_factor) == 0:
-                    break
-
-            self.results_data = results
-            self.update_display(results, total_withdrawn, current_balance, month_counter)
-
-        except ValueError as e:
-            QMessageBox.critical(self, "Error", f"Please check your input values: {str(e)}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
-
-    def update_display(self, results, total_withdrawn, remaining_corpus, months_sustainable):
-        # Update summary
-        self.summary_labels['total_withdrawn'].setText(f"₹{total_withdrawn:,.2f}")
-        self.summary_labels['remaining_corpus'].setText(f"₹{remaining_corpus:,.2f}")
-        self.summary_labels['months_sustainable'].setText(f"{months_sustainable} months")
-        self.summary_labels['final_value'].setText(f"₹{remaining_corpus:,.2f}")
-
-        # Update table
-        self.table_widget.setRowCount(len(results))
-
-        for i, result in enumerate(results):
-            items = [
-                str(result['Month']),
-                result['Date'],
-                f"₹{result['Opening Balance']:,.2f}",
-                f"₹{result['Growth']:,.2f}",
-                f"₹{result['SWP Amount']:,.2f}",
-                f"₹{result['Tax']:,.2f}",
-                f"₹{result['Closing Balance']:,.2f}",
-                f"₹{result['Real Value']:,.2f}"
-            ]
-
-            for j, item in enumerate(items):
-                table_item = QTableWidgetItem(item)
-                table_item.setTextAlignment(Qt.AlignCenter)
-                self.table_widget.setItem(i, j, table_item)
-
-        # Update chart
-        self.update_chart(results)
-
-    def update_chart(self, results):
-        if not results:
-            self.chart_widget.figure.clear()
-            self.chart_widget.canvas.draw()
-            return
-
-        # Calculate total withdrawn from results
-        total_withdrawn = sum(r['SWP Amount'] for r in results)
-
-        # Clear existing chart
-        self.chart_widget.figure.clear()
-
-        # Create subplots with dynamic sizing/layout
-        fig = self.chart_widget.figure
-        gs = fig.add_gridspec(2, 2, wspace=0.3, hspace=0.4) # Adjust wspace and hspace
-        
-        ax00 = fig.add_subplot(gs[0, 0])
-        ax01 = fig.add_subplot(gs[0, 1])
-        ax10 = fig.add_subplot(gs[1, 0])
-        ax11 = fig.add_subplot(gs[1, 1])
-
-        fig.suptitle('SWP Analysis Charts', fontsize=16, fontweight='bold')
-
-        months = [r['Month'] for r in results]
-        closing_balance = [r['Closing Balance'] for r in results]
-        real_value = [r['Real Value'] for r in results]
-        swp_amounts = [r['SWP Amount'] for r in results]
-        cumulative_withdrawn = np.cumsum(swp_amounts)
-
-        # Chart 1: Portfolio Value Over Time
-        ax00.plot(months, closing_balance, 'b-', linewidth=2, label='Nominal Value')
-        ax00.plot(months, real_value, 'r--', linewidth=2, label='Real Value')
-        ax00.set_title('Portfolio Value Over Time')
-        ax00.set_xlabel('Months')
-        ax00.set_ylabel('Amount (₹)')
-        ax00.legend()
-        ax00.grid(True, alpha=0.3)
-        ax00.ticklabel_format(style='plain', axis='y')
-
-        # Chart 2: Cumulative Withdrawal
-        ax01.plot(months, cumulative_withdrawn, 'g-', linewidth=2)
-        ax01.set_title('Cumulative Withdrawals')
-        ax01.set_xlabel('Months')
-        ax01.set_ylabel('Amount (₹)')
-        ax01.grid(True, alpha=0.3)
-        ax01.ticklabel_format(style='plain', axis='y')
-
-        # Chart 3: Monthly SWP Amounts (Bar Chart)
-        # Using a step for bars if there are too many months for clarity
-        step = max(1, len(months) // 20)
-        ax10.bar(months[::step], [swp_amounts[i] for i in range(0, len(swp_amounts), step)],
-                       color='orange', alpha=0.7)
-        ax10.set_title(f'Monthly SWP Withdrawals (Every {step} Months)')
-        ax10.set_xlabel('Months')
-        ax10.set_ylabel('SWP Amount (₹)')
-        ax10.grid(True, alpha=0.3)
-        ax10.ticklabel_format(style='plain', axis='y')
-
-        # Chart 4: Portfolio Depletion Rate (Pie Chart - Final State) or Line Chart
-        # Let's make this a pie chart showing initial vs. withdrawn vs. remaining if the period ends
-        # If the portfolio is still active, maybe a line chart of depletion %
-        
-        final_balance = closing_balance[-1] if closing_balance else 0
-        initial_investment = self.get_input_values()['initial_amount']
-        
-        if initial_investment > 0 and (total_withdrawn + final_balance) > 0:
-            # Pie Chart: Distribution of Initial Investment
-            labels = ['Total Withdrawn', 'Remaining Corpus']
-            sizes = [total_withdrawn, final_balance]
-            
-            # Filter out zero values to prevent issues with pie chart
-            non_zero_sizes = [s for s in sizes if s > 0]
-            non_zero_labels = [labels[i] for i, s in enumerate(sizes) if s > 0]
-
-            if non_zero_sizes: # Only plot if there's data to show
-                ax11.pie(non_zero_sizes, labels=non_zero_labels, autopct='%1.1f%%', startangle=90, colors=['#FFC107', '#4CAF50'])
-                ax11.set_title('Investment Outcome Distribution')
-                ax11.axis('equal') # Equal aspect ratio ensures that pie is drawn as a circle.
-            else:
-                ax11.text(0.5, 0.5, "No data for pie chart", horizontalalignment='center', verticalalignment='center', transform=ax11.transAxes)
-                ax11.set_title('Investment Outcome Distribution')
-        else:
-            # Fallback to Depletion Rate Line Chart if no meaningful pie chart
-            if closing_balance and closing_balance[0] > 0:
-                depletion_rate = [(closing_balance[0] - cb) / closing_balance[0] * 100
-                                 for cb in closing_balance]
-                ax11.plot(months, depletion_rate, 'm-', linewidth=2)
-                ax11.set_title('Portfolio Depletion Rate')
-                ax11.set_xlabel('Months')
-                ax11.set_ylabel('Depletion %')
-                ax11.grid(True, alpha=0.3)
-            else:
-                ax11.text(0.5, 0.5, "Insufficient data for chart", horizontalalignment='center', verticalalignment='center', transform=ax11.transAxes)
-                ax11.set_title('Portfolio Depletion Rate')
-
-
-        plt.tight_layout() # Adjust subplot parameters for a tight layout
-        self.chart_widget.canvas.draw()
-
-    def export_to_excel(self):
-        if not self.results_data:
-            QMessageBox.warning(self, "Warning", "Please calculate SWP first!")
-            return
-
-        try:
-            # Get file path from user
-            file_path, _ = QFileDialog.getSaveFileName(
-                self, "Save SWP Analysis", "swp_analysis.xlsx",
-                "Excel files (*.xlsx);;All files (*.*)"
-            )
-
-            if not file_path:
-                return
-
-            # Create DataFrame
-            df = pd.DataFrame(self.results_data)
-
-            # Get input values for summary
-            inputs = self.get_input_values()
-
-            # Create Excel file with multiple sheets
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                # Main analysis sheet
-                df.to_excel(writer, sheet_name='SWP Analysis', index=False)
-                
-                # Auto-adjust column width for SWP Analysis sheet
-                worksheet_analysis = writer.sheets['SWP Analysis']
-                for column in worksheet_analysis.columns:
-                    max_length = 0
-                    column_name = column[0].column_letter # Get the column name (e.g., 'A', 'B')
-                    for cell in column:
-                        try: # Necessary to avoid error on empty cells
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = (max_length + 2) # Add a little padding
-                    worksheet_analysis.column_dimensions[column_name].width = adjusted_width
-
-                # Summary sheet
-                summary_data = {
-                    'Parameter': ['Initial Investment', 'Total Withdrawn', 'Remaining Corpus',
-                                'Months Sustainable', 'Expected Annual Return', 'SWP Amount',
-                                'Expense Ratio', 'Exit Load', 'Inflation Rate', 'Tax Rate'],
-                    'Value': [
-                        f"₹{inputs['initial_amount']:,.2f}",
-                        self.summary_labels['total_withdrawn'].text(),
-                        self.summary_labels['remaining_corpus'].text(),
-                        self.summary_labels['months_sustainable'].text(),
-                        f"{inputs['annual_return']}%",
-                        f"₹{inputs['swp_amount']:,.2f}",
-                        f"{inputs.get('expense_ratio', 0.0)}%",
-                        f"{inputs.get('exit_load', 0.0)}%",
-                        f"{inputs.get('inflation_rate', 0.0)}%",
-                        f"{inputs.get('tax_rate', 0.0)}%"
-                    ]
-                }
-                summary_df = pd.DataFrame(summary_data)
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
-
-                # Auto-adjust column width for Summary sheet
-                worksheet_summary = writer.sheets['Summary']
-                for column in worksheet_summary.columns:
-                    max_length = 0
-                    column_name = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = (max_length + 2)
-                    worksheet_summary.column_dimensions[column_name].width = adjusted_width
-
-
-                # Input parameters sheet
-                params_data = {
-                    'Parameter': list(inputs.keys()),
-                    'Value': list(inputs.values())
-                }
-                params_df = pd.DataFrame(params_data)
-                params_df.to_excel(writer, sheet_name='Input Parameters', index=False)
-
-                # Auto-adjust column width for Input Parameters sheet
-                worksheet_params = writer.sheets['Input Parameters']
-                for column in worksheet_params.columns:
-                    max_length = 0
-                    column_name = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = (max_length + 2)
-                    worksheet_params.column_dimensions[column_name].width = adjusted_width
-
-            QMessageBox.information(self, "Success",
-                                  f"SWP analysis exported successfully to:\n{file_path}")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to export to Excel: {str(e)}")
-
-    def reset_fields(self):
-        """Reset all fields to default values"""
-        self.set_default_values()
-
-        # Clear table
-        self.table_widget.setRowCount(0)
-
-        # Clear chart
-        self.chart_widget.figure.clear()
-        self.chart_widget.canvas.draw()
-
-        # Reset summary
-        for label in self.summary_labels.values():
-            if "₹" in label.text():
-                label.setText("₹0")
-            else:
-                label.setText("0")
-
-        self.results_data = []
-        self.additional_params_checkbox.setChecked(False) # Reset checkbox
-
-    def apply_styles(self):
-        """Apply modern styling to the application"""
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #f5f5f5;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #cccccc;
-                border-radius: 5px;
-                margin-top: 1ex;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-            QLineEdit {
-                border: 2px solid #ddd;
-                border-radius: 5px;
-                padding: 8px; /* Increased padding */
-                font-size: 13px; /* Larger font */
-            }
-            QLineEdit:focus {
-                border-color: #2196F3;
-            }
-            QComboBox {
-                border: 2px solid #ddd;
-                border-radius: 5px;
-                padding: 8px; /* Increased padding */
-                font-size: 13px; /* Larger font */
-            }
-            QComboBox:focus {
-                border-color: #2196F3;
-            }
-            QLabel {
-                font-size: 13px; /* Larger font for labels */
-            }
-            QCheckBox {
-                font-size: 13px; /* Larger font for checkbox */
-                padding: 5px 0;
-            }
-            QTableWidget {
-                border: 1px solid #ddd;
-                border-radius: 5px;
-                background-color: white;
-                alternate-background-color: #f9f9f9;
-                font-size: 12px; /* Slightly larger table font */
-            }
-            QTableWidget::item {
-                padding: 8px;
-            }
-            QTabWidget::pane {
-                border: 1px solid #ddd;
-                border-radius: 5px;
-            }
-            QTabBar::tab {
-                background-color: #e1e1e1;
-                padding: 8px 16px;
-                margin-right: 2px;
-                border-top-left-radius: 5px;
-                border-top-right-radius: 5px;
-                font-size: 12px; /* Larger tab font */
-            }
-            QTabBar::tab:selected {
-                background-color: #2196F3;
-                color: white;
-            }
-        """)
-
-def main():
-    app = QApplication(sys.argv)
-    app.setApplicationName("SWP Calculator")
-
-    app.setStyle("Fusion")  # Use Fusion style for a modern look
-    app.setPalette(QPalette(QColor(240, 240, 240)))  # Set a light background color
-    app.setWindowIcon(QIcon('logo.png'))
-
-    calculator = SWPCalculator()
-    calculator.show()
-
-    sys.exit(app.exec_())
-
-if __name__ == "__main__":
+import argparse
+import os
+import sys
+import math
+import threading
+from contextlib import nullcontext
+from functools import partial
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
+                           QHBoxLayout, QGridLayout, QLabel, QLineEdit, QPushButton,
+                           QComboBox, QTableView, QTabWidget,
+                           QGroupBox, QMessageBox, QFileDialog, QHeaderView,
+                           QScrollArea, QFrame, QSplitter, QCheckBox, # Added QCheckBox
+                           QInputDialog, QProgressBar, QShortcut)
+from PyQt5.QtCore import Qt, QDate, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont, QPalette, QColor, QPixmap, QIcon, QKeySequence
+
+# Results of previous calculations are kept here between sessions
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".swp_calculator", "projection_cache.npz")
+
+# Quiet period after the last keystroke before a live recalculation starts
+LIVE_UPDATE_DELAY_MS = 150
+
+from swp_cache import ProjectionCache
+from swp_engine import DATE_CONVENTIONS, WITHDRAWAL_POLICIES, SWPInputs, SWPResult, parse_field, project
+from swp_devpanel import DeveloperPanel
+from swp_export import FORMATS, export_analysis
+from swp_incremental import IncrementalProjector
+from swp_metrics import MetricsRecorder
+from swp_montecarlo import MonteCarloResult, MonteCarloSettings, run_monte_carlo
+from swp_solver import solve_max_withdrawal, solve_min_corpus, solve_required_return
+from swp_table_model import ResultsTableModel
+from swp_worker import JobRunner
+
+class ModernButton(QPushButton):
+    def __init__(self, text, color="#2196F3"):
+        super().__init__(text)
+        self.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {color};
+                color: white;
+                border: none;
+                padding: 10px 20px;
+                border-radius: 5px;
+                font-weight: bold;
+                font-size: 11px;
+            }}
+            QPushButton:hover {{
+                background-color: {self.darken_color(color)};
+            }}
+            QPushButton:pressed {{
+                background-color: {self.darken_color(color, 0.3)};
+            }}
+        """)
+
+    def darken_color(self, color, factor=0.2):
+        # Simple color darkening
+        if color == "#2196F3":
+            return "#1976D2"
+        elif color == "#4CAF50":
+            return "#388E3C"
+        elif color == "#FF9800":
+            return "#F57C00"
+        elif color == "#9C27B0":
+            return "#7B1FA2"
+        return color
+
+class MatplotlibWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # matplotlib takes longer to import than the rest of the app put together,
+        # so it is only loaded once a chart is actually shown
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(facecolor='white')
+        self.canvas = FigureCanvas(self.figure)
+        layout = QVBoxLayout()
+        layout.addWidget(self.canvas)
+        self.setLayout(layout)
+
+class SWPCalculator(QMainWindow):
+    def __init__(self, trace_path=None, profile_next=False):
+        super().__init__()
+        self.result = None
+        self.monte_carlo_result = None
+        self.current_inputs = None
+        self.projection_cache = ProjectionCache(maxsize=64, path=CACHE_PATH,
+                                                types=(SWPResult, MonteCarloResult))
+        self.projector = IncrementalProjector()
+        # Each input parsed as soon as it changes, for live mode: field name -> value / error
+        self.parsed_values = {}
+        self.field_errors = {}
+        # Stage timings of calculations and exports, shown in the developer panel
+        self.metrics = MetricsRecorder(trace_path=trace_path, profile_next=profile_next)
+        self.developer_panel = None
+        self.pending_run = None
+
+        # Calculations and exports run off the GUI thread; a new request cancels the old one
+        self.calculation_runner = JobRunner(self)
+        self.calculation_runner.progress.connect(self.show_progress)
+        self.calculation_runner.finished.connect(self.on_calculation_finished)
+        self.calculation_runner.failed.connect(self.on_calculation_failed)
+        self.calculation_runner.cancelled.connect(self.on_calculation_cancelled)
+        self.export_runner = JobRunner(self)
+        self.export_runner.progress.connect(self.show_progress)
+        self.export_runner.finished.connect(self.on_export_finished)
+        self.export_runner.failed.connect(self.on_export_failed)
+
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_UPDATE_DELAY_MS)
+        self.live_timer.timeout.connect(self.run_live_calculation)
+        # Table and chart are refreshed after the summary has been painted
+        self.details_timer = QTimer(self)
+        self.details_timer.setSingleShot(True)
+        self.details_timer.setInterval(0)
+        self.details_timer.timeout.connect(self.update_details)
+        self.pending_result = None
+
+        self.init_ui()
+        self.set_default_values()
+        self.connect_input_signals()
+        self.apply_styles()
+
+    def init_ui(self):
+        self.setWindowTitle(" SWP Calculator")
+        self.setGeometry(100, 100, 1400, 900)
+
+        # Central widget
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+
+        # Main layout
+        main_layout = QHBoxLayout(central_widget)
+
+        # Create splitter for resizable panels
+        splitter = QSplitter(Qt.Horizontal)
+        main_layout.addWidget(splitter)
+
+        # Left panel - Input parameters
+        self.create_input_panel(splitter)
+
+        # Right panel - Results and charts
+        self.create_results_panel(splitter)
+
+        # Set splitter proportions
+        splitter.setSizes([450, 950])
+
+        # Progress of background calculations and exports
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.setVisible(False)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+
+        # Hidden developer panel
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self.show_developer_panel)
+
+    def connect_input_signals(self):
+        """Editing any input cancels a calculation that is still running for the old values"""
+        fields = {**self.input_fields, **self.additional_input_fields, **self.monte_carlo_fields}
+        for field_name, field in fields.items():
+            if isinstance(field, QLineEdit):
+                field.textEdited.connect(self.calculation_runner.cancel)
+                field.textChanged.connect(partial(self.on_field_changed, field_name))
+            elif isinstance(field, QComboBox):
+                field.activated.connect(self.calculation_runner.cancel)
+                field.currentTextChanged.connect(partial(self.on_field_changed, field_name))
+            self.on_field_changed(field_name, field.text() if isinstance(field, QLineEdit)
+                                  else field.currentText())
+        self.monte_carlo_checkbox.toggled.connect(self.calculation_runner.cancel)
+        self.monte_carlo_checkbox.toggled.connect(self.schedule_live_calculation)
+
+    def on_field_changed(self, field_name, text):
+        """Re-parse only the edited field and, in live mode, schedule a recalculation"""
+        field = self.input_fields.get(field_name) or self.additional_input_fields.get(field_name)
+        if field is not None:
+            try:
+                self.parsed_values[field_name] = parse_field(field_name, text)
+                self.field_errors.pop(field_name, None)
+            except ValueError as e:
+                self.field_errors[field_name] = str(e)
+            invalid = field_name in self.field_errors
+            if field.property("invalid") != invalid:
+                field.setProperty("invalid", invalid)
+                field.setToolTip(self.field_errors.get(field_name, ""))
+                # Re-apply the stylesheet so the invalid border shows
+                field.style().unpolish(field)
+                field.style().polish(field)
+        self.schedule_live_calculation()
+
+    def schedule_live_calculation(self):
+        if self.live_checkbox.isChecked():
+            self.live_timer.start()
+
+    def run_live_calculation(self):
+        """Recalculate from the already parsed fields; problems go to the status bar"""
+        if self.field_errors:
+            field_name, message = next(iter(self.field_errors.items()))
+            self.statusBar().showMessage(f"Invalid {field_name.replace('_', ' ')}: {message}")
+            return
+        run = self.metrics.start('live')
+        try:
+            with run.span('parse'):
+                inputs = SWPInputs.from_values(self.parsed_values)
+                settings = self.get_monte_carlo_settings() if self.monte_carlo_checkbox.isChecked() else None
+        except ValueError as e:
+            run.count(error=str(e))
+            self.finish_run(run)
+            self.statusBar().showMessage(f"Invalid input: {str(e)}")
+            return
+        self.start_calculation(inputs, settings, run)
+
+    def create_input_panel(self, parent):
+        # Input panel widget
+        input_widget = QWidget()
+        input_layout = QVBoxLayout(input_widget)
+
+        # Title
+        title_label = QLabel("Investment Parameters")
+        title_label.setFont(QFont("Arial", 16, QFont.Bold))
+        title_label.setAlignment(Qt.AlignCenter)
+        input_layout.addWidget(title_label)
+
+        # Scroll area for inputs
+        scroll_area = QScrollArea()
+        scroll_widget = QWidget()
+        scroll_layout = QVBoxLayout(scroll_widget)
+
+        # Input group box
+        input_group = QGroupBox("Core Parameters")
+        input_group_layout = QGridLayout(input_group)
+
+        # Input fields for core parameters
+        self.input_fields = {}
+        core_fields_config = [
+            ("Initial Investment Amount (₹):", 'initial_amount', "line_edit"),
+            ("Investment Date (DD/MM/YYYY):", 'investment_date', "line_edit"),
+            ("SWP Amount (₹):", 'swp_amount', "line_edit"),
+            ("SWP Start Date (DD/MM/YYYY):", 'swp_start_date', "line_edit"),
+            ("SWP End Date (DD/MM/YYYY):", 'swp_end_date', "line_edit"),
+            ("Expected Annual Return (%):", 'annual_return', "line_edit"),
+            ("SWP Frequency:", 'frequency', "combo_box")
+        ]
+
+        for i, (label_text, field_name, field_type) in enumerate(core_fields_config):
+            label = QLabel(label_text)
+            label.setFont(QFont("Arial", 12)) # Larger font
+            input_group_layout.addWidget(label, i, 0, Qt.AlignRight)
+
+            if field_type == "line_edit":
+                field = QLineEdit()
+                field.setPlaceholderText("Enter value...")
+            elif field_type == "combo_box":
+                field = QComboBox()
+                field.addItems(["Monthly", "Quarterly", "Half-Yearly", "Yearly"])
+
+            field.setMinimumHeight(35) # Slightly larger height
+            input_group_layout.addWidget(field, i, 1)
+            self.input_fields[field_name] = field
+
+        scroll_layout.addWidget(input_group)
+
+        # Additional Parameters Checkbox
+        self.additional_params_checkbox = QCheckBox("Show Additional Parameters")
+        self.additional_params_checkbox.setFont(QFont("Arial", 11, QFont.Bold))
+        self.additional_params_checkbox.setChecked(False) # Default to unchecked
+        self.additional_params_checkbox.toggled.connect(self.toggle_additional_parameters)
+        scroll_layout.addWidget(self.additional_params_checkbox)
+
+        # Additional parameters group box
+        self.additional_params_group = QGroupBox("Additional Parameters")
+        self.additional_params_group_layout = QGridLayout(self.additional_params_group)
+        self.additional_params_group.setVisible(False) # Hidden by default
+
+        self.additional_input_fields = {} # Separate dictionary for additional fields
+        additional_fields_config = [
+            ("Expense Ratio (%):", 'expense_ratio', "line_edit"),
+            ("Exit Load (%):", 'exit_load', "line_edit"),
+            ("Inflation Rate (%):", 'inflation_rate', "line_edit"),
+            ("Tax Rate on Gains (%):", 'tax_rate', "line_edit"),
+            ("Withdrawal Date:", 'date_convention', "combo_box"),
+            ("Withdrawal Policy:", 'withdrawal_policy', "combo_box"),
+            ("Annual Step-Up (%):", 'step_up', "line_edit"),
+            ("Percent of Corpus (% p.a.):", 'corpus_rate', "line_edit"),
+            ("Guardrail Band (%):", 'guardrail_band', "line_edit"),
+            ("Guardrail Adjustment (%):", 'guardrail_step', "line_edit")
+        ]
+        combo_items = {'date_convention': DATE_CONVENTIONS, 'withdrawal_policy': WITHDRAWAL_POLICIES}
+
+        for i, (label_text, field_name, field_type) in enumerate(additional_fields_config):
+            label = QLabel(label_text)
+            label.setFont(QFont("Arial", 12)) # Larger font
+            self.additional_params_group_layout.addWidget(label, i, 0, Qt.AlignRight)
+
+            if field_type == "line_edit":
+                field = QLineEdit()
+                field.setPlaceholderText("Enter value...")
+            elif field_type == "combo_box":
+                field = QComboBox()
+                field.addItems(combo_items[field_name])
+
+            field.setMinimumHeight(35) # Slightly larger height
+            self.additional_params_group_layout.addWidget(field, i, 1)
+            self.additional_input_fields[field_name] = field
+
+        scroll_layout.addWidget(self.additional_params_group)
+
+        # Monte Carlo Checkbox
+        self.monte_carlo_checkbox = QCheckBox("Run Monte Carlo Simulation")
+        self.monte_carlo_checkbox.setFont(QFont("Arial", 11, QFont.Bold))
+        self.monte_carlo_checkbox.setChecked(False)
+        self.monte_carlo_checkbox.toggled.connect(self.toggle_monte_carlo_parameters)
+        scroll_layout.addWidget(self.monte_carlo_checkbox)
+
+        # Monte Carlo parameters group box
+        self.monte_carlo_group = QGroupBox("Monte Carlo Parameters")
+        monte_carlo_layout = QGridLayout(self.monte_carlo_group)
+        self.monte_carlo_group.setVisible(False) # Hidden by default
+
+        self.monte_carlo_fields = {}
+        monte_carlo_fields_config = [
+            ("Return Volatility (%):", 'volatility', "line_edit"),
+            ("Number of Paths:", 'paths', "line_edit"),
+            ("Return Distribution:", 'distribution', "combo_box")
+        ]
+
+        for i, (label_text, field_name, field_type) in enumerate(monte_carlo_fields_config):
+            label = QLabel(label_text)
+            label.setFont(QFont("Arial", 12))
+            monte_carlo_layout.addWidget(label, i, 0, Qt.AlignRight)
+
+            if field_type == "line_edit":
+                field = QLineEdit()
+                field.setPlaceholderText("Enter value...")
+            elif field_type == "combo_box":
+                field = QComboBox()
+                field.addItems(["Normal", "Lognormal"])
+
+            field.setMinimumHeight(35)
+            monte_carlo_layout.addWidget(field, i, 1)
+            self.monte_carlo_fields[field_name] = field
+
+        scroll_layout.addWidget(self.monte_carlo_group)
+
+        # Live mode: recalculate shortly after every edit instead of on "Calculate SWP"
+        self.live_checkbox = QCheckBox("Recalculate As You Type")
+        self.live_checkbox.setFont(QFont("Arial", 11, QFont.Bold))
+        self.live_checkbox.setChecked(False)
+        self.live_checkbox.toggled.connect(self.schedule_live_calculation)
+        scroll_layout.addWidget(self.live_checkbox)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+
+        self.calc_button = ModernButton("Calculate SWP", "#2196F3")
+        self.calc_button.clicked.connect(self.calculate_swp)
+        button_layout.addWidget(self.calc_button)
+
+        self.solve_button = ModernButton("Solve", "#9C27B0")
+        self.solve_button.clicked.connect(self.solve_swp)
+        button_layout.addWidget(self.solve_button)
+
+        self.export_button = ModernButton("Export to Excel", "#4CAF50")
+        self.export_button.clicked.connect(self.export_to_excel)
+        button_layout.addWidget(self.export_button)
+
+        self.reset_button = ModernButton("Reset", "#FF9800")
+        self.reset_button.clicked.connect(self.reset_fields)
+        button_layout.addWidget(self.reset_button)
+
+        scroll_layout.addLayout(button_layout)
+        scroll_layout.addStretch()
+
+        scroll_area.setWidget(scroll_widget)
+        scroll_area.setWidgetResizable(True)
+        input_layout.addWidget(scroll_area)
+
+        parent.addWidget(input_widget)
+
+    def toggle_additional_parameters(self, checked):
+        self.additional_params_group.setVisible(checked)
+
+    def toggle_monte_carlo_parameters(self, checked):
+        self.monte_carlo_group.setVisible(checked)
+
+    def create_results_panel(self, parent):
+        # Results panel widget
+        results_widget = QWidget()
+        results_layout = QVBoxLayout(results_widget)
+
+        # Title
+        title_label = QLabel("Analysis Results")
+        title_label.setFont(QFont("Arial", 16, QFont.Bold))
+        title_label.setAlignment(Qt.AlignCenter)
+        results_layout.addWidget(title_label)
+
+        # Summary panel
+        self.create_summary_panel(results_layout)
+
+        # Tab widget for results
+        self.tab_widget = QTabWidget()
+        results_layout.addWidget(self.tab_widget)
+
+        # Table tab
+        self.create_table_tab()
+
+        # Chart tab
+        self.create_chart_tab()
+
+        parent.addWidget(results_widget)
+
+    def create_summary_panel(self, parent_layout):
+        summary_group = QGroupBox("Summary")
+        summary_layout = QGridLayout(summary_group)
+
+        # Summary labels
+        self.summary_labels = {}
+        summary_fields = [
+            ("Total Amount Withdrawn:", 'total_withdrawn'),
+            ("Remaining Corpus:", 'remaining_corpus'),
+            ("Months Sustainable:", 'months_sustainable'),
+            ("Final Portfolio Value:", 'final_value'),
+            ("Success Probability:", 'success_probability')
+        ]
+
+        for i, (label_text, field_name) in enumerate(summary_fields):
+            label = QLabel(label_text)
+            label.setFont(QFont("Arial", 10, QFont.Bold))
+            value_label = QLabel("₹0")
+            value_label.setFont(QFont("Arial", 10, QFont.Bold))
+            value_label.setStyleSheet("color: #2196F3;")
+
+            row = i // 2
+            col = (i % 2) * 2
+
+            summary_layout.addWidget(label, row, col)
+            summary_layout.addWidget(value_label, row, col + 1)
+
+            self.summary_labels[field_name] = value_label
+
+        parent_layout.addWidget(summary_group)
+
+    def create_table_tab(self):
+        table_tab = QWidget()
+        table_layout = QVBoxLayout(table_tab)
+
+        # Row filter
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Show:"))
+        self.table_filter_combo = QComboBox()
+        self.table_filter_combo.addItems(["All Months", "Withdrawal Months Only"])
+        self.table_filter_combo.currentIndexChanged.connect(self.apply_table_filter)
+        filter_layout.addWidget(self.table_filter_combo)
+        filter_layout.addStretch()
+        table_layout.addLayout(filter_layout)
+
+        # Table view over the columnar results; cells are formatted on demand
+        self.table_model = ResultsTableModel(self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
+
+        # Configure table appearance
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Stretch)
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table_view.setAlternatingRowColors(True)
+        self.table_view.setSelectionBehavior(QTableView.SelectRows)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.sortByColumn(0, Qt.AscendingOrder)
+        table_layout.addWidget(self.table_view)
+
+        self.tab_widget.addTab(table_tab, "Monthly Analysis")
+
+    def apply_table_filter(self):
+        if self.table_filter_combo.currentText() == "Withdrawal Months Only" and self.table_model.rowCount():
+            self.table_model.set_row_filter(self.table_model.column('SWP Amount') > 0)
+        else:
+            self.table_model.set_row_filter(None)
+
+    def create_chart_tab(self):
+        # Empty until the tab is first shown; see show_chart_tab
+        self.chart_tab = QWidget()
+        QVBoxLayout(self.chart_tab).setContentsMargins(0, 0, 0, 0)
+        self.chart_widget = None
+        self.chart = None
+        self.chart_stale = False
+        self.tab_widget.addTab(self.chart_tab, "Graphical Analysis")
+        self.tab_widget.currentChanged.connect(self.show_chart_tab)
+
+    def show_chart_tab(self, index):
+        """Build the chart on first view and catch up on results computed while hidden"""
+        if self.tab_widget.widget(index) is not self.chart_tab:
+            return
+        if self.chart is None:
+            from swp_chart import SWPChart
+            self.chart_widget = MatplotlibWidget()
+            self.chart = SWPChart(self.chart_widget.figure)
+            self.chart_tab.layout().addWidget(self.chart_widget)
+            self.chart_stale = True
+        if self.chart_stale:
+            self.update_chart(self.result)
+
+    def set_default_values(self):
+        """Set default values"""
+        defaults = {
+            'initial_amount': '10000000',  # 1 crore
+            'investment_date': '01/06/2025',
+            'swp_amount': '75000',
+            'swp_start_date': '01/07/2025',
+            'swp_end_date': '22/05/2035',
+            'annual_return': '15.0',
+            'frequency': 'Monthly'
+        }
+
+        additional_defaults = {
+            'expense_ratio': '0.0',
+            'exit_load': '0.0',
+            'inflation_rate': '0.0',
+            'tax_rate': '0.0',
+            'date_convention': 'Same Day',
+            'withdrawal_policy': 'Fixed',
+            'step_up': '0.0',
+            'corpus_rate': '0.0',
+            'guardrail_band': '20.0',
+            'guardrail_step': '10.0'
+        }
+
+        for field_name, value in defaults.items():
+            if isinstance(self.input_fields[field_name], QLineEdit):
+                self.input_fields[field_name].setText(value)
+            elif isinstance(self.input_fields[field_name], QComboBox):
+                self.input_fields[field_name].setCurrentText(value)
+
+        for field_name, value in additional_defaults.items():
+            field = self.additional_input_fields.get(field_name)
+            if isinstance(field, QLineEdit):
+                field.setText(value)
+            elif isinstance(field, QComboBox):
+                field.setCurrentText(value)
+
+        self.monte_carlo_fields['volatility'].setText('15.0')
+        self.monte_carlo_fields['paths'].setText('10000')
+        self.monte_carlo_fields['distribution'].setCurrentText('Normal')
+
+
+    def get_input_values(self):
+        """Get values from input fields"""
+        values = {}
+        for field_name, field_widget in self.input_fields.items():
+            if isinstance(field_widget, QLineEdit):
+                text = field_widget.text().strip()
+                if field_name in ['initial_amount', 'swp_amount', 'annual_return']:
+                    values[field_name] = float(text) if text else 0.0
+                else:
+                    values[field_name] = text
+            elif isinstance(field_widget, QComboBox):
+                values[field_name] = field_widget.currentText()
+
+        # Get values from additional input fields
+        for field_name, field_widget in self.additional_input_fields.items():
+            if isinstance(field_widget, QComboBox):
+                values[field_name] = field_widget.currentText()
+                continue
+            text = field_widget.text().strip()
+            values[field_name] = float(text) if text else 0.0 # The line edits are all numeric
+
+        return values
+
+    def get_monte_carlo_settings(self):
+        """Build Monte Carlo settings from the Monte Carlo input fields"""
+        volatility = self.monte_carlo_fields['volatility'].text().strip()
+        paths = self.monte_carlo_fields['paths'].text().strip()
+        paths = int(paths) if paths else 10000
+        return MonteCarloSettings(
+            paths=paths,
+            volatility=float(volatility) if volatility else 0.0,
+            distribution=self.monte_carlo_fields['distribution'].currentText().lower(),
+            chunk_size=max(4096, paths // 20) # Enough chunks for progress updates and cancellation
+        )
+
+    def calculate_swp(self):
+        run = self.metrics.start('calculate')
+        try:
+            with run.span('parse'):
+                inputs = SWPInputs.from_values(self.get_input_values())
+                settings = self.get_monte_carlo_settings() if self.monte_carlo_checkbox.isChecked() else None
+        except ValueError as e:
+            run.count(error=str(e))
+            self.finish_run(run)
+            QMessageBox.critical(self, "Error", f"Please check your input values: {str(e)}")
+            return
+        self.start_calculation(inputs, settings, run)
+
+    def start_calculation(self, inputs, settings, run):
+        # A calculation still running is cancelled first, which resets the status
+        self.calculation_runner.submit(lambda progress: self.compute(inputs, settings, progress, run), run)
+        self.show_progress(0)
+        self.statusBar().showMessage("Calculating...")
+
+    def compute(self, inputs, settings, progress, run):
+        """Runs on the worker thread, so it must not touch any widget"""
+        # The engine that produced the result: overwritten only if the cache misses
+        run.count(engine='cache')
+
+        def loop(i):
+            run.count(engine='loop')
+            return self.projector.project(i)
+
+        def simulate(i):
+            run.count(engine='closed form')
+            return project(i, loop=loop)
+
+        with run.span('simulate'):
+            result = self.projection_cache.get_or_compute(inputs, simulate)
+        run.count(months=len(result), cache_hit=run.counters['engine'] == 'cache')
+
+        monte_carlo_result = None
+        if settings is not None:
+            progress(5)
+            # Monte Carlo chunks fill the rest of the progress bar
+            chunk_progress = lambda done, total: progress(5 + 95 * done / total)
+            with run.span('monte_carlo'):
+                monte_carlo_result = self.projection_cache.get_or_compute(
+                    inputs, lambda i: run_monte_carlo(i, settings, chunk_progress), settings)
+            run.count(paths=settings.paths)
+        return inputs, result, monte_carlo_result, run
+
+    def on_calculation_finished(self, outcome):
+        inputs, result, monte_carlo_result, run = outcome
+        self.progress_bar.setVisible(False)
+        self.monte_carlo_result = monte_carlo_result
+        self.current_inputs = inputs
+        self.result = result
+        with run.span('summary'):
+            self.update_display(result, run)
+        self.show_cache_stats()
+
+    def on_calculation_failed(self, error, run):
+        self.progress_bar.setVisible(False)
+        run.count(error=str(error))
+        self.finish_run(run)
+        if self.live_checkbox.isChecked():
+            # Don't interrupt typing with dialogs
+            self.statusBar().showMessage(f"Calculation failed: {str(error)}")
+        elif isinstance(error, ValueError):
+            QMessageBox.critical(self, "Error", f"Please check your input values: {str(error)}")
+        else:
+            QMessageBox.critical(self, "Error", f"An error occurred: {str(error)}")
+        self.show_cache_stats()
+
+    def on_calculation_cancelled(self, run):
+        self.progress_bar.setVisible(False)
+        self.statusBar().showMessage("Calculation cancelled: inputs changed")
+        run.count(cancelled=True)
+        self.finish_run(run)
+
+    def show_progress(self, percent):
+        self.progress_bar.setValue(percent)
+        self.progress_bar.setVisible(True)
+
+    def show_cache_stats(self):
+        stats = self.projection_cache.stats()
+        self.statusBar().showMessage(
+            f"Cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['size']}/{stats['maxsize']} entries")
+
+    def solve_swp(self):
+        """Solve for one parameter so that the SWP lasts until the end date"""
+        # Solved values are rounded towards the safe side before being filled in
+        options = {
+            "Maximum SWP Amount": ('swp_amount', solve_max_withdrawal, 2, math.floor),
+            "Minimum Initial Investment": ('initial_amount', solve_min_corpus, 2, math.ceil),
+            "Required Annual Return": ('annual_return', solve_required_return, 4, math.ceil)
+        }
+        choice, ok = QInputDialog.getItem(self, "Solve", "Solve for:", list(options), 0, False)
+        if not ok:
+            return
+        target, ok = QInputDialog.getDouble(self, "Solve", "Target balance at SWP end date (₹):",
+                                            0.0, 0.0, 1e15, 2)
+        if not ok:
+            return
+
+        field_name, solver, decimals, rounding = options[choice]
+        try:
+            inputs = SWPInputs.from_values(self.get_input_values())
+            value = solver(inputs, target)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Could not solve: {str(e)}")
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
+            return
+
+        scale = 10 ** decimals
+        self.input_fields[field_name].setText(f"{rounding(value * scale) / scale:.{decimals}f}")
+        self.calculate_swp()
+
+    def update_display(self, result, run=None):
+        # Update summary
+        self.summary_labels['total_withdrawn'].setText(f"₹{result.total_withdrawn:,.2f}")
+        self.summary_labels['remaining_corpus'].setText(f"₹{result.remaining_corpus:,.2f}")
+        self.summary_labels['months_sustainable'].setText(f"{result.months_sustainable} months")
+        self.summary_labels['final_value'].setText(f"₹{result.remaining_corpus:,.2f}")
+        if self.monte_carlo_result is not None:
+            self.summary_labels['success_probability'].setText(
+                f"{self.monte_carlo_result.success_probability * 100:.1f}%")
+        else:
+            self.summary_labels['success_probability'].setText("N/A")
+
+        # Table and chart follow once the new summary is on screen
+        if self.pending_run is not None:
+            # Superseded before its table and chart were drawn
+            self.finish_run(self.pending_run)
+        self.pending_result = result
+        self.pending_run = run
+        self.details_timer.start()
+
+    def update_details(self):
+        result = self.pending_result
+        run, self.pending_run = self.pending_run, None
+        # A redisplay without a calculation behind it is not timed
+        span = run.span if run is not None else lambda name: nullcontext()
+
+        # Update table
+        with span('table'):
+            self.table_model.set_result(result)
+            self.apply_table_filter()
+
+        # Update chart
+        with span('chart'):
+            self.update_chart(result)
+        if run is not None:
+            self.finish_run(run)
+
+    def finish_run(self, run):
+        self.metrics.finish(run)
+        if self.developer_panel is not None and self.developer_panel.isVisible():
+            self.developer_panel.refresh()
+
+    def show_developer_panel(self):
+        if self.developer_panel is None:
+            self.developer_panel = DeveloperPanel(self.metrics, self.projection_cache, self)
+        self.developer_panel.refresh()
+        self.developer_panel.show()
+        self.developer_panel.raise_()
+
+    def update_chart(self, result):
+        # A hidden chart is redrawn when its tab is shown again
+        if self.chart is None or self.tab_widget.currentWidget() is not self.chart_tab:
+            self.chart_stale = True
+            return
+        self.chart_stale = False
+
+        if result is None or not len(result):
+            self.chart.clear()
+        else:
+            initial_amount = self.current_inputs.initial_amount if self.current_inputs else None
+            self.chart.update(result.month, result.closing_balance, result.real_value,
+                              result.swp_amount, self.monte_carlo_result, initial_amount)
+        self.chart.draw()
+
+    def export_to_excel(self):
+        if self.result is None or not len(self.result):
+            QMessageBox.warning(self, "Warning", "Please calculate SWP first!")
+            return
+
+        # Get file path from user
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Save SWP Analysis", "swp_analysis.xlsx",
+            "Excel files (*.xlsx);;CSV files (*.csv);;Parquet files (*.parquet)"
+        )
+
+        if not file_path:
+            return
+        if os.path.splitext(file_path)[1].lower() not in FORMATS:
+            # Take the extension from the chosen filter, e.g. "CSV files (*.csv)"
+            file_path += selected_filter[selected_filter.rfind('*') + 1:-1] or '.xlsx'
+
+        # Snapshot everything the export needs; the worker must not read widgets,
+        # and export the inputs the result was calculated from, not edits made since
+        result = self.result
+        run = self.metrics.start('export')
+        inputs = self.current_inputs.to_values()
+        inputs.pop('withdrawal_overrides') # The GUI never sets any
+        summary = {name: self.summary_labels[name].text()
+                   for name in ('total_withdrawn', 'remaining_corpus', 'months_sustainable')}
+        run.count(months=len(result), format=os.path.splitext(file_path)[1].lower())
+
+        self.show_progress(0)
+        self.statusBar().showMessage("Exporting...")
+        self.export_runner.submit(lambda progress: self.export(file_path, result, inputs, summary, progress, run),
+                                  run)
+
+    def export(self, file_path, result, inputs, summary, progress, run):
+        """Runs on the worker thread"""
+        with run.span('export'):
+            export_analysis(file_path, result, inputs, summary, progress)
+        return file_path, run
+
+    def on_export_finished(self, outcome):
+        file_path, run = outcome
+        self.progress_bar.setVisible(False)
+        self.statusBar().clearMessage()
+        self.finish_run(run)
+        QMessageBox.information(self, "Success",
+                              f"SWP analysis exported successfully to:\n{file_path}")
+
+    def on_export_failed(self, error, run):
+        self.progress_bar.setVisible(False)
+        self.statusBar().clearMessage()
+        run.count(error=str(error))
+        self.finish_run(run)
+        QMessageBox.critical(self, "Error", f"Failed to export: {str(error)}")
+
+    def reset_fields(self):
+        """Reset all fields to default values"""
+        self.set_default_values()
+
+        # Clear table
+        self.table_model.clear()
+
+        # Clear chart
+        self.update_chart(None)
+
+        # Reset summary
+        for label in self.summary_labels.values():
+            if "₹" in label.text():
+                label.setText("₹0")
+            else:
+                label.setText("0")
+
+        self.calculation_runner.cancel()
+        self.details_timer.stop()
+        self.result = None
+        self.monte_carlo_result = None
+        self.current_inputs = None
+        self.additional_params_checkbox.setChecked(False) # Reset checkbox
+        self.monte_carlo_checkbox.setChecked(False)
+
+    def closeEvent(self, event):
+        # Let a pending export finish; a calculation is not worth waiting for
+        self.calculation_runner.cancel()
+        self.calculation_runner.wait()
+        self.export_runner.wait()
+        try:
+            self.projection_cache.save()
+        except OSError:
+            pass # The cache is only an optimisation; never block closing the window
+        super().closeEvent(event)
+
+    def apply_styles(self):
+        """Apply modern styling to the application"""
+        self.setStyleSheet("""
+            QMainWindow {
+                background-color: #f5f5f5;
+            }
+            QGroupBox {
+                font-weight: bold;
+                border: 2px solid #cccccc;
+                border-radius: 5px;
+                margin-top: 1ex;
+                padding-top: 10px;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                left: 10px;
+                padding: 0 5px 0 5px;
+            }
+            QLineEdit {
+                border: 2px solid #ddd;
+                border-radius: 5px;
+                padding: 8px; /* Increased padding */
+                font-size: 13px; /* Larger font */
+            }
+            QLineEdit:focus {
+                border-color: #2196F3;
+            }
+            QLineEdit[invalid="true"] {
+                border-color: #F44336;
+            }
+            QComboBox {
+                border: 2px solid #ddd;
+                border-radius: 5px;
+                padding: 8px; /* Increased padding */
+                font-size: 13px; /* Larger font */
+            }
+            QComboBox:focus {
+                border-color: #2196F3;
+            }
+            QLabel {
+                font-size: 13px; /* Larger font for labels */
+            }
+            QCheckBox {
+                font-size: 13px; /* Larger font for checkbox */
+                padding: 5px 0;
+            }
+            QTableView {
+                border: 1px solid #ddd;
+                border-radius: 5px;
+                background-color: white;
+                alternate-background-color: #f9f9f9;
+                font-size: 12px; /* Slightly larger table font */
+            }
+            QTableView::item {
+                padding: 8px;
+            }
+            QTabWidget::pane {
+                border: 1px solid #ddd;
+                border-radius: 5px;
+            }
+            QTabBar::tab {
+                background-color: #e1e1e1;
+                padding: 8px 16px;
+                margin-right: 2px;
+                border-top-left-radius: 5px;
+                border-top-right-radius: 5px;
+                font-size: 12px; /* Larger tab font */
+            }
+            QTabBar::tab:selected {
+                background-color: #2196F3;
+                color: white;
+            }
+        """)
+
+def preload_chart_modules():
+    """Import matplotlib off the GUI thread so the chart tab opens without a pause"""
+    try:
+        import matplotlib.figure # noqa: F401
+        import matplotlib.backends.backend_qt5agg # noqa: F401
+    except ImportError:
+        pass # Reported when the chart tab is opened
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SWP Calculator")
+    parser.add_argument('--trace', metavar='FILE', help="append the stage timings of every run to FILE as JSON lines")
+    parser.add_argument('--profile', action='store_true', help="capture a cProfile of the first run")
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    app.setApplicationName("SWP Calculator")
+
+    app.setStyle("Fusion")  # Use Fusion style for a modern look
+    app.setPalette(QPalette(QColor(240, 240, 240)))  # Set a light background color
+    app.setWindowIcon(QIcon('logo.png'))
+
+    calculator = SWPCalculator(trace_path=args.trace, profile_next=args.profile)
+    calculator.show()
+    threading.Thread(target=preload_chart_modules, daemon=True).start()
+
+    sys.exit(app.exec_())
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""Export throughput in rows per second.
+
+    python benchmarks/bench_export.py [--plans N] [--output-dir DIR]
+
+Projects one 30-year monthly plan, repeats its schedule ``--plans`` times
+and writes it with the streaming writers, next to the previous
+pandas/openpyxl export with its per-cell column sizing for comparison.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swp_engine import SWPInputs, project
+from swp_export import write_csv, write_excel, write_parquet
+
+BASE_VALUES = {
+    'initial_amount': 10000000.0,
+    'investment_date': '01/06/2025',
+    'swp_amount': 75000.0,
+    'swp_start_date': '01/07/2025',
+    'swp_end_date': '01/06/2055',
+    'annual_return': 12.0,
+    'frequency': 'Monthly',
+}
+
+SUMMARY = {'total_withdrawn': '₹0.00', 'remaining_corpus': '₹0.00', 'months_sustainable': '0 months'}
+
+
+def pandas_excel(file_path, rows, inputs):
+    """The export as it was: DataFrame -> openpyxl, then size columns cell by cell"""
+    import pandas as pd
+
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        pd.DataFrame(rows).to_excel(writer, sheet_name='SWP Analysis', index=False)
+        pd.DataFrame({'Parameter': list(inputs), 'Value': list(inputs.values())}).to_excel(
+            writer, sheet_name='Input Parameters', index=False)
+        for worksheet in writer.sheets.values():
+            for column in worksheet.columns:
+                width = max(len(str(cell.value)) for cell in column) + 2
+                worksheet.column_dimensions[column[0].column_letter].width = width
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plans', type=int, default=200)
+    parser.add_argument('--output-dir', default=None)
+    args = parser.parse_args()
+
+    result = project(SWPInputs.from_values(BASE_VALUES))
+    rows = result.rows * args.plans
+    columns = {name: np.tile(values, args.plans) for name, values in result.columns().items()}
+    count = len(rows)
+    print(f"{args.plans} plans, {count} rows")
+
+    cases = [
+        ('excel (pandas, before)', 'before.xlsx', lambda p: pandas_excel(p, rows, BASE_VALUES)),
+        ('excel (write-only)', 'analysis.xlsx', lambda p: write_excel(p, columns, BASE_VALUES, SUMMARY)),
+        ('csv', 'analysis.csv', lambda p: write_csv(p, columns)),
+        ('parquet', 'analysis.parquet', lambda p: write_parquet(p, columns)),
+    ]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = args.output_dir or temp_dir
+        print(f"{'format':<24} {'seconds':>8} {'rows/sec':>12} {'MB':>8}")
+        for name, file_name, write in cases:
+            path = os.path.join(directory, file_name)
+            start = time.perf_counter()
+            try:
+                write(path)
+            except ValueError as e: # e.g. pyarrow missing
+                print(f"{name:<24} skipped: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(path) / 1e6
+            print(f"{name:<24} {elapsed:>8.2f} {count / elapsed:>12,.0f} {size:>8.1f}")
+
+    assert np.array_equal(columns['Month'], [row['Month'] for row in rows])
+
+
+if __name__ == '__main__':
+    main()
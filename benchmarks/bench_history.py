@@ -0,0 +1,117 @@
+"""Rolling-window backtests over a memory-mapped NAV store.
+
+    python benchmarks/bench_history.py [--funds N] [--years N] [--window N]
+                                       [--workers N] [--dir DIR]
+
+Writes a synthetic NAV history (``--funds`` funds of ``--years`` of
+weekday NAVs, plus one monthly fund growing at a constant rate) as CSV,
+converts it with ``swp_history.py convert`` in a child process, then
+replays a ``--window``-year plan from every start date of every fund.
+Reports windows per second and this process's peak RSS next to the size
+of the store, and checks the constant-rate fund against run_projection.
+"""
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from swp_engine import SWPInputs, run_projection
+from swp_history import backtest_funds, open_store
+
+FIRST_DAY = np.datetime64('1995-01-02')
+MONTHLY_RETURN = 0.008
+
+PLAN = dict(initial_amount=10000000.0, swp_amount=65000.0, annual_return=0.0, exit_load=1.0,
+            tax_rate=10.0, inflation_rate=5.0, withdrawal_overrides={6: 250000.0})
+
+
+def write_history(path, funds, years):
+    days = np.arange(FIRST_DAY, FIRST_DAY + np.timedelta64(int(years * 365.25), 'D'))
+    days = days[np.is_busday(days)]
+    labels = days.astype(str).tolist()
+    rng = np.random.default_rng(1)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('fund', 'date', 'nav'))
+        for fund in range(funds):
+            daily = rng.normal(0.0003 + 0.0001 * (fund % 5), 0.006 + 0.002 * (fund % 7), len(days))
+            nav = 10 * np.exp(np.cumsum(daily))
+            writer.writerows(zip([f"F{fund:04d}"] * len(days), labels, nav.tolist()))
+        for k in range(years * 12):
+            date = datetime(1995, 1, 15) + relativedelta(months=k)
+            writer.writerow(('constant', date.strftime('%d/%m/%Y'), 10 * (1 + MONTHLY_RETURN) ** k))
+    return len(days) * funds + years * 12
+
+
+def check_constant(result):
+    """Every tenth window of the constant-rate fund against the projection loop"""
+    plan = dict(PLAN, annual_return=((1 + MONTHLY_RETURN) ** 12 - 1) * 100)
+    for start in result.start_dates[::10].astype(datetime).tolist():
+        start = datetime(start.year, start.month, start.day)
+        expected = run_projection(SWPInputs(investment_date=start,
+                                            swp_start_date=start + relativedelta(months=1),
+                                            swp_end_date=start + relativedelta(months=result.n_months),
+                                            **plan))
+        i = int(np.searchsorted(result.start_dates, np.datetime64(start.date())))
+        assert result.months_sustainable[i] == expected.months_sustainable
+        assert np.isclose(result.final_balance[i], expected.remaining_corpus, rtol=1e-9, atol=1e-6)
+        assert np.isclose(result.total_withdrawn[i], expected.total_withdrawn, rtol=1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--funds', type=int, default=200)
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--window', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--dir', help="keep the history and store here (default: a temporary directory)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp:
+        directory = args.dir or temp
+        os.makedirs(directory, exist_ok=True)
+        history = os.path.join(directory, 'navs.csv')
+        store_path = os.path.join(directory, 'store')
+        start = time.perf_counter()
+        rows = write_history(history, args.funds, args.years)
+        print(f"{rows:,} NAVs written as CSV in {time.perf_counter() - start:.1f} s")
+
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT, 'swp_history.py'), 'convert',
+                        history, store_path], check=True, stderr=subprocess.DEVNULL)
+        size = sum(os.path.getsize(os.path.join(store_path, name)) for name in os.listdir(store_path))
+        print(f"converted in {time.perf_counter() - start:.1f} s, store {size / 1e6:.1f} MB")
+
+        end = datetime(2025, 1, 31)
+        inputs = SWPInputs(investment_date=end, swp_start_date=end,
+                           swp_end_date=end + relativedelta(years=args.window, days=-1), **PLAN)
+        start = time.perf_counter()
+        windows = successes = 0
+        for result in backtest_funds(inputs, store_path, workers=args.workers):
+            windows += len(result)
+            successes += int(result.success.sum())
+            if result.fund == 'constant':
+                check_constant(result)
+        elapsed = time.perf_counter() - start
+        funds = len(open_store(store_path))
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{funds} funds, {windows:,} {args.window}-year windows in {elapsed:.2f} s "
+              f"({windows / elapsed:,.0f} windows/sec, "
+              f"{windows * args.window * 12 / elapsed / 1e6:.1f}M window-months/sec), "
+              f"{successes / max(windows, 1):.0%} sustained")
+        print(f"peak RSS {peak:.0f} MB; constant-rate fund matches run_projection")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Throughput of SIP-then-SWP lifecycles and batched XIRR.
+
+    python benchmarks/bench_lifecycle.py [--plans N] [--sip-years N] [--swp-years N] [--reference N]
+
+Builds ``--plans`` lifecycles (a monthly SIP at random amounts and returns,
+a top-up and a one-off withdrawal, then the SWP, taxed) with
+swp_lifecycle.run_lifecycle, then solves all their XIRRs in one
+lifecycle_xirrs call and reports plans per second for both. The first
+``--reference`` XIRRs are also solved one at a time by plain bisection in
+Python, to check them and for comparison.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swp_engine import SWPInputs
+from swp_lifecycle import lifecycle_xirrs, run_lifecycle
+from swp_xirr import DAYS_PER_YEAR, RATE_RANGE
+
+
+def reference_xirr(dates, amounts):
+    """Bisection on the rate until the bracket is below 1e-13"""
+    days = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+    years = ((days - days[0]) / DAYS_PER_YEAR).tolist()
+    amounts = amounts.tolist()
+
+    def npv(rate):
+        return math.fsum(a * (1 + rate) ** -t for a, t in zip(amounts, years))
+
+    lo, hi = RATE_RANGE
+    f_lo = npv(lo)
+    while hi - lo > 1e-13:
+        mid = (lo + hi) / 2
+        f_mid = npv(mid)
+        if (f_mid < 0) == (f_lo < 0):
+            lo, f_lo = mid, f_mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plans', type=int, default=10000)
+    parser.add_argument('--sip-years', type=int, default=20)
+    parser.add_argument('--swp-years', type=int, default=30)
+    parser.add_argument('--reference', type=int, default=20)
+    args = parser.parse_args()
+
+    sip_start = datetime(2025, 1, 5)
+    swp_start = sip_start + relativedelta(years=args.sip_years)
+    base = dict(initial_amount=0.0, investment_date=sip_start, swp_amount=60000.0, swp_start_date=swp_start,
+                swp_end_date=swp_start + relativedelta(years=args.swp_years, days=-1), exit_load=1.0,
+                inflation_rate=6.0, tax_rate=10.0)
+    top_up = (sip_start + relativedelta(years=args.sip_years // 2), 500000.0)
+    one_off = (swp_start + relativedelta(years=args.swp_years // 2, days=3), -1000000.0)
+    rng = np.random.default_rng(0)
+    returns = rng.uniform(6, 14, args.plans)
+    sips = rng.uniform(10000, 50000, args.plans)
+
+    began = time.perf_counter()
+    lifecycles = [run_lifecycle(SWPInputs(annual_return=float(r), **base), sip_amount=float(s),
+                                cash_flows=[top_up, one_off])
+                  for r, s in zip(returns, sips)]
+    build = time.perf_counter() - began
+    flows = sum(len(l.flow_amounts) for l in lifecycles)
+    print(f"run_lifecycle:   {args.plans:,} plans ({args.sip_years}y SIP + {args.swp_years}y SWP) in "
+          f"{build:.2f} s ({args.plans / build:,.0f} plans/s)")
+
+    began = time.perf_counter()
+    rates = lifecycle_xirrs(lifecycles)
+    elapsed = time.perf_counter() - began
+    print(f"lifecycle_xirrs: {args.plans:,} plans, {flows / args.plans:.0f} flows each, in {elapsed:.3f} s "
+          f"({args.plans / elapsed:,.0f} plans/s); XIRR {np.nanmin(rates):.2%} to {np.nanmax(rates):.2%}")
+    assert np.all(np.isfinite(rates))
+
+    count = min(args.reference, args.plans)
+    if count:
+        began = time.perf_counter()
+        for i in range(count):
+            expected = reference_xirr(lifecycles[i].flow_dates, lifecycles[i].flow_amounts)
+            assert abs(rates[i] - expected) < 1e-9, (i, rates[i], expected)
+        per_plan = (time.perf_counter() - began) / count
+        print(f"bisection:       {per_plan * 1000:.2f} ms per plan, {per_plan * args.plans:.1f} s for all; "
+              f"{count} plans match")
+
+
+if __name__ == '__main__':
+    main()
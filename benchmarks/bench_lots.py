@@ -0,0 +1,127 @@
+"""Throughput of the FIFO lot engine.
+
+    python benchmarks/bench_lots.py [--plans N] [--years N] [--reference N]
+
+Runs ``--plans`` plans, each with a top-up every month (so one lot per
+month) of around the SWP amount, so that most withdrawals span several
+lots, through swp_lots.run_lot_projection and reports withdrawals and
+(lot, month) redemption pieces per second. The first ``--reference`` plans
+are also run through a straightforward deque-based FIFO, one redemption at
+a time, to check the results and for comparison.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swp_calendar import calendar_for
+from swp_engine import SWPInputs
+from swp_lots import DEFAULT_NAV, TaxRules, _financial_years, run_lot_projection
+
+
+def reference(inputs, rules, top_ups):
+    """Month by month with a deque of [units, cost, day] lots; (closing, load, short, long, tax)"""
+    calendar = calendar_for(inputs)
+    dates = calendar.dates.astype(object)
+    investment = inputs.investment_date.date()
+    nav = DEFAULT_NAV
+    lots = deque([[inputs.initial_amount / nav, nav, investment]])
+    years = _financial_years(calendar.dates).tolist()
+    columns = {name: [] for name in ('closing', 'load', 'short', 'long', 'tax')}
+    gains = [0.0, 0.0]
+    owed = 0.0
+    for k in range(len(calendar)):
+        nav = DEFAULT_NAV * (1 + inputs.monthly_return) ** (k + 1)
+        if k + 1 in top_ups:
+            lots.append([top_ups[k + 1] / nav, nav, dates[k]])
+        if k and years[k] != years[k - 1]:
+            gains, owed = [0.0, 0.0], 0.0
+        load = short = long = 0.0
+        if calendar.withdrawal[k]:
+            units = inputs.swp_amount / nav
+            while units > 1e-12 and lots:
+                lot = lots[0]
+                take = min(units, lot[0])
+                held = (dates[k] - lot[2]).days
+                value = take * nav
+                piece_load = value * inputs.exit_load / 100 if held < rules.exit_load_days else 0.0
+                gain = value - piece_load - take * lot[1]
+                load += piece_load
+                if held > rules.long_term_days:
+                    long += gain
+                else:
+                    short += gain
+                lot[0] -= take
+                units -= take
+                if lot[0] <= 1e-12:
+                    lots.popleft()
+        gains[0] += short
+        gains[1] += long
+        long_net = gains[1] + min(gains[0], 0)
+        year_owed = (rules.short_term_rate / 100 * max(gains[0], 0) +
+                     rules.long_term_rate / 100 * max(long_net - rules.long_term_exemption, 0))
+        for name, value in zip(columns, (sum(lot[0] for lot in lots) * nav, load, short, long,
+                                         year_owed - owed)):
+            columns[name].append(value)
+        owed = year_owed
+    return columns
+
+
+def make_plans(count, years):
+    plans = []
+    for i in range(count):
+        start = datetime(2025, 1 + i % 12, 1 + i % 28)
+        swp_amount = 20000 + 100 * (i % 50)
+        plans.append((SWPInputs(initial_amount=2e5 + 1e3 * i, investment_date=start - relativedelta(months=i % 18),
+                                swp_amount=swp_amount, swp_start_date=start,
+                                swp_end_date=start + relativedelta(years=years, days=-1),
+                                annual_return=6 + i % 9, exit_load=1.0, inflation_rate=5.0),
+                      {m: swp_amount * (0.7 + 0.1 * (m % 5)) for m in range(1, years * 12 + 1)}))
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plans', type=int, default=500)
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--reference', type=int, default=20)
+    args = parser.parse_args()
+
+    rules = TaxRules()
+    plans = make_plans(args.plans, args.years)
+    run_lot_projection(plans[0][0], rules, plans[0][1]) # warm the calendar cache
+
+    start = time.perf_counter()
+    results = [run_lot_projection(inputs, rules, top_ups) for inputs, top_ups in plans]
+    elapsed = time.perf_counter() - start
+    withdrawals = sum(int(np.count_nonzero(r.schedule.swp_amount)) for r in results)
+    pieces = sum(r.redemptions for r in results)
+    lots = sum(len(r.lot_units) for r in results)
+    print(f"{args.plans} plans, {lots:,} lots, {withdrawals:,} withdrawals, {pieces:,} lot pieces")
+    print(f"{'array FIFO':<16} {elapsed:>8.3f} s  {withdrawals / elapsed:>12,.0f} withdrawals/sec  "
+          f"{pieces / elapsed:>12,.0f} pieces/sec")
+
+    checked = plans[:args.reference]
+    if checked:
+        start = time.perf_counter()
+        expected = [reference(inputs, rules, top_ups) for inputs, top_ups in checked]
+        elapsed = time.perf_counter() - start
+        count = sum(int(np.count_nonzero(r.schedule.swp_amount)) for r in results[:len(checked)])
+        print(f"{'deque FIFO':<16} {elapsed:>8.3f} s  {count / elapsed:>12,.0f} withdrawals/sec")
+        for result, columns in zip(results, expected):
+            got = (result.schedule.closing_balance, result.exit_load, result.short_term_gain,
+                   result.long_term_gain, result.schedule.tax)
+            for (name, expected_column), column in zip(columns.items(), got):
+                assert np.allclose(column, expected_column[:len(column)], rtol=1e-9, atol=1e-4), name
+        print(f"results match the deque FIFO for {len(checked)} plans")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Speedup of the process-pool runner over the single-process engine.
+
+    python benchmarks/bench_parallel.py [--scenarios N] [--paths N]
+
+Prints wall time and speedup for 1, 2, 4, ... workers up to the CPU count.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swp_batch import evaluate_batch, scenario_grid
+from swp_engine import SWPInputs
+from swp_montecarlo import MonteCarloSettings, run_monte_carlo
+from swp_parallel import default_workers, run_batch_parallel, run_monte_carlo_parallel
+
+BASE_VALUES = {
+    'initial_amount': 10000000.0,
+    'investment_date': '01/06/2025',
+    'swp_amount': 75000.0,
+    'swp_start_date': '01/07/2025',
+    'swp_end_date': '01/06/2065',
+    'annual_return': 12.0,
+    'frequency': 'Monthly',
+}
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def worker_counts():
+    counts, n = [], 1
+    while n < default_workers():
+        counts.append(n)
+        n *= 2
+    return counts + [default_workers()]
+
+
+def report(name, serial_time, runs):
+    print(f"\n{name}")
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    print(f"{'serial':>8} {serial_time:>10.3f} {1.0:>8.2f}")
+    for workers, seconds in runs:
+        print(f"{workers:>8} {seconds:>10.3f} {serial_time / seconds:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=400000)
+    parser.add_argument('--paths', type=int, default=200000)
+    args = parser.parse_args()
+
+    side = int(np.sqrt(args.scenarios))
+    grid = scenario_grid(BASE_VALUES,
+                         annual_return=np.linspace(4, 16, side),
+                         swp_amount=np.linspace(30000, 150000, side))
+    serial, expected = timed(evaluate_batch, grid)
+    runs = []
+    for workers in worker_counts():
+        seconds, summary = timed(run_batch_parallel, grid, workers=workers)
+        assert np.array_equal(summary.months_sustainable, expected.months_sustainable)
+        runs.append((workers, seconds))
+    report(f"Scenario batch: {side * side} scenarios x 480 months", serial, runs)
+
+    inputs = SWPInputs.from_values(BASE_VALUES)
+    settings = MonteCarloSettings(paths=args.paths, seed=42, chunk_size=8192)
+    serial, expected = timed(run_monte_carlo, inputs, settings)
+    runs = []
+    for workers in worker_counts():
+        seconds, result = timed(run_monte_carlo_parallel, inputs, settings, workers=workers)
+        assert np.array_equal(result.bands[50], expected.bands[50])
+        runs.append((workers, seconds))
+    report(f"Monte Carlo: {args.paths} paths x 480 months", serial, runs)
+
+
+if __name__ == '__main__':
+    main()
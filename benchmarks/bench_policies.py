@@ -0,0 +1,107 @@
+"""Withdrawal policies through the loop, closed form, batch engine and Monte Carlo.
+
+    python benchmarks/bench_policies.py [--years N] [--paths N] [--scenarios N]
+
+For every policy: one plan through run_projection and project() (the closed
+form), ``--scenarios`` plans through evaluate_batch, and ``--paths`` Monte
+Carlo paths through compare_policies, so all policies see the same returns.
+The faster paths are checked against run_projection, Monte Carlo with zero
+volatility included.
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swp_batch import INPUT_KEYS, evaluate_batch
+from swp_engine import NUMERIC_FIELDS, SWPInputs, project, run_projection
+from swp_montecarlo import MonteCarloSettings, compare_policies, run_monte_carlo
+
+POLICIES = {
+    'Fixed': {},
+    'Inflation Indexed': {'withdrawal_policy': "Inflation Indexed"},
+    'Annual Step-Up': {'withdrawal_policy': "Annual Step-Up", 'step_up': 4.0},
+    'Percent of Corpus': {'withdrawal_policy': "Percent of Corpus", 'corpus_rate': 6.0},
+    'Guardrails': {'withdrawal_policy': "Guardrails"},
+}
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def check(result, expected, name):
+    assert len(result) == len(expected), name
+    for column in ('opening_balance', 'swp_amount', 'closing_balance'):
+        assert np.allclose(getattr(result, column), getattr(expected, column), rtol=1e-9, atol=1e-6), \
+            f"{name}: {column}"
+
+
+def batch_values(inputs, count):
+    """``count`` variants of ``inputs`` with returns from 4% to 16%"""
+    values = inputs.to_values()
+    columns = {key: np.full(count, values[key], dtype=float if key in NUMERIC_FIELDS else object)
+               for key in INPUT_KEYS}
+    columns['annual_return'] = np.linspace(4, 16, count)
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--paths', type=int, default=100000)
+    parser.add_argument('--scenarios', type=int, default=10000)
+    args = parser.parse_args()
+
+    start = datetime(2025, 7, 1)
+    base = SWPInputs(initial_amount=10000000.0, investment_date=datetime(2025, 6, 1), swp_amount=60000.0,
+                     swp_start_date=start, swp_end_date=start + relativedelta(years=args.years, days=-1),
+                     annual_return=10.0, exit_load=1.0, inflation_rate=6.0)
+    plans = {name: replace(base, **changes) for name, changes in POLICIES.items()}
+
+    print(f"{'policy':<18} {'loop ms':>8} {'closed ms':>10} {'batch s':>8} {'scen/s':>10} "
+          f"{'months':>7} {'withdrawn':>14}")
+    for name, inputs in plans.items():
+        loop_time, expected = timed(run_projection, inputs)
+        closed_time, result = timed(project, inputs)
+        check(result, expected, name)
+        for taxed in (False, True):
+            plan = replace(inputs, tax_rate=10.0) if taxed else inputs
+            values = batch_values(plan, args.scenarios)
+            batch_time, summary = timed(evaluate_batch, values)
+            sample = np.linspace(0, args.scenarios - 1, 5).astype(int)
+            for i in sample.tolist():
+                reference = run_projection(replace(plan, annual_return=float(values['annual_return'][i])))
+                assert summary.months_sustainable[i] == reference.months_sustainable, name
+                assert np.isclose(summary.total_withdrawn[i], reference.total_withdrawn, rtol=1e-9), name
+            if not taxed:
+                untaxed_time = batch_time
+        print(f"{name:<18} {loop_time * 1000:>8.2f} {closed_time * 1000:>10.2f} {untaxed_time:>8.3f} "
+              f"{args.scenarios / untaxed_time:>10,.0f} {expected.months_sustainable:>7} "
+              f"{expected.total_withdrawn:>14,.0f}")
+        flat = run_monte_carlo(inputs, MonteCarloSettings(paths=16, volatility=0.0, seed=1, chunk_size=16))
+        assert np.allclose(flat.bands[50][:len(expected)], expected.closing_balance, rtol=0.01,
+                           atol=inputs.initial_amount * 1e-4), name
+
+    settings = MonteCarloSettings(paths=args.paths, volatility=15.0, seed=7)
+    elapsed, results = timed(compare_policies, base, POLICIES, settings)
+    print(f"\nMonte Carlo: {args.paths:,} paths x {args.years} years per policy, same returns for all")
+    print(f"{'policy':<18} {'success':>8} {'median end':>14} {'5th pct end':>14}")
+    for name, result in results.items():
+        print(f"{name:<18} {result.success_probability:>8.1%} {result.bands[50][-1]:>14,.0f} "
+              f"{result.bands[5][-1]:>14,.0f}")
+    print(f"{len(POLICIES)} policies in {elapsed:.2f} s ({elapsed / len(POLICIES):.2f} s per policy); "
+          f"faster paths match run_projection")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Throughput of the multi-fund portfolio engine.
+
+    python benchmarks/bench_portfolio.py [--portfolios N] [--funds N] [--years N] [--reference N]
+
+Runs ``--portfolios`` random portfolios of ``--funds`` funds (returns and
+exit loads rising from liquid to equity, mixed waterfall and pro-rata
+withdrawals, yearly, quarterly or no rebalancing) with tax and Guardrails
+withdrawals through swp_portfolio.evaluate_portfolios, and reports
+portfolio-months per second. The first ``--reference`` portfolios are also
+run through a plain loop over months and funds, to check the results and
+for comparison.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swp_calendar import calendar_for
+from swp_engine import SWPInputs
+from swp_policies import Guardrails, POLICY_YEAR, withdrawal_schedule
+from swp_portfolio import REBALANCE_INTERVALS, Fund, evaluate_portfolios, run_portfolio
+
+
+def reference(inputs, funds, rebalance, order):
+    """Month by month, fund by fund; (total withdrawn, months, fund balances)"""
+    calendar = calendar_for(inputs)
+    withdrawal, amount, fixed = withdrawal_schedule(inputs, calendar)
+    load_months = calendar.exit_load_months(inputs.investment_date)
+    rules = Guardrails.from_inputs(inputs)
+    tax_rate = inputs.tax_rate / 100
+    weight = sum(f.allocation for f in funds)
+    target = [f.allocation / weight for f in funds]
+    rates = [(1 + f.annual_return / 100 - f.expense_ratio / 100) ** (1/12) - 1 for f in funds]
+    balance = [inputs.initial_amount * w for w in target]
+    invested = list(balance)
+    policy_amount, year_growth = inputs.swp_amount, 0.0
+    total, month = 0.0, 0
+    interval = REBALANCE_INTERVALS[rebalance]
+    for t in range(len(calendar)):
+        if sum(balance) <= 0:
+            break
+        month = t + 1
+        opening = sum(balance)
+        balance = [b * (1 + r) for b, r in zip(balance, rates)]
+        if t and t % POLICY_YEAR == 0:
+            policy_amount = float(rules.apply(policy_amount, opening, year_growth))
+            year_growth = 0.0
+        year_growth += sum(balance) - opening
+        if withdrawal[t]:
+            wanted = min(amount[t] if fixed[t] else policy_amount, sum(balance))
+            charges = []
+            for b, c, f in zip(balance, invested, funds):
+                gain = ((b - c) / b if b > 0 else 0.0) if c > 0 else 1.0
+                load = f.exit_load / 100 if t < load_months else 0.0
+                charges.append(1 + load + gain * tax_rate)
+            capacity = [b / max(c, 1e-9) for b, c in zip(balance, charges)]
+            if wanted <= sum(capacity):
+                if order == "Pro Rata":
+                    paid = [cap * wanted / sum(capacity) for cap in capacity]
+                else:
+                    paid, left = [], wanted
+                    for cap in capacity:
+                        paid.append(min(max(left, 0.0), cap))
+                        left -= cap
+                balance = [max(b - p * c, 0.0) for b, p, c in zip(balance, paid, charges)]
+            else:
+                paid = [b / (1 + tax_rate + f.exit_load / 100) for b, f in zip(balance, funds)]
+                balance = [0.0] * len(funds)
+            invested = [c - p for c, p in zip(invested, paid)]
+            total += sum(paid)
+            if sum(balance) < inputs.swp_amount * 0.1:
+                break
+        if interval and (t + 1) % interval == 0:
+            whole = sum(balance)
+            for k, w in enumerate(target):
+                goal = whole * w
+                kept = min(goal / balance[k], 1.0) if balance[k] > 0 else 1.0
+                invested[k] = invested[k] * kept + max(goal - balance[k], 0.0)
+                balance[k] = goal
+    return total, month, balance
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--portfolios', type=int, default=10000)
+    parser.add_argument('--funds', type=int, default=5)
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--reference', type=int, default=20)
+    args = parser.parse_args()
+
+    start = datetime(2025, 7, 1)
+    inputs = SWPInputs(initial_amount=10000000.0, investment_date=datetime(2025, 6, 1), swp_amount=60000.0,
+                       swp_start_date=start, swp_end_date=start + relativedelta(years=args.years, days=-1),
+                       annual_return=10.0, inflation_rate=6.0, tax_rate=10.0, withdrawal_policy="Guardrails")
+    rng = np.random.default_rng(0)
+    allocation = rng.uniform(0, 100, (args.portfolios, args.funds))
+    annual_return = np.sort(rng.uniform(4, 14, (args.portfolios, args.funds)), axis=1)
+    exit_load = np.linspace(0, 1, args.funds)
+    rebalance = rng.choice(["Never", "Yearly", "Quarterly"], args.portfolios)
+    order = rng.choice(["Waterfall", "Pro Rata"], args.portfolios)
+
+    began = time.perf_counter()
+    summary = evaluate_portfolios(inputs, allocation, annual_return, 0.5, exit_load, rebalance, order)
+    elapsed = time.perf_counter() - began
+    months = int(summary.months_sustainable.sum())
+    print(f"evaluate_portfolios: {args.portfolios:,} portfolios x {args.funds} funds x {args.years} years "
+          f"in {elapsed:.3f} s ({months / elapsed:,.0f} portfolio-months/s)")
+
+    count = min(args.reference, args.portfolios)
+    if count:
+        loop_time = 0.0
+        for p in range(count):
+            funds = [Fund(str(k), allocation[p, k], annual_return[p, k], 0.5, exit_load[k])
+                     for k in range(args.funds)]
+            began = time.perf_counter()
+            total, month, balance = reference(inputs, funds, rebalance[p], order[p])
+            loop_time += time.perf_counter() - began
+            assert month == summary.months_sustainable[p], p
+            assert np.isclose(total, summary.total_withdrawn[p], rtol=1e-9), p
+            assert np.allclose(balance, summary.fund_remaining[p], rtol=1e-9, atol=1e-6), p
+            single = run_portfolio(inputs, funds, rebalance[p], order[p])
+            assert np.isclose(single.schedule.total_withdrawn, total, rtol=1e-9), p
+        loop_time /= count
+        print(f"plain loop:          {loop_time * 1000:.2f} ms per portfolio, "
+              f"{loop_time * args.portfolios:.1f} s for all; {count} portfolios match")
+
+
+if __name__ == '__main__':
+    main()
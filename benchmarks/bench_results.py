@@ -0,0 +1,88 @@
+"""Memory and hand-off cost of stored projection results.
+
+    python benchmarks/bench_results.py [--scenarios N]
+
+Projects ``--scenarios`` different 30-year monthly plans and measures, with
+tracemalloc, the memory held by their columnar SWPResults against the same
+schedules as the list of row dicts the GUI used to keep. Also times what
+the table, chart and export had to do per result with row dicts (pull
+columns out again) against using the result's arrays directly.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from swp_engine import RESULT_COLUMNS, SWPInputs, project
+
+BASE_VALUES = {
+    'initial_amount': 10000000.0,
+    'investment_date': '01/06/2025',
+    'swp_amount': 75000.0,
+    'swp_start_date': '01/07/2025',
+    'swp_end_date': '01/06/2055',
+    'annual_return': 12.0,
+    'frequency': 'Monthly',
+}
+
+
+def held(build):
+    """(object, bytes still allocated once ``build()`` has returned it)"""
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def reshape_rows(rows):
+    """Column extraction the table, chart and export each did on row dicts"""
+    table = {name: np.array([row[name] for row in rows]) for name in RESULT_COLUMNS}
+    chart = [[row[name] for row in rows] for name in ('Month', 'Closing Balance',
+                                                      'Real Value', 'SWP Amount')]
+    export = {name: [row[name] for row in rows] for name in RESULT_COLUMNS}
+    return table, chart, export
+
+
+def use_result(result):
+    """The same hand-off from a columnar result: only the dates are formatted"""
+    table = (result, result.days())
+    chart = [result.month, result.closing_balance, result.real_value, result.swp_amount]
+    export = result.columns()
+    return table, chart, export
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=1000)
+    args = parser.parse_args()
+
+    plans = [SWPInputs.from_values(dict(BASE_VALUES, swp_amount=40000 + 50 * i))
+             for i in range(args.scenarios)]
+    results, columnar = held(lambda: [project(plan) for plan in plans])
+    rows, row_dicts = held(lambda: [result.rows for result in results])
+    months = sum(len(result) for result in results)
+    print(f"{args.scenarios} scenarios, {months:,} months")
+    print(f"{'row dicts':<12} {row_dicts / 1e6:>8.1f} MB  {row_dicts / months:>6.0f} B/month")
+    print(f"{'columnar':<12} {columnar / 1e6:>8.1f} MB  {columnar / months:>6.0f} B/month"
+          f"  ({row_dicts / columnar:.1f}x smaller)")
+
+    for name, consume, items in (('row dicts', reshape_rows, rows), ('columnar', use_result, results)):
+        start = time.perf_counter()
+        for item in items:
+            consume(item)
+        elapsed = time.perf_counter() - start
+        print(f"hand-off to table, chart and export ({name}): "
+              f"{elapsed / len(items) * 1e3:.3f} ms per result")
+
+    assert all(np.array_equal(r.closing_balance, [row['Closing Balance'] for row in rs])
+               for r, rs in zip(results[:10], rows[:10]))
+
+
+if __name__ == '__main__':
+    main()
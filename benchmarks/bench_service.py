@@ -0,0 +1,154 @@
+"""Load generator for the local projection service.
+
+    python benchmarks/bench_service.py [--requests N] [--concurrency N]
+                                       [--max-batch N] [--url URL]
+
+Starts swp_service.py on a free localhost port (unless --url points at a
+running one), then sends summary projections from ``--concurrency``
+keep-alive connections. Each request varies the plan, so most of them miss
+the cache, and a ``--repeat`` fraction resends an earlier plan. Prints
+throughput and p50/p90/p99 latency; run with ``--max-batch 1`` to see the
+service without request coalescing.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BASE_VALUES = {
+    'initial_amount': 10000000.0,
+    'investment_date': '01/06/2025',
+    'swp_amount': 75000.0,
+    'swp_start_date': '01/07/2025',
+    'swp_end_date': '01/06/2055',
+    'annual_return': 12.0,
+    'frequency': 'Monthly',
+}
+
+
+def make_plan(rng):
+    plan = dict(BASE_VALUES)
+    plan['swp_amount'] = rng.randrange(20000, 150000, 500)
+    plan['annual_return'] = rng.choice([6, 8, 10, 12, 14])
+    plan['tax_rate'] = rng.choice([0, 0, 0, 10])
+    plan['frequency'] = rng.choice(['Monthly', 'Quarterly'])
+    return plan
+
+
+async def request(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    data = await reader.readexactly(length)
+    return status, json.loads(data)
+
+
+async def client(host, port, plans, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for plan in plans:
+            start = time.perf_counter()
+            status, payload = await request(reader, writer, host, '/projection', plan)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(payload.get('error'))
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, args):
+    rng = random.Random(args.seed)
+    plans = []
+    for _ in range(args.requests):
+        if plans and rng.random() < args.repeat:
+            plans.append(rng.choice(plans))
+        else:
+            plans.append(make_plan(rng))
+    # Deal the requests out round-robin, one list per connection
+    shares = [plans[i::args.concurrency] for i in range(args.concurrency)]
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, share, latencies, errors) for share in shares if share))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /health HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    health = json.loads((await reader.read()).split(b'\r\n\r\n', 1)[1])
+    writer.close()
+    return elapsed, latencies, errors, health
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def start_service(args):
+    command = [sys.executable, os.path.join(ROOT, 'swp_service.py'), '--port', '0',
+               '--workers', str(args.workers), '--max-batch', str(args.max_batch),
+               '--batch-delay-ms', str(args.batch_delay_ms)]
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('Serving'):
+        process.kill()
+        raise RuntimeError("The service did not start")
+    return process, line.rsplit(' ', 1)[1].strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--repeat', type=float, default=0.1,
+                        help="fraction of requests repeating an earlier plan (default 0.1)")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--max-batch', type=int, default=1024)
+    parser.add_argument('--batch-delay-ms', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--url', help="use a running service instead of starting one")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_service(args)
+    try:
+        address = urlsplit(url)
+        elapsed, latencies, errors, health = asyncio.run(
+            run_load(address.hostname, address.port, args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    count = len(latencies)
+    print(f"{count} requests over {args.concurrency} connections in {elapsed:.2f} s "
+          f"({count / elapsed:,.0f} requests/sec), {len(errors)} errors")
+    print(f"latency ms: p50 {percentile(latencies, 50) * 1000:.1f}  "
+          f"p90 {percentile(latencies, 90) * 1000:.1f}  "
+          f"p99 {percentile(latencies, 99) * 1000:.1f}  "
+          f"mean {statistics.mean(latencies) * 1000:.1f}")
+    batches = health.get('batches') or 1
+    print(f"service: {health['batched_requests']} projections in {health['batches']} batches "
+          f"(avg {health['batched_requests'] / batches:.1f}), "
+          f"cache hit rate {health['cache']['hit_rate']:.0%}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Startup time of the GUI entry point.
+
+    python benchmarks/bench_startup.py [--runs N] [--top N] [--budget MS]
+
+Starts a fresh interpreter per run and measures the wall time from launch
+until the main window has been shown and painted, then lists the slowest
+imports of SWPCalculator as reported by ``python -X importtime``. Exits
+with status 1 if the median startup exceeds ``--budget`` milliseconds.
+Without a display the offscreen Qt platform is used.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SHOW_WINDOW = """
+import sys
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import SWPCalculator
+window = SWPCalculator.SWPCalculator()
+window.show()
+app.processEvents()
+print('shown', flush=True)
+"""
+
+
+def environment():
+    env = dict(os.environ)
+    if not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return env
+
+
+def time_to_window():
+    """Seconds from spawning the interpreter until the window is shown"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', SHOW_WINDOW], cwd=ROOT, env=environment(),
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    line = process.stdout.readline()
+    elapsed = time.perf_counter() - start
+    process.kill()
+    process.wait()
+    if line.strip() != 'shown':
+        raise RuntimeError("The window did not start")
+    return elapsed
+
+
+def import_times():
+    """(module, nesting depth, cumulative µs) for every module imported by SWPCalculator"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import SWPCalculator'],
+                            cwd=ROOT, env=environment(), capture_output=True, text=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(cumulative)))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget', type=float, default=500.0, help="milliseconds")
+    args = parser.parse_args()
+
+    entries = import_times()
+    total = next((cumulative for name, _, cumulative in entries if name == 'SWPCalculator'), 0)
+    print(f"import SWPCalculator: {total / 1000:.0f} ms")
+    # Only what SWPCalculator imports directly, so numpy does not appear once per submodule
+    # (-X importtime lists children right before their parent)
+    index = next((i for i, e in enumerate(entries) if e[0] == 'SWPCalculator'), 0)
+    depth = entries[index][1] if entries else 0
+    direct = []
+    for entry in reversed(entries[:index]):
+        if entry[1] <= depth:
+            break
+        if entry[1] == depth + 1:
+            direct.append(entry)
+    for name, _, cumulative in sorted(direct, key=lambda e: -e[2])[:args.top]:
+        print(f"  {name:<32} {cumulative / 1000:>8.1f} ms")
+    heavy = [name for name in ('matplotlib', 'pandas') if any(e[0] == name for e in entries)]
+    if heavy:
+        print(f"  loaded eagerly: {', '.join(heavy)}")
+
+    times = [time_to_window() for _ in range(args.runs)]
+    median = statistics.median(times) * 1000
+    print(f"window shown: median {median:.0f} ms, best {min(times) * 1000:.0f} ms "
+          f"over {args.runs} runs (budget {args.budget:.0f} ms)")
+    return 0 if median <= args.budget else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,568 @@
+"""Benchmark and regression suite for the projection, display, chart and export paths.
+
+    python benchmarks/suite.py [--quick] [-k TEXT] [--save FILE] [--compare FILE]
+                               [--threshold RATIO] [--update-golden]
+
+Parity comes first: the reference loop (swp_engine.run_projection) is
+checked against the golden outputs in benchmarks/golden.json, and every
+faster path (closed form, batch engine, incremental projector, lot engine,
+zero-volatility Monte Carlo, one-fund and evenly split portfolios, a
+lifecycle without SIP) against the reference loop, and batched XIRR against
+XIRR one lifecycle at a time. Then each stage is
+timed across plan lengths (1, 10, 40 and 100 years), frequencies and
+scenario counts:
+
+    engine      run_projection, project() and incremental re-projection
+    calculate   SWPCalculator.calculate_swp until summary and table are shown
+    display     update_display followed by the table/chart refresh it schedules
+    chart       update_chart with the chart tab visible, blitted and fully redrawn
+    export      export_to_excel to .xlsx and .csv, the save dialog answered
+    batch       evaluate_batch over scenario grids
+    portfolio   evaluate_portfolios over random 3 and 10 fund portfolios
+    lifecycle   run_lifecycle (20 years of SIP, then the SWP) and batched XIRR
+
+The GUI runs headless (offscreen Qt platform when there is no display),
+with a projection cache that is not saved to disk. Each case reports the
+median time per call over ``--repeat`` samples (asv style: fast cases are
+looped until a sample takes at least 50 ms). ``--save`` writes the medians
+as a baseline and ``--compare`` fails every case slower than
+``--threshold`` times its baseline. Cases in BUDGETS also have an absolute
+limit, checked on every run: 100k batch scenarios of 30 years must take
+under a second, so every batch size runs even with ``--quick``. The exit
+status is 1 on any parity failure, regression or overrun, so CI can save a
+baseline from the target branch and compare the change against it on the
+same runner:
+
+    python benchmarks/suite.py --quick --save base.json      # target branch
+    python benchmarks/suite.py --quick --compare base.json   # the change
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from swp_batch import INPUT_KEYS, evaluate_batch, scenario_grid
+from swp_engine import DATE_FORMAT, NUMERIC_FIELDS, RESULT_COLUMNS, SWPInputs, project, run_projection
+from swp_incremental import IncrementalProjector
+from swp_lifecycle import lifecycle_xirrs, run_lifecycle
+from swp_lots import run_lot_projection
+from swp_montecarlo import MonteCarloSettings, run_monte_carlo
+from swp_policies import PATH_DEPENDENT
+from swp_portfolio import Fund, evaluate_portfolios, run_portfolio
+from swp_vectorized import run_projection_array
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden.json')
+
+PLAN_YEARS = (1, 10, 40, 100)
+FREQUENCIES = ('Monthly', 'Quarterly', 'Yearly')
+SCENARIO_COUNTS = (1000, 10000, 100000)
+PORTFOLIO_FUNDS = (3, 10)
+
+# Seconds per call a case may take on any machine, checked on every run
+BUDGETS = {'batch/evaluate_batch/100000': 1.0}
+
+BASE_VALUES = {
+    'initial_amount': 10000000.0,
+    'investment_date': '01/06/2025',
+    'swp_amount': 75000.0,
+    'swp_start_date': '01/07/2025',
+    'swp_end_date': '30/06/2035',
+    'annual_return': 12.0,
+    'frequency': 'Monthly',
+    'expense_ratio': 0.0,
+    'exit_load': 0.0,
+    'inflation_rate': 0.0,
+    'tax_rate': 0.0,
+    'date_convention': 'Same Day',
+}
+
+# Reference-loop outputs checked into golden.json; cover every input that changes the schedule
+GOLDEN_PLANS = {
+    'monthly-10y': {},
+    'quarterly-40y': {'frequency': 'Quarterly', 'swp_amount': 240000.0, 'swp_end_date': '30/06/2065'},
+    'yearly-100y': {'frequency': 'Yearly', 'swp_amount': 900000.0, 'swp_end_date': '30/06/2125'},
+    'half-yearly': {'frequency': 'Half-Yearly', 'swp_amount': 450000.0},
+    'taxed': {'tax_rate': 12.5, 'swp_end_date': '30/06/2055'},
+    'exit-load': {'exit_load': 1.0, 'investment_date': '15/03/2025'},
+    'expense-inflation': {'expense_ratio': 1.5, 'inflation_rate': 6.0, 'swp_end_date': '30/06/2050'},
+    'depleted': {'swp_amount': 150000.0, 'tax_rate': 10.0, 'exit_load': 1.0, 'swp_end_date': '30/06/2065'},
+    'overrides': {'withdrawal_overrides': {6: 500000.0, 30: 0.0, 61: 1200000.0}},
+    'end-of-month': {'date_convention': 'End of Month', 'swp_start_date': '31/01/2026'},
+    'business-day': {'date_convention': 'Business Day', 'swp_start_date': '31/08/2025'},
+    'no-growth': {'annual_return': 0.0, 'swp_amount': 50000.0},
+    'inflation-indexed': {'withdrawal_policy': 'Inflation Indexed', 'inflation_rate': 6.0,
+                          'swp_end_date': '30/06/2055'},
+    'step-up': {'withdrawal_policy': 'Annual Step-Up', 'step_up': 5.0, 'exit_load': 1.0,
+                'swp_end_date': '30/06/2055'},
+    'percent-of-corpus': {'withdrawal_policy': 'Percent of Corpus', 'corpus_rate': 7.0,
+                          'withdrawal_overrides': {18: 900000.0}, 'swp_end_date': '30/06/2055'},
+    'guardrails': {'withdrawal_policy': 'Guardrails', 'swp_amount': 90000.0, 'annual_return': 8.0,
+                   'inflation_rate': 6.0, 'swp_end_date': '30/06/2065'},
+    'guardrails-taxed': {'withdrawal_policy': 'Guardrails', 'frequency': 'Quarterly', 'swp_amount': 240000.0,
+                         'tax_rate': 10.0, 'inflation_rate': 5.0, 'swp_end_date': '30/06/2055'},
+}
+
+GOLDEN_COLUMNS = ('Opening Balance', 'SWP Amount', 'Tax', 'Closing Balance', 'Real Value')
+
+
+def with_years(values, years):
+    """``values`` with the SWP end date ``years`` after its start date"""
+    start = datetime.strptime(values['swp_start_date'], DATE_FORMAT)
+    end = start + relativedelta(years=years, days=-1)
+    return dict(values, swp_end_date=end.strftime(DATE_FORMAT))
+
+
+def plan_values(years=10, frequency='Monthly', **changes):
+    return with_years(dict(BASE_VALUES, frequency=frequency, **changes), years)
+
+
+def golden_entry(result):
+    """Summary plus every 12th row (and the last) of the reference schedule"""
+    rows = sorted(set(range(0, len(result), 12)) | {len(result) - 1}) if len(result) else []
+    return {
+        'total_withdrawn': result.total_withdrawn,
+        'remaining_corpus': result.remaining_corpus,
+        'months_sustainable': result.months_sustainable,
+        'rows': rows,
+        'dates': result.date_labels()[rows].tolist(),
+        'columns': {name: result.column(name)[rows].tolist() for name in GOLDEN_COLUMNS},
+    }
+
+
+class Parity:
+    """Collects parity failures instead of stopping at the first"""
+
+    def __init__(self):
+        self.failures = []
+        self.checks = 0
+
+    def check(self, name, ok, detail=''):
+        self.checks += 1
+        if not ok:
+            self.failures.append(f"{name}: {detail}" if detail else name)
+
+    def close(self, name, actual, expected, rtol=1e-9, atol=1e-6):
+        actual, expected = np.asarray(actual, dtype=float), np.asarray(expected, dtype=float)
+        ok = actual.shape == expected.shape and np.allclose(actual, expected, rtol=rtol, atol=atol)
+        detail = ''
+        if not ok and actual.shape == expected.shape:
+            worst = int(np.argmax(np.abs(actual - expected)))
+            detail = f"index {worst}: {actual.flat[worst]!r} != {expected.flat[worst]!r}"
+        elif not ok:
+            detail = f"shape {actual.shape} != {expected.shape}"
+        self.check(name, ok, detail)
+
+
+def check_golden(parity, update):
+    plans = {name: SWPInputs.from_values(dict(BASE_VALUES, **changes))
+             for name, changes in GOLDEN_PLANS.items()}
+    entries = {name: golden_entry(run_projection(inputs)) for name, inputs in plans.items()}
+    if update:
+        with open(GOLDEN_PATH, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=1)
+        print(f"golden outputs written to {GOLDEN_PATH}")
+        return
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        golden = json.load(f)
+    for name, expected in golden.items():
+        actual = entries.get(name)
+        if actual is None:
+            parity.check(f"golden/{name}", False, "plan no longer in GOLDEN_PLANS")
+            continue
+        parity.check(f"golden/{name}/months", actual['months_sustainable'] == expected['months_sustainable'],
+                     f"{actual['months_sustainable']} != {expected['months_sustainable']}")
+        parity.check(f"golden/{name}/dates", actual['dates'] == expected['dates'])
+        parity.close(f"golden/{name}/totals", [actual['total_withdrawn'], actual['remaining_corpus']],
+                     [expected['total_withdrawn'], expected['remaining_corpus']])
+        for column in GOLDEN_COLUMNS:
+            parity.close(f"golden/{name}/{column}", actual['columns'][column], expected['columns'][column])
+
+
+def parity_plans():
+    """Plans the faster engines must reproduce: every golden plan over a few lengths"""
+    for name, changes in GOLDEN_PLANS.items():
+        for years in (1, 10, 40):
+            yield f"{name}/{years}y", SWPInputs.from_values(with_years(dict(BASE_VALUES, **changes), years))
+
+
+def check_engines(parity):
+    plans = list(parity_plans())
+    for name, inputs in plans:
+        expected = run_projection(inputs)
+        if inputs.tax_rate == 0:
+            actual = run_projection_array(inputs)
+            parity.check(f"closed-form/{name}/months", len(actual) == len(expected))
+            for column in RESULT_COLUMNS[2:]:
+                parity.close(f"closed-form/{name}/{column}", actual.column(column), expected.column(column))
+            if not inputs.exit_load and not inputs.withdrawal_overrides and \
+                    inputs.withdrawal_policy not in PATH_DEPENDENT:
+                # The lot engine reports tax rather than deducting it, so it only
+                # matches the loop without tax and exit load
+                lots = run_lot_projection(inputs).schedule
+                parity.close(f"lots/{name}/Closing Balance", lots.closing_balance, expected.closing_balance,
+                             rtol=1e-8)
+
+        # Incremental: project a shorter plan first, then extend it and edit a late override
+        projector = IncrementalProjector()
+        shorter = SWPInputs.from_values({**inputs.to_values(), 'swp_end_date': BASE_VALUES['swp_start_date']})
+        projector.project(shorter)
+        extended = projector.project(inputs)
+        parity.check(f"incremental/{name}", all(np.array_equal(extended.column(c), expected.column(c))
+                                                 for c in RESULT_COLUMNS))
+        edited = SWPInputs.from_values({**inputs.to_values(), 'withdrawal_overrides':
+                                        {**inputs.withdrawal_overrides, max(len(expected) - 2, 1): 1.0}})
+        parity.check(f"incremental/{name}/override", all(
+            np.array_equal(projector.project(edited).column(c), run_projection(edited).column(c))
+            for c in RESULT_COLUMNS))
+
+        # A one-fund portfolio is the loop; so is a corpus split across identical
+        # funds drawn pro rata, rebalanced or not
+        same_fund = dict(annual_return=inputs.annual_return, expense_ratio=inputs.expense_ratio,
+                         exit_load=inputs.exit_load)
+        for label, funds, rebalance in (('one-fund', [Fund('only', 100, **same_fund)], "Never"),
+                                        ('split', [Fund(str(w), w, **same_fund) for w in (20, 30, 50)],
+                                         "Quarterly")):
+            portfolio = run_portfolio(inputs, funds, rebalance, "Pro Rata").schedule
+            parity.check(f"portfolio/{label}/{name}/months", len(portfolio) == len(expected))
+            if len(portfolio) == len(expected):
+                for column in RESULT_COLUMNS[2:]:
+                    parity.close(f"portfolio/{label}/{name}/{column}", portfolio.column(column),
+                                 expected.column(column))
+
+        # Without SIP or top-ups the lifecycle's SWP phase is the plan itself, as long
+        # as the lump sum goes in no earlier than the month before the SWP start
+        if (inputs.swp_start_date.year * 12 + inputs.swp_start_date.month) - \
+                (inputs.investment_date.year * 12 + inputs.investment_date.month) <= 1:
+            lifecycle = run_lifecycle(inputs).schedule
+            parity.check(f"lifecycle/{name}/months", len(lifecycle) == len(expected))
+            if len(lifecycle) == len(expected):
+                for column in RESULT_COLUMNS[2:]:
+                    parity.close(f"lifecycle/{name}/{column}", lifecycle.column(column),
+                                 expected.column(column))
+
+        if inputs.frequency == 'Monthly' and not inputs.withdrawal_overrides and len(expected):
+            settings = MonteCarloSettings(paths=64, volatility=0.0, seed=1, chunk_size=64)
+            monte_carlo = run_monte_carlo(inputs, settings)
+            sustained = expected.months_sustainable == len(expected) and \
+                expected.remaining_corpus >= inputs.swp_amount * 0.1
+            parity.check(f"monte-carlo/{name}/success", monte_carlo.success_probability == float(sustained))
+            # Percentile bands come from a log histogram, so they match to within a bin
+            n = len(expected)
+            parity.close(f"monte-carlo/{name}/median", monte_carlo.bands[50][:n], expected.closing_balance,
+                         rtol=0.01, atol=inputs.initial_amount * 1e-4)
+
+    # Batch engine: all plans without overrides in one call
+    batched = [inputs.to_values() for _, inputs in plans if not inputs.withdrawal_overrides]
+    summary = evaluate_batch({key: np.array([values[key] for values in batched],
+                                            dtype=float if key in NUMERIC_FIELDS else object)
+                              for key in INPUT_KEYS})
+    expected = [run_projection(SWPInputs.from_values(values)) for values in batched]
+    parity.check("batch/months", np.array_equal(summary.months_sustainable,
+                                                [r.months_sustainable for r in expected]))
+    parity.close("batch/total_withdrawn", summary.total_withdrawn, [r.total_withdrawn for r in expected])
+    parity.close("batch/remaining_corpus", summary.remaining_corpus, [r.remaining_corpus for r in expected])
+
+    # Portfolio batch against one portfolio at a time, mixed orders and rebalancing
+    inputs = SWPInputs.from_values(plan_values(30, tax_rate=10.0, withdrawal_policy="Guardrails"))
+    allocation, annual_return, exit_load, rebalance, order = random_portfolios(64, 3, seed=3)
+    summary = evaluate_portfolios(inputs, allocation, annual_return, 0.5, exit_load, rebalance, order)
+    singles = [run_portfolio(inputs, [Fund(str(k), allocation[p, k], annual_return[p, k], 0.5, exit_load[k])
+                                      for k in range(3)], rebalance[p], order[p])
+               for p in range(len(allocation))]
+    parity.check("portfolio-batch/months", np.array_equal(summary.months_sustainable,
+                                                          [r.schedule.months_sustainable for r in singles]))
+    parity.close("portfolio-batch/total_withdrawn", summary.total_withdrawn,
+                 [r.schedule.total_withdrawn for r in singles])
+    parity.close("portfolio-batch/fund_remaining", summary.fund_remaining, [r.fund_remaining for r in singles])
+
+    # Batched XIRR against one lifecycle at a time
+    lifecycles = sip_lifecycles(32, seed=5)
+    rates = lifecycle_xirrs(lifecycles)
+    parity.close("xirr/batched", rates, [lifecycle.xirr for lifecycle in lifecycles], rtol=1e-9, atol=1e-12)
+    parity.check("xirr/solved", bool(np.all(np.isfinite(rates))))
+
+
+def sip_lifecycles(count, seed=0, years=20):
+    """``count`` lifecycles: ``years`` of SIP at random amounts and returns, then the base SWP"""
+    rng = np.random.default_rng(seed)
+    values = plan_values(30, investment_date='01/07/2005', tax_rate=10.0)
+    lifecycles = []
+    for annual_return, sip in zip(rng.uniform(6, 14, count), rng.uniform(10000, 50000, count)):
+        inputs = SWPInputs.from_values(dict(values, initial_amount=0.0, annual_return=float(annual_return)))
+        lifecycles.append(run_lifecycle(inputs, sip_amount=float(sip),
+                                        sip_start_date=datetime(2025 - years, 7, 1)))
+    return lifecycles
+
+
+def random_portfolios(count, n_funds, seed=0):
+    """Allocations, returns and exit loads (liquid first, equity last), rebalancing and orders"""
+    rng = np.random.default_rng(seed)
+    allocation = rng.uniform(0, 100, (count, n_funds))
+    annual_return = np.sort(rng.uniform(4, 14, (count, n_funds)), axis=1)
+    exit_load = np.linspace(0, 1, n_funds)
+    rebalance = rng.choice(["Never", "Yearly", "Quarterly"], count)
+    order = rng.choice(["Waterfall", "Pro Rata"], count)
+    return allocation, annual_return, exit_load, rebalance, order
+
+
+def measure(func, repeat, min_sample=0.05):
+    """Median seconds per call of ``func()`` over ``repeat`` samples"""
+    func() # warm-up: imports, caches, first draw
+    timer = timeit.Timer(func)
+    number, elapsed = 1, timer.timeit(1)
+    while elapsed < min_sample:
+        number *= 10
+        elapsed = timer.timeit(number)
+    samples = [elapsed / number] + [timer.timeit(number) / number for _ in range(repeat - 1)]
+    return statistics.median(samples)
+
+
+def engine_cases(years_list, frequencies):
+    cases = []
+    for years in years_list:
+        for frequency in frequencies:
+            for taxed in (False, True):
+                inputs = SWPInputs.from_values(plan_values(years, frequency, tax_rate=10.0 if taxed else 0.0))
+                suffix = f"{years}y/{frequency}" + ("/tax" if taxed else "")
+                cases.append((f"engine/run_projection/{suffix}", lambda i=inputs: run_projection(i)))
+                cases.append((f"engine/project/{suffix}", lambda i=inputs: project(i)))
+        inputs = SWPInputs.from_values(plan_values(years, tax_rate=10.0))
+        longer = SWPInputs.from_values(plan_values(years + 1, tax_rate=10.0))
+        projector = IncrementalProjector()
+
+        def extend(projector=projector, inputs=inputs, longer=longer):
+            projector.project(inputs)
+            projector.project(longer)
+        cases.append((f"engine/incremental-extend/{years}y", extend))
+    return cases
+
+
+def batch_cases(counts):
+    cases = []
+    for count in counts:
+        side = int(round(count ** 0.5))
+        grid = scenario_grid(plan_values(30), annual_return=np.linspace(4, 16, side),
+                             swp_amount=np.linspace(30000, 150000, count // side))
+        cases.append((f"batch/evaluate_batch/{count}", lambda g=grid: evaluate_batch(g)))
+    return cases
+
+
+def portfolio_cases(counts):
+    inputs = SWPInputs.from_values(plan_values(30))
+    cases = []
+    for count in counts:
+        for n_funds in PORTFOLIO_FUNDS:
+            allocation, annual_return, exit_load, rebalance, order = random_portfolios(count, n_funds)
+            cases.append((f"portfolio/evaluate_portfolios/{count}x{n_funds}",
+                          lambda a=allocation, r=annual_return, e=exit_load, b=rebalance, o=order:
+                          evaluate_portfolios(inputs, a, r, 0.5, e, b, o)))
+    return cases
+
+
+def lifecycle_cases(counts):
+    inputs = SWPInputs.from_values(plan_values(30, investment_date='01/07/2005', initial_amount=0.0))
+    cases = [("lifecycle/run_lifecycle/20y+30y",
+              lambda: run_lifecycle(inputs, sip_amount=25000.0, sip_start_date=datetime(2005, 7, 1)))]
+    for count in counts:
+        lifecycles = sip_lifecycles(count)
+        cases.append((f"lifecycle/lifecycle_xirrs/{count}", lambda l=lifecycles: lifecycle_xirrs(l)))
+    return cases
+
+
+class Window:
+    """A headless SWPCalculator plus helpers to drive it synchronously"""
+
+    def __init__(self):
+        if not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+            os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt5.QtWidgets import QApplication
+        self.app = QApplication.instance() or QApplication(sys.argv[:1])
+        import SWPCalculator
+        from swp_cache import ProjectionCache
+        self.module = SWPCalculator
+        self.window = SWPCalculator.SWPCalculator()
+        self.window.projection_cache = ProjectionCache(maxsize=64) # Never saved to disk
+        self.window.show()
+        self.settle()
+
+    def settle(self):
+        """Process events until no calculation, refresh or export is pending"""
+        window = self.window
+        while True:
+            self.app.processEvents()
+            busy = (window.calculation_runner.is_running() or window.export_runner.is_running()
+                    or window.details_timer.isActive())
+            if not busy:
+                return
+            window.calculation_runner.wait(5)
+            window.export_runner.wait(5)
+
+    def set_plan(self, values):
+        window = self.window
+        window.additional_params_checkbox.setChecked(True)
+        for name, value in values.items():
+            field = window.input_fields.get(name) or window.additional_input_fields.get(name)
+            if field is None:
+                continue
+            if hasattr(field, 'setCurrentText'):
+                field.setCurrentText(str(value))
+            else:
+                field.setText(str(value))
+        self.settle()
+
+    def show_tab(self, chart):
+        window = self.window
+        window.tab_widget.setCurrentWidget(window.chart_tab if chart else window.tab_widget.widget(0))
+        self.settle()
+
+    def calculate(self):
+        """calculate_swp from scratch: no cached result or checkpoint to reuse"""
+        window = self.window
+        window.projection_cache.clear()
+        window.projector = IncrementalProjector()
+        window.calculate_swp()
+        self.settle()
+
+    def display(self, result):
+        self.window.update_display(result)
+        self.settle()
+
+    def export(self, path):
+        """export_to_excel with the save dialog answered and the message boxes suppressed"""
+        module = self.module
+        with mock.patch.object(module.QFileDialog, 'getSaveFileName', return_value=(path, '')), \
+                mock.patch.object(module.QMessageBox, 'information'), \
+                mock.patch.object(module.QMessageBox, 'critical') as critical:
+            self.window.export_to_excel()
+            self.settle()
+        if critical.called:
+            raise RuntimeError(critical.call_args[0][2])
+
+
+def gui_cases(years_list, frequencies, directory):
+    gui = Window()
+    window = gui.window
+    cases = []
+    # Each case is (show the chart tab?, plan to calculate first, callable to time)
+    for years in years_list:
+        for frequency in frequencies:
+            values = plan_values(years, frequency, tax_rate=10.0)
+            cases.append((f"calculate/calculate_swp/{years}y/{frequency}", (False, values, gui.calculate)))
+
+        values = plan_values(years)
+        result = project(SWPInputs.from_values(values))
+        # Alternating with a plan twice as long changes the x limits, forcing full redraws
+        alternating = itertools.cycle([project(SWPInputs.from_values(plan_values(years * 2))), result])
+        cases.append((f"display/update_display/{years}y", (False, values, lambda r=result: gui.display(r))))
+        cases.append((f"chart/update_chart-blit/{years}y", (True, values, lambda r=result: window.update_chart(r))))
+        cases.append((f"chart/update_chart-redraw/{years}y",
+                      (True, values, lambda a=alternating: window.update_chart(next(a)))))
+        for extension in ('.xlsx', '.csv'):
+            path = os.path.join(directory, f"export{extension}")
+            cases.append((f"export/export_to_excel{extension}/{years}y",
+                          (False, values, lambda p=path: gui.export(p))))
+    return gui, cases
+
+
+def compare(timings, baseline_path, threshold):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['timings']
+    regressions = []
+    for name, seconds in timings.items():
+        if name in baseline and baseline[name] > 0 and seconds > baseline[name] * threshold:
+            regressions.append((name, baseline[name], seconds))
+    return regressions
+
+
+def over_budget(timings):
+    return [(name, BUDGETS[name], seconds) for name, seconds in timings.items()
+            if name in BUDGETS and seconds > BUDGETS[name]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true',
+                        help="1 and 40 year plans, monthly only, 1000/10000 scenarios "
+                             "(all batch sizes, for the budget)")
+    parser.add_argument('-k', dest='pattern', default='', help="only run cases containing this text")
+    parser.add_argument('--repeat', type=int, default=5, help="samples per case (default 5)")
+    parser.add_argument('--save', help="write the timings to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file written by --save")
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help="fail cases slower than this many times their baseline (default 1.5)")
+    parser.add_argument('--update-golden', action='store_true',
+                        help="rewrite golden.json from the reference loop and exit")
+    parser.add_argument('--no-gui', action='store_true', help="skip the Qt stages")
+    args = parser.parse_args()
+
+    parity = Parity()
+    check_golden(parity, args.update_golden)
+    if args.update_golden:
+        return 0
+    check_engines(parity)
+    print(f"parity: {parity.checks - len(parity.failures)}/{parity.checks} checks passed")
+    for failure in parity.failures:
+        print(f"  FAIL {failure}")
+
+    years_list = (1, 40) if args.quick else PLAN_YEARS
+    frequencies = ('Monthly',) if args.quick else FREQUENCIES
+
+    timings = {}
+
+    def run_cases(cases, prepare=None):
+        for name, case in cases:
+            if args.pattern not in name:
+                continue
+            if prepare is not None:
+                case = prepare(case)
+            timings[name] = measure(case, args.repeat)
+            print(f"{name:<48} {timings[name] * 1e3:>10.3f} ms")
+
+    run_cases(engine_cases(years_list, frequencies))
+    run_cases(batch_cases(SCENARIO_COUNTS))
+    run_cases(portfolio_cases(SCENARIO_COUNTS[:2]))
+    run_cases(lifecycle_cases(SCENARIO_COUNTS[:2]))
+    if not args.no_gui:
+        with tempfile.TemporaryDirectory() as directory:
+            gui, cases = gui_cases(years_list, frequencies, directory)
+
+            def prepare(case):
+                chart, values, func = case
+                gui.set_plan(values)
+                gui.show_tab(chart)
+                gui.calculate()
+                return func
+            run_cases(cases, prepare)
+            gui.window.close()
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'numpy': np.__version__,
+                       'machine': platform.machine(), 'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                       'timings': timings}, f, indent=1)
+    regressions = compare(timings, args.compare, args.threshold) if args.compare else []
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before * 1e3:.3f} ms -> {after * 1e3:.3f} ms "
+              f"({after / before:.2f}x, threshold {args.threshold:.2f}x)")
+    overruns = over_budget(timings)
+    for name, budget, seconds in overruns:
+        print(f"OVER BUDGET {name}: {seconds * 1e3:.3f} ms (budget {budget * 1e3:.0f} ms)")
+    return 1 if parity.failures or regressions or overruns else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
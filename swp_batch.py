@@ -0,0 +1,386 @@
+"""Batch evaluation of many SWP scenarios at once.
+
+Inputs use the same keys as SWPCalculator.get_input_values, but each value
+may be a scalar or an array; values are broadcast together NumPy-style and
+every scenario is projected over a (scenario, month) matrix. Only the summary
+figures are returned, so the full schedules are never kept in memory.
+
+Scenarios whose withdrawals follow a fixed schedule (Fixed, Inflation
+Indexed, Annual Step-Up) and are not taxed use the closed form. Tax and the
+balance-dependent policies (Percent of Corpus, Guardrails) are stepped month
+by month across all such scenarios at once.
+"""
+from dataclasses import dataclass
+from itertools import product
+
+import numpy as np
+
+from swp_calendar import DATE_CONVENTIONS, withdrawal_calendar
+from swp_engine import FREQ_MAP, parse_date
+from swp_policies import POLICY_YEAR, WITHDRAWAL_POLICIES, Guardrails
+
+INPUT_KEYS = ('initial_amount', 'investment_date', 'swp_amount', 'swp_start_date',
+              'swp_end_date', 'annual_return', 'frequency', 'expense_ratio',
+              'exit_load', 'inflation_rate', 'tax_rate', 'date_convention',
+              'withdrawal_policy', 'step_up', 'corpus_rate', 'guardrail_band', 'guardrail_step')
+
+DEFAULTS = {'frequency': "Monthly", 'expense_ratio': 0.0, 'exit_load': 0.0,
+            'inflation_rate': 0.0, 'tax_rate': 0.0, 'date_convention': "Same Day",
+            'withdrawal_policy': "Fixed", 'step_up': 0.0, 'corpus_rate': 0.0,
+            'guardrail_band': 20.0, 'guardrail_step': 10.0}
+
+# Scenario x month cells processed per chunk; keeps each matrix around 16 MB
+CHUNK_CELLS = 1 << 21
+
+
+@dataclass
+class BatchSummary:
+    """Per-scenario summary vectors, shaped like the broadcast inputs"""
+    total_withdrawn: np.ndarray
+    remaining_corpus: np.ndarray
+    months_sustainable: np.ndarray
+    real_remaining_corpus: np.ndarray
+
+    def __len__(self):
+        return self.months_sustainable.size
+
+
+def scenario_grid(base_values, **axes):
+    """Cartesian product of ``axes`` over ``base_values``, as flat arrays.
+
+    >>> grid = scenario_grid(values, annual_return=[8, 10, 12], swp_amount=[50000, 75000])
+    """
+    names = list(axes)
+    combos = list(product(*(axes[name] for name in names)))
+    grid = dict(base_values)
+    for i, name in enumerate(names):
+        grid[name] = np.array([combo[i] for combo in combos])
+    return grid
+
+
+def _unique_dates(values):
+    """Parse an array of dates once per distinct value: (parsed uniques, inverse)"""
+    uniques, first, inverse = np.unique(values.astype(str), return_index=True,
+                                        return_inverse=True)
+    return [parse_date(values[i]) for i in first], inverse.ravel()
+
+
+def _broadcast_inputs(values):
+    missing = [k for k in INPUT_KEYS if k not in values and k not in DEFAULTS]
+    if missing:
+        raise ValueError(f"Missing batch inputs: {', '.join(missing)}")
+    arrays = [np.asarray(values.get(k, DEFAULTS.get(k)), dtype=object) for k in INPUT_KEYS]
+    arrays = np.broadcast_arrays(*arrays)
+    shape = arrays[0].shape
+    return shape, {k: a.ravel() for k, a in zip(INPUT_KEYS, arrays)}
+
+
+def _check_scenarios(flat, frequencies, freq_index):
+    """The message SWPInputs would reject each scenario with (or None), and a mask of those rejected.
+
+    ``frequencies`` and ``freq_index`` are np.unique of the frequency column.
+    """
+    count = flat['initial_amount'].size
+    errors = np.full(count, None, dtype=object)
+    rejected = np.zeros(count, dtype=bool)
+
+    def reject(mask, message):
+        mask = mask & ~rejected
+        errors[mask] = message
+        rejected[mask] = True
+
+    def reject_unknown(key, known, label):
+        # A set of the plain values is much cheaper than np.unique on strings
+        for name in sorted({str(v) for v in set(flat[key].tolist())} - set(known)):
+            reject(flat[key].astype(str) == name, f"Unknown {label}: {name!r}")
+
+    for i, name in enumerate(frequencies.tolist()):
+        if name not in FREQ_MAP:
+            reject(freq_index == i, f"Unknown SWP frequency: {name!r}")
+    reject_unknown('date_convention', DATE_CONVENTIONS, "date convention")
+    annual_return = flat['annual_return'].astype(float)
+    expense_ratio = flat['expense_ratio'].astype(float)
+    reject(1 + (annual_return - expense_ratio) / 100 <= 0,
+           "Annual return net of expense ratio must be above -100%")
+    reject(flat['inflation_rate'].astype(float) <= -100, "Inflation rate must be above -100%")
+    reject_unknown('withdrawal_policy', WITHDRAWAL_POLICIES, "withdrawal policy")
+    reject(flat['step_up'].astype(float) <= -100, "Annual step-up must be above -100%")
+    # Unknown frequencies are already rejected; any factor will do for them
+    per_year = np.array([FREQ_MAP.get(f, 12) for f in frequencies.tolist()], dtype=float)[freq_index]
+    corpus_rate = flat['corpus_rate'].astype(float)
+    reject((corpus_rate < 0) | (corpus_rate > 100 * per_year),
+           "Percent of corpus must be between 0% and 100% of the balance per withdrawal")
+    band = flat['guardrail_band'].astype(float)
+    adjustment = flat['guardrail_step'].astype(float)
+    reject((band < 0) | (band >= 100) | (adjustment < 0) | (adjustment >= 100),
+           "Guardrail band and adjustment must be between 0% and 100%")
+    return errors, rejected
+
+
+def scenario_errors(values):
+    """Per-scenario error message (or None) for the inputs evaluate_batch would reject.
+
+    Checked in the same order as SWPInputs, so a plan fails with the message
+    it would get on its own; flat, like the broadcast inputs.
+    """
+    _, flat = _broadcast_inputs(values)
+    frequencies, freq_index = np.unique(flat['frequency'].astype(str), return_inverse=True)
+    return _check_scenarios(flat, frequencies, freq_index.ravel())[0].tolist()
+
+
+def evaluate_batch(values):
+    """Project every scenario in ``values`` and return a BatchSummary"""
+    shape, flat = _broadcast_inputs(values)
+    count = flat['initial_amount'].size
+
+    initial = flat['initial_amount'].astype(float)
+    swp = flat['swp_amount'].astype(float)
+    annual_return = flat['annual_return'].astype(float)
+    expense_ratio = flat['expense_ratio'].astype(float)
+    exit_load = flat['exit_load'].astype(float) / 100
+    inflation = flat['inflation_rate'].astype(float)
+    tax_rate = flat['tax_rate'].astype(float)
+
+    frequencies, freq_index = np.unique(flat['frequency'].astype(str), return_inverse=True)
+    freq_index = freq_index.ravel()
+    errors, rejected = _check_scenarios(flat, frequencies, freq_index)
+    if rejected.any():
+        raise ValueError(errors[rejected.argmax()])
+    interval = np.array([12 // FREQ_MAP[f] for f in frequencies], dtype=np.int64)[freq_index]
+
+    gross = 1 + (annual_return - expense_ratio) / 100
+    log_growth = np.log(gross) / 12
+    monthly_return = np.expm1(log_growth)
+    log_inflation = np.log1p(inflation / 100) / 12
+
+    policy = flat['withdrawal_policy']
+    step_up = flat['step_up'].astype(float)
+    corpus_rate = flat['corpus_rate'].astype(float)
+    band = flat['guardrail_band'].astype(float)
+    adjustment = flat['guardrail_step'].astype(float)
+    per_year = 12 / interval
+    # Yearly growth of scheduled amounts, as swp_policies.annual_factor
+    factor = np.where(policy == "Inflation Indexed", 1 + inflation / 100,
+                      np.where(policy == "Annual Step-Up", 1 + step_up / 100, 1.0))
+    percent = policy == "Percent of Corpus"
+    guarded = policy == "Guardrails"
+
+    # Month counts and exit-load windows depend only on the dates, so work them
+    # out once per distinct (start, end, investment, convention) combination
+    starts, start_index = _unique_dates(flat['swp_start_date'])
+    ends, end_index = _unique_dates(flat['swp_end_date'])
+    investments, investment_index = _unique_dates(flat['investment_date'])
+    conventions, convention_index = np.unique(flat['date_convention'].astype(str),
+                                              return_inverse=True)
+    combo = (((start_index * len(ends) + end_index) * len(investments) + investment_index)
+             * len(conventions) + convention_index.ravel())
+    combos, combo_index = np.unique(combo, return_inverse=True)
+    n_unique = np.empty(len(combos), dtype=np.int64)
+    load_unique = np.empty(len(combos), dtype=np.int64)
+    for j, code in enumerate(combos.tolist()):
+        code, i_conv = divmod(code, len(conventions))
+        code, i_inv = divmod(code, len(investments))
+        i_start, i_end = divmod(code, len(ends))
+        calendar = withdrawal_calendar(starts[i_start], ends[i_end], 1, str(conventions[i_conv]))
+        n_unique[j] = len(calendar)
+        load_unique[j] = calendar.exit_load_months(investments[i_inv])
+    n_months = n_unique[combo_index.ravel()]
+    load_months = load_unique[combo_index.ravel()]
+
+    total = np.zeros(count)
+    remaining = initial.copy()
+    months = np.zeros(count, dtype=np.int64)
+
+    # Tax on gains and balance-dependent policies are path dependent; those
+    # scenarios are stepped month by month
+    stepped = (tax_rate != 0) | percent | guarded
+    active = np.flatnonzero(~stepped & (initial > 0) & (n_months > 0))
+
+    if active.size:
+        span = int(n_months[active].max())
+        chunk = max(1, CHUNK_CELLS // span)
+        log_factor = np.log(factor)
+        for lo in range(0, active.size, chunk):
+            idx = active[lo:lo + chunk]
+            t, rem, m = _project_chunk(initial[idx], swp[idx], log_growth[idx],
+                                       monthly_return[idx], exit_load[idx], interval[idx],
+                                       n_months[idx], load_months[idx], log_factor[idx])
+            total[idx], remaining[idx], months[idx] = t, rem, m
+
+    stepped = np.flatnonzero(stepped)
+    if stepped.size:
+        # Same monthly return expression as SWPInputs.monthly_return, for identical results
+        stepped_return = (1 + annual_return[stepped] / 100 - expense_ratio[stepped] / 100) ** (1/12) - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            initial_rate = np.where(initial > 0, swp * per_year / initial, 0.0)
+        rules = Guardrails(initial_rate, inflation / 100, band / 100, adjustment / 100, per_year)
+        t, rem, m = _project_lanes(initial[stepped], swp[stepped], stepped_return, exit_load[stepped],
+                                   tax_rate[stepped] / 100, interval[stepped], n_months[stepped],
+                                   load_months[stepped], factor[stepped],
+                                   np.where(percent, corpus_rate / 100 / per_year, np.nan)[stepped],
+                                   guarded[stepped], rules.take(stepped))
+        total[stepped], remaining[stepped], months[stepped] = t, rem, m
+
+    real_remaining = remaining * np.exp(-log_inflation * np.maximum(months - 1, 0))
+    return BatchSummary(total.reshape(shape), remaining.reshape(shape),
+                        months.reshape(shape), real_remaining.reshape(shape))
+
+
+def _project_chunk(initial, swp, log_growth, monthly_return, exit_load, interval,
+                   n_months, load_months, log_factor):
+    """Closed-form projection of a block of scenarios.
+
+    With ``D[k] = sum(w[j] * f[j] / G[j] for withdrawal months j <= k)``,
+    where ``f`` is the yearly growth of the amount raised to the policy
+    year, the closing balance is ``G[k] * (b0 - swp * D[k])``; exit load
+    adds ``load * min(D[k], D[L])``. D only depends on the return, the
+    withdrawal frequency and the yearly factor, so it is built once per
+    distinct key rather than per scenario.
+
+    A withdrawal stops the plan when ``b0 / swp < D[k] + 0.1 / G[k]``. After
+    the exit-load window the load already paid only shifts ``b0 / swp``, so
+    the first such month is found by bisection on the running maximum of
+    the right-hand side, kept per key (the window length is part of the
+    key). The few months inside the window are checked directly.
+    """
+    span = int(n_months.max())
+    k = np.arange(1, span + 1)
+    rows = np.arange(len(initial))
+    window = np.where(exit_load != 0, load_months, 0)
+
+    # Amounts that never grow leave the factor out of the key
+    keys = [log_growth, interval, window] + ([log_factor] if np.any(log_factor) else [])
+    pairs, pair_index = np.unique(np.stack(keys), axis=1, return_inverse=True)
+    pair_index = pair_index.ravel()
+    pair_growth = np.exp(np.multiply.outer(pairs[0], k))                # (1 + r) ** k
+    pair_withdrawal = (k % pairs[1].astype(np.int64)[:, None]) == 0
+    scaled = len(keys) == 4
+    if scaled:
+        pair_scale = np.exp(np.multiply.outer(pairs[3], (k - 1) // POLICY_YEAR))
+        pair_amount = pair_withdrawal * pair_scale
+    else:
+        pair_amount = pair_withdrawal
+    pair_cumulative = np.cumsum(pair_amount / pair_growth, axis=1)
+    after_window = pair_withdrawal & (k > pairs[2].astype(np.int64)[:, None])
+    pair_peak = np.maximum.accumulate(
+        np.where(after_window, pair_cumulative + 0.1 / pair_growth, -np.inf), axis=1)
+
+    load_end = np.where(load_months > 0, pair_cumulative[pair_index, np.maximum(load_months - 1, 0)], 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Plans that withdraw nothing never stop
+        ratio = np.where(swp > 0, initial / swp, np.inf)
+    target = ratio - exit_load * load_end
+
+    # First withdrawal month after the window leaving less than 10% of an SWP
+    lo = np.zeros(len(initial), dtype=np.int64)
+    hi = n_months.astype(np.int64)
+    for _ in range(span.bit_length()):
+        mid = (lo + hi) // 2
+        over = pair_peak[pair_index, np.minimum(mid, span - 1)] > target
+        searching = lo < hi
+        hi = np.where(searching & over, mid, hi)
+        lo = np.where(searching & ~over, mid + 1, lo)
+    stopped = lo < n_months
+    months = np.where(stopped, lo + 1, n_months)
+
+    loaded = np.flatnonzero(window > 0)
+    if loaded.size:
+        # Months inside the exit-load window, where the load scales every withdrawal
+        width = int(window[loaded].max())
+        inside = pair_index[loaded]
+        closing = ((initial[loaded, None] - swp[loaded, None] * (1 + exit_load[loaded, None]) *
+                    pair_cumulative[inside, :width]) * pair_growth[inside, :width])
+        stop = ((closing < swp[loaded, None] * 0.1) & pair_withdrawal[inside, :width] &
+                (k[:width] <= np.minimum(window[loaded], n_months[loaded])[:, None]))
+        early = stop.any(axis=1)
+        months[loaded[early]] = stop[early].argmax(axis=1) + 1
+        stopped[loaded[early]] = True
+
+    def closing_at(index):
+        cumulative = pair_cumulative[pair_index, index]
+        cumulative = cumulative + exit_load * np.minimum(cumulative, load_end)
+        return (initial - swp * cumulative) * pair_growth[pair_index, index]
+
+    last = months - 1
+    remaining = closing_at(last)
+    if scaled:
+        total = swp * np.cumsum(pair_amount, axis=1)[pair_index, last]
+        last_amount = swp * pair_scale[pair_index, last]
+    else:
+        total = swp * (months // interval)
+        last_amount = swp
+
+    # A depleting final withdrawal only pays what the balance covers net of exit load
+    opening = np.where(last > 0, closing_at(np.maximum(last - 1, 0)), initial)
+    after_growth = opening * (1 + monthly_return)
+    last_load = 1 + np.where(months <= load_months, exit_load, 0.0)
+    capped = stopped & (after_growth < last_amount * last_load)
+    total = np.where(capped, total - last_amount + after_growth / last_load, total)
+    remaining = np.where(capped, 0.0, remaining)
+    return total, remaining, months
+
+
+def _project_lanes(initial, swp, monthly_return, exit_load, tax_rate, interval, n_months,
+                   load_months, factor, share, guarded, rules):
+    """run_projection's month loop, stepped for every path-dependent scenario at once.
+
+    Each scenario is a lane in the arrays and performs the same arithmetic,
+    in the same order, as the loop does for it, so the results match
+    run_projection exactly. Lanes drop out when their plan stops.
+    ``share`` is the fraction of the balance each withdrawal takes under
+    Percent of Corpus (NaN for other policies); ``rules`` holds the
+    Guardrails of every lane and applies where ``guarded``.
+    """
+    balance = initial.copy()
+    invested = initial.copy() # Initial investment remaining, for capital gain calculation
+    total = np.zeros(len(initial))
+    months = np.zeros(len(initial), dtype=np.int64)
+    lanes = np.flatnonzero((initial > 0) & (n_months > 0))
+    percent = ~np.isnan(share)
+    guardrails = guarded.any()
+    current = swp.copy()    # Guardrails: current withdrawal
+    year_growth = np.zeros(len(initial))
+
+    k = 0
+    while lanes.size:
+        k += 1
+        opening = balance[lanes]
+        growth = opening * monthly_return[lanes]
+        after_growth = opening + growth
+        months[lanes] = k
+        if guardrails:
+            if k > 1 and (k - 1) % POLICY_YEAR == 0:
+                g = lanes[guarded[lanes]]
+                current[g] = rules.take(g).apply(current[g], balance[g], year_growth[g])
+                year_growth[g] = 0.0
+            year_growth[lanes] += growth
+
+        withdrawal = k % interval[lanes] == 0
+        w = lanes[withdrawal]
+        after = after_growth[withdrawal]
+        due = swp[w] * np.power(factor[w], (k - 1) // POLICY_YEAR)
+        due = np.where(percent[w], share[w] * after, due)
+        if guardrails:
+            due = np.where(guarded[w], current[w], due)
+        actual = np.minimum(due, after)
+        held = invested[w]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gain_ratio = np.where(after > 0, (after - held) / after, 0.0)
+        capital_gain = np.where(held > 0, actual * gain_ratio, actual)
+        tax = capital_gain * tax_rate[w]
+        load = np.where(k <= load_months[w], actual * exit_load[w], 0.0)
+        deductions = actual + tax + load
+        covered = after >= deductions
+        paid = np.where(covered, actual, after / (1 + tax_rate[w] + exit_load[w]))
+        balance[w] = np.where(covered, after - deductions, 0.0)
+        total[w] += paid
+        invested[w] = held - paid
+        balance[lanes[~withdrawal]] = after_growth[~withdrawal]
+
+        # Same stopping rules as the loop: low balance on a withdrawal month,
+        # an empty portfolio or the end of the horizon
+        stopped = np.zeros(lanes.size, dtype=bool)
+        stopped[withdrawal] = balance[w] < swp[w] * 0.1
+        stopped |= (balance[lanes] <= 0) | (k >= n_months[lanes])
+        lanes = lanes[~stopped]
+    return total, balance, months
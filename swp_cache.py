@@ -0,0 +1,178 @@
+"""LRU cache of projection results keyed on normalized inputs.
+
+Two SWPInputs that describe the same plan (e.g. "15" and "15.0" typed into
+the return field) hash to the same key, so flipping back to an earlier
+parameter set returns the stored result instead of recomputing it. The
+cache can optionally be saved to disk and reloaded in the next session.
+
+Saved caches are an .npz archive of the results' NumPy columns plus a JSON
+index of their plain fields, read back with pickling disabled: loading a
+file only ever rebuilds the result dataclasses the cache was given, so a
+tampered file cannot run code.
+"""
+import hashlib
+import json
+import numbers
+import os
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+
+import numpy as np
+
+# Bump when engine output changes so stale on-disk entries are discarded
+CACHE_VERSION = 2
+
+
+def _normalize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, numbers.Real):
+        return repr(float(value) + 0.0) # + 0.0 folds -0.0 into 0.0
+    if is_dataclass(value):
+        return {f.name: _normalize(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return sorted([_normalize(k), _normalize(v)] for k, v in value.items())
+    if hasattr(value, 'tobytes'):
+        # NumPy arrays: hash the contents rather than their truncated repr
+        return hashlib.sha256(value.tobytes()).hexdigest()
+    return repr(value)
+
+
+def cache_key(inputs, *extra):
+    """Canonical hash of an SWPInputs (plus any extra context, e.g. Monte Carlo settings)"""
+    payload = {'inputs': _normalize(inputs), 'extra': _normalize(extra)}
+    encoded = json.dumps(payload, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _encode(value, arrays):
+    """JSON-ready description of ``value``; its arrays are added to ``arrays``"""
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError("Object arrays cannot be saved")
+        name = f"a{len(arrays)}"
+        arrays[name] = value
+        return {'array': name}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return {'value': value}
+    if isinstance(value, dict):
+        return {'dict': [[_encode(k, arrays), _encode(v, arrays)] for k, v in value.items()]}
+    if is_dataclass(value):
+        return {'type': type(value).__name__,
+                'fields': {f.name: _encode(getattr(value, f.name), arrays) for f in fields(value)}}
+    raise TypeError(f"Cannot save {type(value).__name__}")
+
+
+def _decode(item, data, types):
+    if 'array' in item:
+        return data[item['array']]
+    if 'value' in item:
+        return item['value']
+    if 'dict' in item:
+        return {_decode(k, data, types): _decode(v, data, types) for k, v in item['dict']}
+    values = {name: _decode(v, data, types) for name, v in item['fields'].items()}
+    return types[item['type']](**values)
+
+
+class ProjectionCache:
+    """Size-bounded LRU mapping cache_key -> result, with hit/miss counters.
+
+    ``types`` are the result dataclasses save() writes and load() rebuilds;
+    other entries are kept in memory only.
+    """
+
+    def __init__(self, maxsize=64, path=None, types=()):
+        self.maxsize = maxsize
+        self.path = path
+        self.types = {t.__name__: t for t in types}
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        if path:
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_or_compute(self, inputs, compute, *extra):
+        """Return the cached result for ``inputs`` or store ``compute(inputs)``"""
+        key = cache_key(inputs, *extra)
+        result = self.get(key)
+        if result is None:
+            result = compute(inputs)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def load(self):
+        """Read entries saved by save(); unreadable or stale files are ignored"""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                index = json.loads(str(data['index']))
+                if index['version'] != CACHE_VERSION:
+                    return
+                entries = [(key, _decode(item, data, self.types)) for key, item in index['entries']]
+        except Exception:
+            return # The cache is only an optimisation; a damaged or foreign file is not an error
+        for key, value in entries:
+            self.put(key, value)
+
+    def save(self):
+        """Write the entries (most recently used last) to ``path``"""
+        if not self.path:
+            return
+        arrays, entries = {}, []
+        for key, value in self._entries.items():
+            if not (is_dataclass(value) and type(value).__name__ in self.types):
+                continue
+            saved = dict(arrays)
+            try:
+                entries.append([key, _encode(value, saved)])
+            except TypeError:
+                continue
+            arrays = saved
+        index = json.dumps({'version': CACHE_VERSION, 'entries': entries})
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.savez(f, index=np.array(index), **arrays)
+        os.replace(temp_path, self.path)
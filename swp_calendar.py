@@ -0,0 +1,134 @@
+"""Withdrawal calendars shared by every projection over the same dates.
+
+The dates a plan visits depend only on its start and end dates and the
+date convention, and which months pay out only on the frequency, so they
+are worked out once with NumPy and cached: scenarios that differ only in
+amounts or rates share one WithdrawalCalendar instead of stepping dates
+with relativedelta and formatting them month after month.
+
+Date conventions:
+
+    Same Day      the start day in every month, clipped to shorter months
+                  and kept from then on (31 Jan -> 28 Feb -> 28 Mar), as
+                  repeated relativedelta(months=1) steps do
+    End of Month  the last day of every month
+    Business Day  the Same Day date moved to the next weekday, or to the
+                  previous one if that would cross into the next month
+                  ("modified following")
+"""
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+DATE_CONVENTIONS = ("Same Day", "End of Month", "Business Day")
+
+# Per-calendar memo entries (exit-load masks, inflation factors) kept at most
+MEMO_SIZE = 32
+
+# Calendars are shared between worker threads
+_memo_lock = threading.Lock()
+
+
+def month_ordinal(date):
+    """Months since year 0: ``year * 12 + month - 1``"""
+    return date.year * 12 + date.month - 1
+
+
+def check_convention(convention):
+    if convention not in DATE_CONVENTIONS:
+        raise ValueError(f"Unknown date convention: {convention!r}")
+
+
+def month_days(ordinals, start_day, convention="Same Day"):
+    """Day of month for consecutive month ordinals beginning with the plan's first month"""
+    first = (np.asarray(ordinals, dtype=np.int64) - 1970 * 12).astype('datetime64[M]')
+    first_days = first.astype('datetime64[D]')
+    lengths = ((first + 1).astype('datetime64[D]') - first_days).astype(np.int64)
+    if convention == "End of Month" or not len(lengths):
+        return lengths
+    days = np.minimum.accumulate(np.minimum(lengths, start_day))
+    if convention == "Business Day":
+        rolled = np.busday_offset(first_days + (days - 1), 0, roll='modifiedfollowing')
+        days = (rolled - first_days).astype(np.int64) + 1
+    return days
+
+
+@lru_cache(maxsize=256)
+def _month_dates(start, end, convention):
+    """Read-only (dates as datetime64[D], month ordinals) from ``start`` up to ``end``"""
+    check_convention(convention)
+    first = month_ordinal(start)
+    count = max(month_ordinal(end) - first + 1, 0)
+    ordinals = np.arange(first, first + count, dtype=np.int64)
+    month_starts = (ordinals - 1970 * 12).astype('datetime64[M]').astype('datetime64[D]')
+    dates = month_starts + (month_days(ordinals, start.day, convention) - 1)
+    # Only whole months are generated, so just the last one can fall after the end date
+    keep = dates <= np.datetime64(end.date(), 'D')
+    dates, ordinals = dates[keep], ordinals[keep]
+    dates.flags.writeable = False
+    ordinals.flags.writeable = False
+    return dates, ordinals
+
+
+@dataclass(eq=False)
+class WithdrawalCalendar:
+    """Dates of one plan and what follows from them. Arrays are read-only."""
+    start: datetime
+    end: datetime
+    frequency_interval: int         # months between scheduled withdrawals
+    convention: str
+    dates: np.ndarray               # datetime64[D]
+    month_ordinal: np.ndarray       # int64, see month_ordinal()
+    withdrawal: np.ndarray          # bool, True in months with a scheduled withdrawal
+    _memo: dict = field(default_factory=dict, repr=False)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _remember(self, key, compute):
+        with _memo_lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = compute()
+        with _memo_lock:
+            if len(self._memo) >= MEMO_SIZE:
+                del self._memo[next(iter(self._memo))]
+            return self._memo.setdefault(key, value)
+
+    def exit_load_months(self, investment_date):
+        """Number of leading months less than 365 days after ``investment_date``"""
+        cutoff = np.datetime64(investment_date.date(), 'D') + np.timedelta64(365, 'D')
+        return self._remember(('load', cutoff),
+                              lambda: int(np.searchsorted(self.dates, cutoff)))
+
+    def exit_load_mask(self, investment_date):
+        return np.arange(len(self)) < self.exit_load_months(investment_date)
+
+    def inflation_factors(self, monthly_inflation):
+        """``(1 + monthly_inflation) ** k`` for month offset k, as a list of floats.
+
+        Worked out with Python's ``**`` so month-by-month results match the
+        scalar formula exactly.
+        """
+        base = 1 + monthly_inflation
+        return self._remember(('inflation', base),
+                              lambda: [base ** k for k in range(len(self))])
+
+
+@lru_cache(maxsize=256)
+def withdrawal_calendar(start, end, frequency_interval=1, convention="Same Day"):
+    """Shared calendar for a plan; equal arguments return the same object"""
+    dates, ordinals = _month_dates(start, end, convention)
+    withdrawal = np.arange(1, len(dates) + 1) % frequency_interval == 0
+    withdrawal.flags.writeable = False
+    return WithdrawalCalendar(start, end, frequency_interval, convention, dates, ordinals,
+                              withdrawal)
+
+
+def calendar_for(inputs):
+    """withdrawal_calendar for an SWPInputs"""
+    return withdrawal_calendar(inputs.swp_start_date, inputs.swp_end_date,
+                               inputs.withdrawal_interval, inputs.date_convention)
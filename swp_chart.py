@@ -0,0 +1,319 @@
+"""Charts for the "Graphical Analysis" tab.
+
+The four subplots and their artists are created once; each calculation only
+swaps the data of the existing lines and collections and sets axis limits
+directly, so no subplot, gridspec or layout work is repeated. Series longer
+than the canvas can show are reduced with a min/max-preserving downsample
+before they are handed to matplotlib.
+
+Data artists are animated: a full draw renders axes, ticks and titles, and
+the result is kept as a background. Axis limits are rounded to "nice"
+values, so when a parameter change leaves them (and the titles) as they
+were, draw() restores that background and blits only the data artists.
+
+The fourth subplot shows the split of the outcome as a pie, or, when there
+is no initial investment or nothing to split, how far the portfolio has
+been depleted as a line; switching between them redraws everything.
+"""
+import numpy as np
+from matplotlib.ticker import AutoLocator
+
+# Roughly the horizontal resolution of a subplot; longer series are downsampled
+MAX_POINTS = 1000
+
+PIE_COLORS = ['#FFC107', '#4CAF50']
+PIE_LABELS = ['Total Withdrawn', 'Remaining Corpus']
+
+
+def minmax_indices(y, max_points=MAX_POINTS):
+    """Indices keeping the first, last, minimum and maximum point of each bucket.
+
+    At most ``max_points`` indices are returned, in order, so peaks and
+    troughs survive downsampling while the line keeps its shape.
+    """
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    buckets = max(1, (max_points - 2) // 2)
+    size = -(-n // buckets)
+    padded = np.empty(buckets * size)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    blocks = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = np.minimum(offsets + blocks.argmin(axis=1), n - 1)
+    highs = np.minimum(offsets + blocks.argmax(axis=1), n - 1)
+    return np.unique(np.concatenate(([0, n - 1], lows, highs)))
+
+
+def downsample(x, y, max_points=MAX_POINTS):
+    index = minmax_indices(np.asarray(y, dtype=float), max_points)
+    return np.asarray(x)[index], np.asarray(y)[index]
+
+
+NICE_STEPS = (1.0, 1.2, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0)
+
+
+def nice_ceiling(value):
+    """Smallest value of the form step * 10**k (step in NICE_STEPS) that is >= value"""
+    if value <= 0:
+        return 0.0
+    base = 10.0 ** np.floor(np.log10(value))
+    for step in NICE_STEPS:
+        if step * base >= value * (1 - 1e-12):
+            return step * base
+    return 10.0 * base
+
+
+def _limits(*arrays):
+    """Axis limits covering ``arrays``, anchored at zero and rounded outwards"""
+    values = np.concatenate([np.ravel(a) for a in arrays if len(a)] or [[0.0]])
+    lo, hi = float(np.min(values)), float(np.max(values))
+    lo, hi = -nice_ceiling(-lo), nice_ceiling(hi)
+    if lo == hi:
+        hi = lo + 1.0
+    return lo, hi
+
+
+class SWPChart:
+    """Owns the axes and artists of the analysis figure"""
+
+    def __init__(self, figure):
+        self.figure = figure
+        gs = figure.add_gridspec(2, 2, wspace=0.35, hspace=0.4, left=0.1, right=0.94,
+                                 top=0.9, bottom=0.08)
+        self.ax_value = figure.add_subplot(gs[0, 0])
+        self.ax_cumulative = figure.add_subplot(gs[0, 1])
+        self.ax_withdrawals = figure.add_subplot(gs[1, 0])
+        self.ax_outcome = figure.add_subplot(gs[1, 1])
+        figure.suptitle('SWP Analysis Charts', fontsize=16, fontweight='bold')
+
+        # Chart 1: Portfolio Value Over Time
+        ax = self.ax_value
+        self.nominal_line, = ax.plot([], [], 'b-', linewidth=2, label='Nominal Value')
+        self.real_line, = ax.plot([], [], 'r--', linewidth=2, label='Real Value')
+        self.median_line, = ax.plot([], [], 'k:', linewidth=1.5, label='Median (Monte Carlo)')
+        self.band = None
+        ax.set_title('Portfolio Value Over Time')
+        ax.set_xlabel('Months')
+        ax.set_ylabel('Amount (₹)')
+        ax.grid(True, alpha=0.3)
+        ax.ticklabel_format(style='plain', axis='y')
+
+        # Chart 2: Cumulative Withdrawal
+        ax = self.ax_cumulative
+        self.cumulative_line, = ax.plot([], [], 'g-', linewidth=2)
+        ax.set_title('Cumulative Withdrawals')
+        ax.set_xlabel('Months')
+        ax.set_ylabel('Amount (₹)')
+        ax.grid(True, alpha=0.3)
+        ax.ticklabel_format(style='plain', axis='y')
+
+        # Chart 3: Monthly SWP Amounts, one bar every few months
+        ax = self.ax_withdrawals
+        self.withdrawal_bars = ax.vlines([], [], [], color='orange', alpha=0.7, linewidth=4)
+        ax.set_title('Monthly SWP Withdrawals')
+        ax.set_xlabel('Months')
+        ax.set_ylabel('SWP Amount (₹)')
+        ax.grid(True, alpha=0.3)
+        ax.ticklabel_format(style='plain', axis='y')
+
+        # Chart 4: Investment outcome pie; wedge angles are updated in place.
+        # Without a meaningful pie it falls back to the depletion rate line.
+        ax = self.ax_outcome
+        self.wedges, self.pie_labels, self.pie_values = ax.pie(
+            [1, 1], labels=PIE_LABELS, autopct='%1.1f%%', startangle=90, colors=PIE_COLORS)
+        ax.axis('equal') # Equal aspect ratio ensures that pie is drawn as a circle.
+        self.depletion_line, = ax.plot([], [], 'm-', linewidth=2)
+        self.no_data_text = ax.text(0.5, 0.5, "No data for pie chart", horizontalalignment='center',
+                                    verticalalignment='center', transform=ax.transAxes)
+        self._pie = True
+
+        self.animated = [self.nominal_line, self.real_line, self.median_line,
+                         self.cumulative_line, self.withdrawal_bars, *self.wedges,
+                         *self.pie_labels, *self.pie_values, self.depletion_line, self.no_data_text]
+        for artist in self.animated:
+            artist.set_animated(True)
+        self._background = None
+        self._layout = None
+        figure.canvas.mpl_connect('draw_event', self._on_draw)
+
+        self.clear()
+
+    def _on_draw(self, event):
+        """After a full draw, keep the static parts and paint the data on top"""
+        self._background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+        self._layout = self._layout_key()
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self._data_artists():
+            self.figure.draw_artist(artist)
+
+    def _data_artists(self):
+        return self.animated if self.band is None else [self.band] + self.animated
+
+    def _layout_key(self):
+        """Everything drawn into the background that depends on the data"""
+        return (tuple(tuple(ax.get_xlim()) + tuple(ax.get_ylim())
+                      for ax in (self.ax_value, self.ax_cumulative, self.ax_withdrawals, self.ax_outcome)),
+                self.ax_withdrawals.get_title(), self.ax_outcome.get_title(), self.band is not None,
+                self.figure.bbox.bounds)
+
+    def draw(self):
+        """Blit the data artists when only they changed, otherwise redraw everything"""
+        canvas = self.figure.canvas
+        if self._background is None or self._layout_key() != self._layout:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._background)
+        self._draw_animated()
+        canvas.blit(self.figure.bbox)
+
+    def clear(self):
+        """Hide all data, keeping the artists for the next update"""
+        for line in (self.nominal_line, self.real_line, self.median_line, self.cumulative_line):
+            line.set_data([], [])
+        self.median_line.set_visible(False)
+        self._set_band(None)
+        self.withdrawal_bars.set_segments([])
+        self._show_pie(True)
+        self._set_pie([0, 0])
+        self._update_legend()
+
+    def update(self, months, closing_balance, real_value, swp_amounts, monte_carlo=None,
+               initial_amount=None):
+        """Show a schedule; the pie needs ``initial_amount`` (the plan's) to be positive"""
+        months = np.asarray(months)
+        closing_balance = np.asarray(closing_balance, dtype=float)
+        swp_amounts = np.asarray(swp_amounts, dtype=float)
+        cumulative_withdrawn = np.cumsum(swp_amounts)
+
+        self.nominal_line.set_data(*downsample(months, closing_balance))
+        self.real_line.set_data(*downsample(months, real_value))
+        value_series = [closing_balance, np.asarray(real_value)]
+        x_series = [months]
+        if monte_carlo is not None:
+            # Monte Carlo balance bands (P5-P95) with the median path
+            index = np.union1d(minmax_indices(monte_carlo.bands[5]),
+                               minmax_indices(monte_carlo.bands[95]))
+            self._set_band((monte_carlo.months[index], monte_carlo.bands[5][index],
+                            monte_carlo.bands[95][index]))
+            self.median_line.set_data(*downsample(monte_carlo.months, monte_carlo.bands[50]))
+            self.median_line.set_visible(True)
+            value_series += [monte_carlo.bands[5], monte_carlo.bands[95]]
+            x_series.append(monte_carlo.months)
+        else:
+            self._set_band(None)
+            self.median_line.set_visible(False)
+        self.ax_value.set_xlim(_limits(*x_series))
+        self.ax_value.set_ylim(_limits(*value_series))
+        self._update_legend()
+
+        self.cumulative_line.set_data(*downsample(months, cumulative_withdrawn))
+        self.ax_cumulative.set_xlim(_limits(months))
+        self.ax_cumulative.set_ylim(_limits(cumulative_withdrawn))
+
+        # Using a step for bars if there are too many months for clarity
+        step = max(1, len(months) // 20)
+        bar_months, bar_amounts = months[::step], swp_amounts[::step]
+        segments = np.zeros((len(bar_months), 2, 2))
+        segments[:, :, 0] = bar_months[:, None]
+        segments[:, 1, 1] = bar_amounts
+        self.withdrawal_bars.set_segments(segments)
+        self.ax_withdrawals.set_title(f'Monthly SWP Withdrawals (Every {step} Months)')
+        self.ax_withdrawals.set_xlim(_limits(months))
+        self.ax_withdrawals.set_ylim(_limits(bar_amounts))
+
+        final_balance = closing_balance[-1] if len(closing_balance) else 0
+        total_withdrawn = cumulative_withdrawn[-1] if len(cumulative_withdrawn) else 0
+        if initial_amount is not None and initial_amount > 0 and total_withdrawn + final_balance > 0:
+            self._show_pie(True)
+            self._set_pie([total_withdrawn, final_balance])
+        else:
+            self._show_pie(False)
+            self._set_depletion(months, closing_balance)
+
+    def _set_band(self, band):
+        if self.band is not None:
+            self.band.remove()
+            self.band = None
+        if band is not None:
+            months, low, high = band
+            self.band = self.ax_value.fill_between(months, low, high, color='b', alpha=0.15,
+                                                   label='P5-P95 (Monte Carlo)', animated=True)
+
+    def _update_legend(self):
+        handles = [self.nominal_line, self.real_line]
+        if self.band is not None:
+            handles += [self.band, self.median_line]
+        self.ax_value.legend(handles=handles)
+
+    def _show_pie(self, pie):
+        """Set up the fourth subplot for the outcome pie or the depletion line"""
+        if pie == self._pie:
+            return
+        self._pie = pie
+        ax = self.ax_outcome
+        ax.set_title('Investment Outcome Distribution' if pie else 'Portfolio Depletion Rate')
+        ax.set_frame_on(not pie)
+        if not pie:
+            ax.set_aspect('auto')
+        ax.set_xlabel('' if pie else 'Months')
+        ax.set_ylabel('' if pie else 'Depletion %')
+        if pie:
+            ax.grid(False)
+        else:
+            ax.grid(True, alpha=0.3)
+        if pie:
+            ax.set_xticks([])
+            ax.set_yticks([])
+            # Limits from the wedges again, as when the pie was first drawn
+            self.depletion_line.set_data([], [])
+            ax.relim()
+            ax.axis('equal')
+            ax.autoscale_view()
+        else:
+            ax.xaxis.set_major_locator(AutoLocator())
+            ax.yaxis.set_major_locator(AutoLocator())
+            for artist in (*self.wedges, *self.pie_labels, *self.pie_values):
+                artist.set_visible(False)
+        self.depletion_line.set_visible(not pie)
+
+    def _set_depletion(self, months, closing_balance):
+        """Share of the first closing balance spent so far, in percent"""
+        if not len(closing_balance) or closing_balance[0] <= 0:
+            self.depletion_line.set_data([], [])
+            self.no_data_text.set_text("Insufficient data for chart")
+            self.no_data_text.set_visible(True)
+            self.ax_outcome.set_xlim(0.0, 1.0)
+            self.ax_outcome.set_ylim(0.0, 1.0)
+            return
+        depletion = (closing_balance[0] - closing_balance) / closing_balance[0] * 100
+        self.depletion_line.set_data(*downsample(months, depletion))
+        self.no_data_text.set_visible(False)
+        self.ax_outcome.set_xlim(_limits(months))
+        self.ax_outcome.set_ylim(_limits(depletion))
+
+    def _set_pie(self, sizes):
+        sizes = [max(float(s), 0.0) for s in sizes]
+        total = sum(sizes)
+        self.no_data_text.set_text("No data for pie chart")
+        self.no_data_text.set_visible(total <= 0)
+        start = 90.0
+        for wedge, label, value, size in zip(self.wedges, self.pie_labels, self.pie_values, sizes):
+            visible = total > 0 and size > 0
+            for artist in (wedge, label, value):
+                artist.set_visible(visible)
+            if not visible:
+                continue
+            sweep = 360.0 * size / total
+            wedge.set_theta1(start)
+            wedge.set_theta2(start + sweep)
+            middle = np.deg2rad(start + sweep / 2)
+            x, y = np.cos(middle), np.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x >= 0 else 'right')
+            value.set_position((0.6 * x, 0.6 * y))
+            value.set_text(f"{100 * size / total:.1f}%")
+            start += sweep
@@ -0,0 +1,244 @@
+"""Command-line batch runner for many client plans.
+
+    python swp_cli.py plans.csv summaries.csv [--schedules schedules.csv]
+                      [--chunk-size 5000] [--workers 4]
+
+Plans are read from a CSV or Parquet file whose columns are the
+SWPCalculator.get_input_values keys (dates as DD/MM/YYYY, blank numbers
+take the batch default, zero for most); an optional ``plan_id`` column is copied to the outputs,
+otherwise plans are numbered from 1. Plans are streamed through the
+vectorized batch engine in chunks, optionally across worker processes,
+and per-plan summaries (plus, with ``--schedules``, every monthly row) are
+written as CSV or Parquet. A plan with invalid inputs gets its message in
+the ``error`` column instead of stopping the run.
+
+Only NumPy and the engine modules are imported, never Qt or matplotlib.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import numpy as np
+
+from swp_batch import DEFAULTS, INPUT_KEYS, evaluate_batch, scenario_errors
+from swp_engine import (DATE_FIELDS, DATE_FORMAT, NUMERIC_FIELDS, RESULT_COLUMNS, SWPInputs,
+                        parse_date, project)
+from swp_export import TableWriter
+from swp_parallel import default_workers
+
+SUMMARY_FIELDS = ('total_withdrawn', 'remaining_corpus', 'months_sustainable',
+                  'real_remaining_corpus')
+
+SCHEDULE_FIELDS = ('month', 'date', 'opening_balance', 'growth', 'swp_amount', 'tax',
+                   'closing_balance', 'real_value')
+
+
+def read_plans(path, chunk_size):
+    """Yield lists of at most ``chunk_size`` plan records (dicts) from CSV or Parquet"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Reading Parquet plans needs the pyarrow package") from None
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        missing = [k for k in INPUT_KEYS if k not in DEFAULTS and k not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Plans file is missing columns: {', '.join(missing)}")
+        chunk = []
+        for record in reader:
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _date_text(value):
+    if isinstance(value, (date, datetime)):
+        return value.strftime(DATE_FORMAT)
+    return str(value).strip()
+
+
+def parse_plans(records):
+    """Input columns for evaluate_batch plus one error message (or None) per record"""
+    count = len(records)
+    errors = [None] * count
+    values = {}
+    parsed_dates = {}
+    for key in INPUT_KEYS:
+        column = [record.get(key) for record in records]
+        if key in NUMERIC_FIELDS:
+            parsed = np.full(count, float(DEFAULTS.get(key, 0.0)))
+            for i, value in enumerate(column):
+                if _blank(value):
+                    continue
+                try:
+                    parsed[i] = float(value)
+                except (TypeError, ValueError):
+                    errors[i] = errors[i] or f"{key}: not a number: {value!r}"
+        elif key in DATE_FIELDS:
+            parsed = np.array([_date_text(v) if not _blank(v) else '' for v in column], dtype=object)
+            for i, text in enumerate(parsed):
+                # Plans share a handful of dates, so each distinct one is parsed once
+                if text not in parsed_dates:
+                    try:
+                        parse_date(text)
+                        parsed_dates[text] = None
+                    except ValueError as e:
+                        parsed_dates[text] = str(e) if text else "missing date"
+                if parsed_dates[text]:
+                    errors[i] = errors[i] or f"{key}: {parsed_dates[text]}"
+        else:
+            parsed = np.array([DEFAULTS[key] if _blank(v) else str(v).strip() for v in column],
+                              dtype=object)
+        values[key] = parsed
+    return values, errors
+
+
+def _schedule(plan_values):
+    """Monthly columns of one plan, keyed by SCHEDULE_FIELDS"""
+    result = project(SWPInputs.from_values(plan_values))
+    return dict(zip(SCHEDULE_FIELDS, (result.column(name) for name in RESULT_COLUMNS)))
+
+
+def process_chunk(records, first_index, schedules=False):
+    """Summaries (and optionally schedules) for one chunk of plan records"""
+    count = len(records)
+    values, errors = parse_plans(records)
+    plan_ids = np.array([str(record.get('plan_id') or first_index + i + 1)
+                         for i, record in enumerate(records)], dtype=object)
+
+    summary = {'plan_id': plan_ids}
+    for name in SUMMARY_FIELDS:
+        summary[name] = np.zeros(count, dtype=np.int64 if name == 'months_sustainable' else float)
+
+    # Out of range plans are reported on their own row rather than failing the batch
+    errors = [error or check for error, check in zip(errors, scenario_errors(values))]
+    index = np.flatnonzero([error is None for error in errors])
+    if index.size:
+        result = evaluate_batch({k: v[index] for k, v in values.items()})
+        for name in SUMMARY_FIELDS:
+            summary[name][index] = getattr(result, name)
+    summary['error'] = np.array([error or '' for error in errors], dtype=object)
+
+    schedule = None
+    if schedules:
+        parts = []
+        for i in range(count):
+            if errors[i] is not None:
+                continue
+            plan = _schedule({k: v[i] for k, v in values.items()})
+            plan = {'plan_id': np.full(len(plan['month']), plan_ids[i], dtype=object), **plan}
+            parts.append(plan)
+        if parts:
+            schedule = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    return summary, schedule
+
+
+def run(plans_path, summary_path, schedule_path=None, chunk_size=5000, workers=1, report=None):
+    """Process every plan in ``plans_path``; returns (plans, failed plans)"""
+    chunks = read_plans(plans_path, chunk_size)
+    total = failed = 0
+    schedule_writer = TableWriter(schedule_path) if schedule_path else None
+
+    def write(outcome):
+        nonlocal total, failed
+        summary, schedule = outcome
+        summary_writer.write(summary)
+        if schedule is not None:
+            schedule_writer.write(schedule)
+        total += len(summary['plan_id'])
+        failed += int(np.count_nonzero(summary['error'] != ''))
+        if report is not None:
+            report(total, failed)
+
+    with TableWriter(summary_path) as summary_writer:
+        if schedule_writer is not None:
+            schedule_writer.__enter__()
+        try:
+            if workers <= 1:
+                first = 0
+                for records in chunks:
+                    write(process_chunk(records, first, schedule_path is not None))
+                    first += len(records)
+            else:
+                _run_pool(chunks, workers, schedule_path is not None, write)
+        except BaseException:
+            if schedule_writer is not None:
+                schedule_writer.__exit__(*sys.exc_info())
+            raise
+        if schedule_writer is not None:
+            schedule_writer.__exit__(None, None, None)
+    return total, failed
+
+
+def _run_pool(chunks, workers, schedules, write):
+    """Run chunks in a process pool, writing results in input order.
+
+    At most two chunks per worker are in flight, so memory stays bounded
+    however long the plans file is.
+    """
+    pending = []
+    first = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for records in chunks:
+            pending.append(pool.submit(process_chunk, records, first, schedules))
+            first += len(records)
+            if len(pending) >= 2 * workers:
+                write(pending.pop(0).result())
+        for future in pending:
+            write(future.result())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Project many SWP plans from a CSV or Parquet file.")
+    parser.add_argument('plans', help="CSV or Parquet file, one plan per row")
+    parser.add_argument('summaries', help="output file for per-plan summaries (.csv or .parquet)")
+    parser.add_argument('--schedules', help="also write every monthly row to this file")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="plans per chunk (default 5000)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes; 0 uses every CPU (default 1)")
+    parser.add_argument('--quiet', action='store_true', help="no progress output")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+    workers = args.workers or default_workers()
+    start = time.perf_counter()
+
+    def report(done, failed):
+        if not args.quiet:
+            print(f"\r{done:,} plans ({failed:,} failed)", end='', file=sys.stderr, flush=True)
+
+    try:
+        total, failed = run(args.plans, args.summaries, args.schedules, args.chunk_size,
+                            workers, report)
+    except (OSError, ValueError) as e:
+        print(f"\nerror: {e}", file=sys.stderr)
+        return 1
+
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        rate = total / elapsed * 60 if elapsed else 0
+        print(f"\r{total:,} plans ({failed:,} failed) in {elapsed:.2f} s, {rate:,.0f} plans/minute",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
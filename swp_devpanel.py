@@ -0,0 +1,98 @@
+"""Developer panel: stage timings of recent runs.
+
+Hidden from the menus; Ctrl+Shift+D opens it. The table lists the runs
+kept by a MetricsRecorder, newest first, one column per stage in
+milliseconds, failed and cancelled runs marked as such, with the
+projection cache statistics and the trace file underneath. "Profile next run" arms cProfile for the next calculation or
+export; its hottest functions are shown once that run has finished.
+"""
+import time
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (QCheckBox, QDialog, QHBoxLayout, QHeaderView, QLabel,
+                             QPlainTextEdit, QPushButton, QTableWidget, QTableWidgetItem,
+                             QVBoxLayout)
+
+STAGES = ('parse', 'simulate', 'monte_carlo', 'summary', 'table', 'chart', 'export')
+COUNTERS = ('engine', 'months', 'cache_hit')
+HEADERS = ['Time', 'Run'] + [stage.replace('_', ' ').title() for stage in STAGES] + \
+          ['Wall'] + [counter.replace('_', ' ').title() for counter in COUNTERS]
+
+
+def _millis(seconds):
+    return f"{seconds * 1000:.1f}" if seconds is not None else ""
+
+
+class DeveloperPanel(QDialog):
+    def __init__(self, metrics, cache, parent=None):
+        super().__init__(parent)
+        self.metrics = metrics
+        self.cache = cache
+        self.setWindowTitle("Developer Panel")
+        self.resize(1000, 600)
+
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(HEADERS))
+        self.table.setHorizontalHeaderLabels(HEADERS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table, 2)
+
+        self.cache_label = QLabel()
+        layout.addWidget(self.cache_label)
+
+        controls = QHBoxLayout()
+        self.profile_checkbox = QCheckBox("Profile next run")
+        self.profile_checkbox.toggled.connect(self.set_profile_next)
+        controls.addWidget(self.profile_checkbox)
+        controls.addStretch()
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        controls.addWidget(refresh_button)
+        layout.addLayout(controls)
+
+        self.profile_text = QPlainTextEdit()
+        self.profile_text.setReadOnly(True)
+        self.profile_text.setFont(QFont("Courier", 9))
+        self.profile_text.setPlaceholderText("No profiled run yet")
+        layout.addWidget(self.profile_text, 1)
+
+        self.refresh()
+
+    def set_profile_next(self, checked):
+        self.metrics.profile_next = checked
+
+    def refresh(self):
+        runs = self.metrics.runs()[::-1]
+        self.table.setRowCount(len(runs))
+        for row, run in enumerate(runs):
+            outcome = " (failed)" if 'error' in run.counters else \
+                " (cancelled)" if run.counters.get('cancelled') else ""
+            cells = [time.strftime('%H:%M:%S', time.localtime(run.started)), run.kind + outcome]
+            cells += [_millis(run.stages.get(stage)) for stage in STAGES]
+            cells.append(_millis(run.wall))
+            cells += [str(run.counters.get(counter, "")) for counter in COUNTERS]
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if 1 < column < len(STAGES) + 3:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                if column == 1 and 'error' in run.counters:
+                    item.setToolTip(run.counters['error'])
+                self.table.setItem(row, column, item)
+
+        stats = self.cache.stats()
+        trace = self.metrics.trace_path or "off"
+        self.cache_label.setText(
+            f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%}), {stats['size']}/{stats['maxsize']} entries    Trace: {trace}")
+
+        # The checkbox follows the recorder, which clears the flag when a run starts
+        self.profile_checkbox.blockSignals(True)
+        self.profile_checkbox.setChecked(self.metrics.profile_next)
+        self.profile_checkbox.blockSignals(False)
+        profiled = next((run for run in runs if run.profile_summary), None)
+        if profiled is not None:
+            self.profile_text.setPlainText(
+                f"Run {profiled.run_id} ({profiled.kind}), saved to {profiled.profile_path}\n\n"
+                f"{profiled.profile_summary}")
@@ -0,0 +1,377 @@
+"""Headless SWP projection engine.
+
+All of the projection math used by the SWP Calculator lives here so it can be
+run without a QApplication. Importing this module does not pull in PyQt5,
+matplotlib or pandas.
+"""
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+
+import numpy as np
+
+from swp_calendar import DATE_CONVENTIONS, calendar_for, check_convention, month_days
+from swp_policies import (POLICY_YEAR, WITHDRAWAL_POLICIES, Guardrails, check_policy,
+                          withdrawal_schedule)
+
+DATE_FORMAT = "%d/%m/%Y"
+
+# Number of withdrawals per year for each SWP frequency
+FREQ_MAP = {"Monthly": 12, "Quarterly": 4, "Half-Yearly": 2, "Yearly": 1}
+
+# Input keys (as returned by SWPCalculator.get_input_values) holding dates
+DATE_FIELDS = ('investment_date', 'swp_start_date', 'swp_end_date')
+
+# Input keys holding plain numbers; left blank in the GUI they count as zero
+NUMERIC_FIELDS = ('initial_amount', 'swp_amount', 'annual_return', 'expense_ratio',
+                  'exit_load', 'inflation_rate', 'tax_rate', 'step_up', 'corpus_rate',
+                  'guardrail_band', 'guardrail_step')
+
+RESULT_COLUMNS = ['Month', 'Date', 'Opening Balance', 'Growth', 'SWP Amount',
+                  'Tax', 'Closing Balance', 'Real Value']
+
+# SWPResult attribute holding each of RESULT_COLUMNS, in the same order
+RESULT_FIELDS = dict(zip(RESULT_COLUMNS, (
+    'month', 'month_ordinal', 'opening_balance', 'growth', 'swp_amount',
+    'tax', 'closing_balance', 'real_value')))
+
+
+def parse_date(value):
+    """Parse a DD/MM/YYYY string (datetimes are passed through)"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(value, DATE_FORMAT)
+
+
+def parse_field(name, text):
+    """Parse a single input field as typed, e.g. for validating while editing"""
+    text = text.strip()
+    if name in DATE_FIELDS:
+        return parse_date(text)
+    if name in NUMERIC_FIELDS:
+        return float(text) if text else 0.0
+    return text
+
+
+@dataclass
+class SWPInputs:
+    """Parsed SWP parameters. Rates are percentages, as entered in the GUI."""
+    initial_amount: float
+    investment_date: datetime
+    swp_amount: float
+    swp_start_date: datetime
+    swp_end_date: datetime
+    annual_return: float
+    frequency: str = "Monthly"
+    expense_ratio: float = 0.0
+    exit_load: float = 0.0
+    inflation_rate: float = 0.0
+    tax_rate: float = 0.0
+    date_convention: str = "Same Day"   # one of DATE_CONVENTIONS, see swp_calendar
+    # Month number -> amount withdrawn that month instead of the scheduled SWP
+    withdrawal_overrides: dict = field(default_factory=dict)
+    withdrawal_policy: str = "Fixed"    # one of WITHDRAWAL_POLICIES, see swp_policies
+    step_up: float = 0.0                # Annual Step-Up: yearly raise
+    corpus_rate: float = 0.0            # Percent of Corpus: share of the balance withdrawn per year
+    guardrail_band: float = 20.0        # Guardrails: allowed drift of the withdrawal rate
+    guardrail_step: float = 10.0        # Guardrails: adjustment when the rate leaves the band
+
+    def __post_init__(self):
+        if self.frequency not in FREQ_MAP:
+            raise ValueError(f"Unknown SWP frequency: {self.frequency!r}")
+        check_convention(self.date_convention)
+        if 1 + (self.annual_return - self.expense_ratio) / 100 <= 0:
+            raise ValueError("Annual return net of expense ratio must be above -100%")
+        if 1 + self.inflation_rate / 100 <= 0:
+            raise ValueError("Inflation rate must be above -100%")
+        check_policy(self)
+
+    @classmethod
+    def from_values(cls, values):
+        """Build inputs from the dict returned by SWPCalculator.get_input_values"""
+        return cls(
+            initial_amount=float(values['initial_amount']),
+            investment_date=parse_date(values['investment_date']),
+            swp_amount=float(values['swp_amount']),
+            swp_start_date=parse_date(values['swp_start_date']),
+            swp_end_date=parse_date(values['swp_end_date']),
+            annual_return=float(values['annual_return']),
+            frequency=values.get('frequency', "Monthly"),
+            expense_ratio=float(values.get('expense_ratio', 0.0)),
+            exit_load=float(values.get('exit_load', 0.0)),
+            inflation_rate=float(values.get('inflation_rate', 0.0)),
+            tax_rate=float(values.get('tax_rate', 0.0)),
+            date_convention=values.get('date_convention', "Same Day"),
+            withdrawal_overrides={int(month): float(amount) for month, amount
+                                  in values.get('withdrawal_overrides', {}).items()},
+            withdrawal_policy=values.get('withdrawal_policy', "Fixed"),
+            step_up=float(values.get('step_up', 0.0)),
+            corpus_rate=float(values.get('corpus_rate', 0.0)),
+            guardrail_band=float(values.get('guardrail_band', 20.0)),
+            guardrail_step=float(values.get('guardrail_step', 10.0)),
+        )
+
+    def to_values(self):
+        """Inverse of from_values: dates formatted back to DD/MM/YYYY strings"""
+        values = asdict(self)
+        for name in DATE_FIELDS:
+            values[name] = values[name].strftime(DATE_FORMAT)
+        return values
+
+    @property
+    def freq_factor(self):
+        return FREQ_MAP[self.frequency]
+
+    @property
+    def withdrawal_interval(self):
+        """Months between withdrawals"""
+        return 12 // self.freq_factor
+
+    @property
+    def monthly_return(self):
+        """Monthly return, net of expense ratio"""
+        return ((1 + self.annual_return / 100 - self.expense_ratio / 100) ** (1/12)) - 1
+
+    @property
+    def monthly_inflation(self):
+        return ((1 + self.inflation_rate / 100) ** (1/12)) - 1
+
+    def is_withdrawal_month(self, month):
+        return month % self.withdrawal_interval == 0 or month in self.withdrawal_overrides
+
+    def withdrawal_for(self, month):
+        return self.withdrawal_overrides.get(month, self.swp_amount)
+
+
+@dataclass
+class SWPResult:
+    """Outcome of a projection: the monthly schedule as NumPy columns plus the summary figures.
+
+    Dates are stored as int64 month ordinals (``year * 12 + month - 1``);
+    the day of each month follows from ``start_day`` and the date
+    convention (see swp_calendar.month_days).
+    """
+    month: np.ndarray               # int64, 1-based
+    month_ordinal: np.ndarray       # int64
+    opening_balance: np.ndarray
+    growth: np.ndarray
+    swp_amount: np.ndarray
+    tax: np.ndarray
+    closing_balance: np.ndarray
+    real_value: np.ndarray
+    start_day: int
+    total_withdrawn: float
+    remaining_corpus: float
+    months_sustainable: int
+    date_convention: str = "Same Day"
+
+    @classmethod
+    def from_rows(cls, rows, start_day, total_withdrawn, remaining_corpus, months_sustainable,
+                  date_convention="Same Day"):
+        """Build from row tuples in RESULT_FIELDS order, as appended by advance()"""
+        columns = list(zip(*rows)) or [()] * len(RESULT_FIELDS)
+        integers = [np.array(c, dtype=np.int64) for c in columns[:2]]
+        floats = [np.array(c, dtype=float) for c in columns[2:]]
+        return cls(*integers, *floats, start_day, total_withdrawn, remaining_corpus,
+                   months_sustainable, date_convention)
+
+    def __len__(self):
+        return len(self.month)
+
+    def days(self):
+        """Day of month of each date"""
+        return month_days(self.month_ordinal, self.start_day, self.date_convention)
+
+    def dates(self):
+        """Dates as datetime64[D]"""
+        first = (self.month_ordinal - 1970 * 12).astype('datetime64[M]').astype('datetime64[D]')
+        return first + (self.days() - 1)
+
+    def date_labels(self):
+        """Dates formatted as DD/MM/YYYY strings (an object array)"""
+        years, months = np.divmod(self.month_ordinal, 12)
+        return np.array([f"{d:02d}/{m + 1:02d}/{y}" for d, m, y
+                         in zip(self.days().tolist(), months.tolist(), years.tolist())], dtype=object)
+
+    def column(self, name):
+        """One of RESULT_COLUMNS; the stored array itself except for 'Date'"""
+        if name == 'Date':
+            return self.date_labels()
+        return getattr(self, RESULT_FIELDS[name])
+
+    def columns(self):
+        return {name: self.column(name) for name in RESULT_COLUMNS}
+
+    @property
+    def rows(self):
+        """The schedule as one dict per month, keyed by RESULT_COLUMNS (e.g. for JSON)"""
+        columns = [self.column(name).tolist() for name in RESULT_COLUMNS]
+        return [dict(zip(RESULT_COLUMNS, row)) for row in zip(*columns)]
+
+
+@dataclass
+class ProjectionState:
+    """Loop state between two months; enough to resume a projection"""
+    month: int                      # months simulated so far
+    balance: float
+    invested: float                 # initial investment remaining, for capital gain calculation
+    total_withdrawn: float
+    stopped: bool = False
+    policy_amount: float = 0.0      # Guardrails: current withdrawal
+    year_growth: float = 0.0        # Guardrails: growth since the last anniversary
+
+
+def initial_state(inputs):
+    return ProjectionState(0, inputs.initial_amount, inputs.initial_amount, 0,
+                           policy_amount=inputs.swp_amount)
+
+
+def advance(inputs, state, results, checkpoints=None, checkpoint_interval=12):
+    """Continue the month-by-month simulation from ``state`` to the end date.
+
+    Dates, scheduled withdrawal months, the exit-load window and inflation
+    factors all come from the plan's shared WithdrawalCalendar; amounts
+    follow the withdrawal policy (see swp_policies).
+
+    Row tuples (in RESULT_FIELDS order, see SWPResult.from_rows) are
+    appended to ``results`` and the final state is returned. If
+    ``checkpoints`` is a list, a copy of the state is appended to it every
+    ``checkpoint_interval`` months.
+    """
+    if state.stopped:
+        return state
+
+    swp_amount = inputs.swp_amount
+    exit_load = inputs.exit_load / 100
+    tax_rate = inputs.tax_rate / 100
+
+    monthly_return = inputs.monthly_return
+
+    calendar = calendar_for(inputs)
+    month_ordinals = calendar.month_ordinal.tolist()
+    scheduled, amounts, fixed = (a.tolist() for a in withdrawal_schedule(inputs, calendar))
+    exit_load_months = calendar.exit_load_months(inputs.investment_date)
+    inflation_factors = calendar.inflation_factors(inputs.monthly_inflation)
+    corpus_rate = inputs.corpus_rate / 100 / inputs.freq_factor
+    guardrails = Guardrails.from_inputs(inputs) if inputs.withdrawal_policy == "Guardrails" else None
+
+    current_balance = state.balance
+    month_counter = state.month
+    total_withdrawn = state.total_withdrawn
+    initial_investment_remaining = state.invested
+    policy_amount = state.policy_amount
+    year_growth = state.year_growth
+    stopped = False
+
+    # Calculate SWP month by month; index counts months from the SWP start
+    for index in range(state.month, len(calendar)):
+        if current_balance <= 0:
+            break
+        month_counter = index + 1
+
+        # Calculate opening balance
+        opening_balance = current_balance
+
+        # Apply monthly growth
+        growth = opening_balance * monthly_return
+        balance_after_growth = opening_balance + growth
+
+        if guardrails is not None:
+            if index and index % POLICY_YEAR == 0:
+                policy_amount = float(guardrails.apply(policy_amount, opening_balance, year_growth))
+                year_growth = 0.0
+            year_growth += growth
+
+        swp_withdrawal_this_month = 0
+        tax_amount_this_month = 0
+        exit_load_amount_this_month = 0
+
+        # Calculate SWP withdrawal (adjust for frequency); overrides are in the schedule
+        withdrawal_month = scheduled[index]
+        if withdrawal_month:
+            if fixed[index]:
+                due = amounts[index]
+            elif guardrails is not None:
+                due = policy_amount
+            else:
+                due = corpus_rate * balance_after_growth
+            # Ensure we don't withdraw more than available balance
+            actual_swp_to_withdraw = min(due, balance_after_growth)
+
+            # Determine capital gain portion
+            # This is a simplified calculation: gain is pro-rata from total capital vs. total investment
+            if initial_investment_remaining > 0:
+                capital_gain_ratio = (balance_after_growth - initial_investment_remaining) / balance_after_growth if balance_after_growth > 0 else 0
+                capital_gain = actual_swp_to_withdraw * capital_gain_ratio
+            else:
+                capital_gain = actual_swp_to_withdraw # If initial investment is depleted, all is gain
+
+            tax_amount_this_month = capital_gain * tax_rate
+
+            # Apply exit load if applicable (simplified: for first year from investment_date)
+            if index < exit_load_months:
+                exit_load_amount_this_month = actual_swp_to_withdraw * exit_load
+
+            final_withdrawal_deductions = actual_swp_to_withdraw + tax_amount_this_month + exit_load_amount_this_month
+
+            # Ensure we don't withdraw more than available balance (after accounting for tax/load)
+            if balance_after_growth >= final_withdrawal_deductions:
+                current_balance = balance_after_growth - final_withdrawal_deductions
+                swp_withdrawal_this_month = actual_swp_to_withdraw
+            else:
+                swp_withdrawal_this_month = balance_after_growth / (1 + tax_rate + exit_load) # Withdraw as much as possible net of charges
+                tax_amount_this_month = swp_withdrawal_this_month * tax_rate
+                exit_load_amount_this_month = swp_withdrawal_this_month * exit_load
+                current_balance = 0 # Portfolio depleted
+
+            total_withdrawn += swp_withdrawal_this_month
+            initial_investment_remaining -= swp_withdrawal_this_month # Reduce initial investment part
+
+        else:
+            # No SWP withdrawal this month, only growth
+            current_balance = balance_after_growth
+
+        # Calculate real value (inflation adjusted)
+        real_value = current_balance / inflation_factors[index]
+
+        # Store results
+        results.append((month_counter, month_ordinals[index],
+                        opening_balance, growth, swp_withdrawal_this_month,
+                        tax_amount_this_month, current_balance, real_value))
+
+        # Break if balance becomes too low and SWP is due
+        if current_balance < swp_amount * 0.1 and withdrawal_month:
+            stopped = True
+            break
+
+        if checkpoints is not None and month_counter % checkpoint_interval == 0:
+            checkpoints.append(ProjectionState(month_counter, current_balance,
+                                               initial_investment_remaining, total_withdrawn,
+                                               policy_amount=policy_amount, year_growth=year_growth))
+
+    return ProjectionState(month_counter, current_balance, initial_investment_remaining,
+                           total_withdrawn, stopped, policy_amount, year_growth)
+
+
+def run_projection(inputs):
+    """Simulate the SWP month by month and return an SWPResult"""
+    results = []
+    state = advance(inputs, initial_state(inputs), results)
+    return SWPResult.from_rows(results, inputs.swp_start_date.day, state.total_withdrawn,
+                               state.balance, state.month, inputs.date_convention)
+
+
+def project(inputs, loop=run_projection):
+    """Run a projection, using the NumPy closed form when it applies.
+
+    ``loop`` runs the month-by-month simulation otherwise (e.g. an
+    IncrementalProjector's project method).
+    """
+    import swp_vectorized # imports this module
+    if swp_vectorized.supports(inputs):
+        return swp_vectorized.run_projection_array(inputs)
+    return loop(inputs)
+
+
+def project_values(values):
+    """Convenience wrapper: run a projection straight from a get_input_values dict"""
+    return project(SWPInputs.from_values(values))
@@ -0,0 +1,226 @@
+"""Export of an SWP analysis to Excel, CSV or Parquet.
+
+Exports stream: rows go from the columnar schedule straight to the file in
+blocks, with no intermediate DataFrame. Excel files are written by
+openpyxl in write-only mode, and every column width is computed from the
+columns in a single vectorized pass before the first row is written.
+Nothing here touches widgets, so the GUI can call it from a worker thread.
+Files are written next to their target and moved into place at the end,
+so a failed or cancelled export never leaves a half-written file behind.
+
+Parquet output needs pyarrow; openpyxl and pyarrow are only imported when
+their format is used.
+"""
+import csv
+import os
+from contextlib import contextmanager
+
+import numpy as np
+
+FORMATS = {'.xlsx': 'excel', '.csv': 'csv', '.parquet': 'parquet'}
+
+# Rows written between two progress callbacks (and per Parquet row group)
+ROW_BLOCK = 8192
+
+
+def column_width(name, values):
+    """Width fitting the header and the longest str(value), plus padding"""
+    if not len(values):
+        return len(name) + 2
+    lengths = np.char.str_len(np.asarray(values).astype(str))
+    return max(len(name), int(lengths.max())) + 2
+
+
+def summary_table(inputs, summary):
+    """Parameter/value columns of the Summary sheet"""
+    return {
+        'Parameter': ['Initial Investment', 'Total Withdrawn', 'Remaining Corpus',
+                      'Months Sustainable', 'Expected Annual Return', 'SWP Amount',
+                      'Expense Ratio', 'Exit Load', 'Inflation Rate', 'Tax Rate',
+                      'Withdrawal Policy'],
+        'Value': [
+            f"₹{inputs['initial_amount']:,.2f}",
+            summary['total_withdrawn'],
+            summary['remaining_corpus'],
+            summary['months_sustainable'],
+            f"{inputs['annual_return']}%",
+            f"₹{inputs['swp_amount']:,.2f}",
+            f"{inputs.get('expense_ratio', 0.0)}%",
+            f"{inputs.get('exit_load', 0.0)}%",
+            f"{inputs.get('inflation_rate', 0.0)}%",
+            f"{inputs.get('tax_rate', 0.0)}%",
+            inputs.get('withdrawal_policy', "Fixed")
+        ]
+    }
+
+
+def iter_rows(columns, names, progress=None):
+    """Yield row tuples block by block, calling ``progress(done, total)`` after each block"""
+    arrays = [columns[name] for name in names]
+    count = len(arrays[0]) if arrays else 0
+    for start in range(0, count, ROW_BLOCK):
+        # tolist() turns NumPy scalars into plain Python numbers for the writers
+        block = [a[start:start + ROW_BLOCK] for a in arrays]
+        yield from zip(*[b.tolist() if hasattr(b, 'tolist') else b for b in block])
+        if progress is not None:
+            progress(min(start + ROW_BLOCK, count), count)
+
+
+@contextmanager
+def atomic_path(file_path):
+    """Temporary path next to ``file_path`` that replaces it on success"""
+    directory, name = os.path.split(os.path.abspath(file_path))
+    temp_path = os.path.join(directory, '.~' + name)
+    try:
+        yield temp_path
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _write_sheet(workbook, title, columns, progress=None):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+    from openpyxl.utils import get_column_letter
+
+    sheet = workbook.create_sheet(title)
+    names = list(columns)
+    # Widths have to be known before the first row in write-only mode
+    for i, name in enumerate(names, start=1):
+        sheet.column_dimensions[get_column_letter(i)].width = column_width(name, columns[name])
+
+    # Same header look as pandas' to_excel
+    thin = Side(style='thin')
+    header = []
+    for name in names:
+        cell = WriteOnlyCell(sheet, value=name)
+        cell.font = Font(bold=True)
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        cell.alignment = Alignment(horizontal='center', vertical='top')
+        header.append(cell)
+    sheet.append(header)
+    for row in iter_rows(columns, names, progress):
+        sheet.append(row)
+
+
+def write_excel(file_path, columns, inputs, summary, progress=None):
+    """Schedule, Summary and Input Parameters sheets in one workbook"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    _write_sheet(workbook, 'SWP Analysis', columns, progress)
+    _write_sheet(workbook, 'Summary', summary_table(inputs, summary))
+    _write_sheet(workbook, 'Input Parameters',
+                 {'Parameter': list(inputs.keys()), 'Value': list(inputs.values())})
+    with atomic_path(file_path) as temp_path:
+        workbook.save(temp_path)
+
+
+class TableWriter:
+    """Appends blocks of columns to a CSV or Parquet file as they are produced.
+
+    >>> with TableWriter('summaries.csv') as writer:
+    ...     for columns in blocks:
+    ...         writer.write(columns)
+
+    Every block must have the same column names. The file only appears at
+    its final path once the writer is closed without an error.
+    """
+
+    def __init__(self, file_path):
+        extension = os.path.splitext(file_path)[1].lower()
+        if FORMATS.get(extension) not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported table format: {extension or file_path!r}")
+        self.file_path = file_path
+        self.format = FORMATS[extension]
+        self.rows = 0
+        self._atomic = None
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        if self.format == 'parquet':
+            try:
+                import pyarrow # noqa: F401
+            except ImportError:
+                raise ValueError("Parquet export needs the pyarrow package") from None
+        self._atomic = atomic_path(self.file_path)
+        self._temp_path = self._atomic.__enter__()
+        return self
+
+    def write(self, columns, progress=None):
+        names = list(columns)
+        if self.format == 'csv':
+            if self._writer is None:
+                self._file = open(self._temp_path, 'w', newline='', encoding='utf-8')
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(names)
+            self._writer.writerows(iter_rows(columns, names, progress))
+        else:
+            self._write_parquet(columns, names, progress)
+        self.rows += len(columns[names[0]]) if names else 0
+
+    def _write_parquet(self, columns, names, progress):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            # Text columns (dates, ids, errors) are strings, the rest keep their NumPy type
+            fields = []
+            for name in names:
+                values = columns[name]
+                if isinstance(values, np.ndarray) and values.dtype.kind in 'biuf':
+                    fields.append((name, pa.from_numpy_dtype(values.dtype)))
+                else:
+                    fields.append((name, pa.string()))
+            self._schema = pa.schema(fields)
+            self._writer = pq.ParquetWriter(self._temp_path, self._schema)
+        count = len(columns[names[0]]) if names else 0
+        for start in range(0, count, ROW_BLOCK):
+            block = {name: columns[name][start:start + ROW_BLOCK] for name in names}
+            self._writer.write_table(pa.table(block, schema=self._schema))
+            if progress is not None:
+                progress(min(start + ROW_BLOCK, count), count)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._writer is None and exc_type is None and self.format == 'parquet':
+            error = ValueError("Nothing was written to the Parquet file")
+            self._atomic.__exit__(ValueError, error, None)
+            raise error
+        if self._file is not None:
+            self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
+        elif exc_type is None:
+            open(self._temp_path, 'w').close() # Empty CSV: no blocks were written
+        return self._atomic.__exit__(exc_type, exc, tb)
+
+
+def write_csv(file_path, columns, progress=None):
+    with TableWriter(file_path) as writer:
+        writer.write(columns, progress)
+
+
+def write_parquet(file_path, columns, progress=None):
+    with TableWriter(file_path) as writer:
+        writer.write(columns, progress)
+
+
+def export_analysis(file_path, result, inputs, summary, progress=None):
+    """Write the schedule of ``result`` (an SWPResult) in the format given by the file extension.
+
+    ``inputs`` are the raw input values and ``summary`` the displayed totals
+    ('total_withdrawn', 'remaining_corpus', 'months_sustainable'); only the
+    Excel format has room for them.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported export format: {extension or file_path!r}")
+    columns = result.columns()
+    if FORMATS[extension] == 'excel':
+        write_excel(file_path, columns, inputs, summary, progress)
+    elif FORMATS[extension] == 'csv':
+        write_csv(file_path, columns, progress)
+    else:
+        write_parquet(file_path, columns, progress)
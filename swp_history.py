@@ -0,0 +1,427 @@
+"""Back-testing SWP plans against historical fund NAVs.
+
+    python swp_history.py convert navs.csv store/
+    python swp_history.py backtest store/ plan.json summaries.csv
+                          [--fund NAME ...] [--stride N] [--workers N]
+
+A NAV history (CSV or Parquet with ``fund``, ``date`` and ``nav`` columns,
+dates as DD/MM/YYYY or YYYY-MM-DD, daily or monthly) is converted once into
+a NAV store: a directory holding every fund's dates and NAVs as two flat
+.npy arrays, sorted by fund then date, plus a JSON index of where each fund
+starts. The store is opened memory-mapped, so a backtest only pages in the
+funds it reads, and worker processes share those pages through the OS
+cache instead of each holding a copy.
+
+A backtest replays a plan from every start date in a fund's history
+(rolling windows as long as the plan): the money is invested at that day's
+NAV and withdrawn on the plan's schedule, each withdrawal at the NAV of its
+date or, if there is none, the next published one. The month's growth is
+the change in NAV, in place of ``annual_return``; NAVs are already net of
+the fund's expenses, so ``expense_ratio`` is only charged on top (as a fee).
+Withdrawal amounts, exit load, tax and the stopping rule are those of the
+projection loop. All windows of a fund run together as NumPy arrays, a
+chunk of windows at a time, so memory is bounded by the chunk size and the
+plan length, not by the history.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+
+from swp_calendar import calendar_for
+from swp_engine import DATE_FORMAT, SWPInputs
+from swp_export import TableWriter, atomic_path
+from swp_montecarlo import withdraw
+from swp_parallel import default_workers
+from swp_policies import PATH_DEPENDENT, PolicyPaths, withdrawal_schedule
+
+STORE_VERSION = 1
+INDEX_FILE = 'index.json'
+DAYS_FILE = 'days.npy'
+NAV_FILE = 'nav.npy'
+
+HISTORY_COLUMNS = ('fund', 'date', 'nav')
+
+SUMMARY_FIELDS = ('fund', 'windows', 'first_start', 'last_start', 'success_rate',
+                  'min_months_sustainable', 'final_balance_p5', 'final_balance_p50',
+                  'final_balance_p95', 'total_withdrawn_p50')
+
+
+def _read_history(path, chunk_size):
+    """Yield lists of at most ``chunk_size`` (fund, date, nav) records from CSV or Parquet"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Reading Parquet NAV histories needs the pyarrow package") from None
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size,
+                                                        columns=list(HISTORY_COLUMNS)):
+            yield batch.to_pylist()
+        return
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        missing = [k for k in HISTORY_COLUMNS if k not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"NAV history is missing columns: {', '.join(missing)}")
+        chunk = []
+        for record in reader:
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _parse_day(value):
+    """A NAV date as a datetime64[D]"""
+    if isinstance(value, (date, datetime)):
+        return np.datetime64(value.strftime('%Y-%m-%d'), 'D')
+    text = str(value).strip()
+    try:
+        if '/' in text:
+            return np.datetime64(datetime.strptime(text, DATE_FORMAT).date(), 'D')
+        return np.datetime64(text, 'D')
+    except ValueError:
+        raise ValueError(f"Invalid NAV date: {text!r}") from None
+
+
+def convert_history(source, store_path, chunk_size=100000):
+    """Convert a CSV or Parquet NAV history into a NAV store; returns the number of funds.
+
+    The parsed columns (16 bytes per NAV) are held in memory while sorting;
+    the source rows are only read a chunk at a time.
+    """
+    funds = {}
+    parsed_days = {} # NAV files repeat the same few thousand dates across funds
+    ids, days, navs = [], [], []
+    for records in _read_history(source, chunk_size):
+        ids.append(np.array([funds.setdefault(str(r['fund']).strip(), len(funds))
+                             for r in records], dtype=np.int64))
+        chunk_days = []
+        for r in records:
+            value = r['date']
+            if value not in parsed_days:
+                parsed_days[value] = _parse_day(value)
+            chunk_days.append(parsed_days[value])
+        days.append(np.array(chunk_days, dtype='datetime64[D]'))
+        try:
+            navs.append(np.array([float(r['nav']) for r in records]))
+        except (TypeError, ValueError):
+            raise ValueError("NAV history has a NAV that is not a number") from None
+
+    ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+    days = np.concatenate(days) if days else np.empty(0, dtype='datetime64[D]')
+    navs = np.concatenate(navs) if navs else np.empty(0)
+    if not np.all(navs > 0):
+        raise ValueError("NAVs must be positive numbers")
+
+    order = np.lexsort((days, ids))
+    ids, days, navs = ids[order], days[order], navs[order]
+    duplicate = np.flatnonzero((ids[1:] == ids[:-1]) & (days[1:] == days[:-1]))
+    if len(duplicate):
+        names = list(funds)
+        i = duplicate[0]
+        raise ValueError(f"Two NAVs for {names[ids[i]]!r} on {days[i]}")
+
+    counts = np.bincount(ids, minlength=len(funds))
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    index = {'version': STORE_VERSION,
+             'funds': {name: [int(offsets[i]), int(counts[i])] for name, i in funds.items()}}
+
+    os.makedirs(store_path, exist_ok=True)
+    # The index is written last, so a store without one is incomplete
+    for name, values in ((DAYS_FILE, days), (NAV_FILE, navs)):
+        with atomic_path(os.path.join(store_path, name)) as temp_path:
+            with open(temp_path, 'wb') as f:
+                np.save(f, values)
+    with atomic_path(os.path.join(store_path, INDEX_FILE)) as temp_path:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+    return len(funds)
+
+
+class NAVStore:
+    """A converted NAV history, memory-mapped and read-only"""
+
+    def __init__(self, path):
+        try:
+            with open(os.path.join(path, INDEX_FILE), encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"Not a NAV store: {path!r}") from None
+        if index.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported NAV store version: {index.get('version')!r}")
+        self.path = path
+        self._spans = {name: tuple(span) for name, span in index['funds'].items()}
+        self._days = np.load(os.path.join(path, DAYS_FILE), mmap_mode='r')
+        self._nav = np.load(os.path.join(path, NAV_FILE), mmap_mode='r')
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __contains__(self, fund):
+        return fund in self._spans
+
+    @property
+    def funds(self):
+        return list(self._spans)
+
+    def series(self, fund):
+        """(dates as datetime64[D], NAVs) of one fund: views into the mapped files"""
+        if fund not in self._spans:
+            raise ValueError(f"Unknown fund: {fund!r}")
+        offset, count = self._spans[fund]
+        return self._days[offset:offset + count], self._nav[offset:offset + count]
+
+
+@lru_cache(maxsize=4)
+def open_store(path):
+    """Shared NAVStore for ``path`` (one mapping per process)"""
+    return NAVStore(path)
+
+
+@dataclass
+class BacktestResult:
+    """Outcome of one plan replayed from every start date in a fund's history"""
+    fund: str
+    n_months: int                   # length of every window
+    start_dates: np.ndarray         # datetime64[D], investment date of each window
+    months_sustainable: np.ndarray  # int64
+    total_withdrawn: np.ndarray
+    final_balance: np.ndarray
+    real_final_balance: np.ndarray
+    success: np.ndarray             # bool, still withdrawing at the end of the window
+
+    def __len__(self):
+        return len(self.start_dates)
+
+    @property
+    def success_rate(self):
+        """Fraction of start dates that sustained the plan; NaN with no windows"""
+        return float(self.success.mean()) if len(self) else float('nan')
+
+    def percentiles(self, name='final_balance', q=(5, 50, 95)):
+        """Percentiles of one per-window outcome across start dates"""
+        values = getattr(self, name)
+        if not len(values):
+            return {p: float('nan') for p in q}
+        return dict(zip(q, np.percentile(values, q).tolist()))
+
+
+@dataclass
+class _Timeline:
+    """Day-number lookups for one fund, so windows never touch datetime64 arrays"""
+    days: np.ndarray                # NAV dates as days since 1970
+    month_starts: np.ndarray        # first day of each month from the first NAV's month on
+    next_nav: np.ndarray            # index of the first NAV on or after each day from days[0]
+
+
+def _timeline(nav_days, n_months):
+    days = np.asarray(nav_days).view(np.int64)
+    months = nav_days[[0, -1]].astype('datetime64[M]').astype(np.int64)
+    # Every window ends within n_months + 1 months after the last NAV's month
+    month_starts = (np.arange(months[0], months[1] + n_months + 3).astype('datetime64[M]')
+                    .astype('datetime64[D]').astype(np.int64))
+    next_nav = np.searchsorted(days, np.arange(days[0], month_starts[-1]))
+    return _Timeline(days, month_starts, next_nav)
+
+
+def _nav_positions(timeline, start_positions, n_months, convention):
+    """(n_months, windows) index of the NAV each withdrawal uses; len(days) past the end"""
+    starts = timeline.days[start_positions]
+    start_months = np.searchsorted(timeline.month_starts, starts, side='right') - 1
+    month = start_months + np.arange(1, n_months + 1)[:, None]
+    month_start, next_month = timeline.month_starts[month], timeline.month_starts[month + 1]
+    if convention == "End of Month":
+        scheduled = next_month - 1
+    else:
+        # Same Day: clipped to shorter months and kept from then on, as in swp_calendar
+        start_day = starts - timeline.month_starts[start_months] + 1
+        day = np.minimum(next_month - month_start, start_day)
+        if start_day.max() > 28:
+            np.minimum.accumulate(day, axis=0, out=day)
+        scheduled = month_start + (day - 1)
+    position = timeline.next_nav[scheduled - timeline.days[0]]
+    if convention == "Business Day":
+        # Modified following: fall back to the last NAV before the date rather
+        # than roll into the next month
+        count = len(timeline.days)
+        rolled = np.where(position < count, timeline.days[np.minimum(position, count - 1)], next_month)
+        previous = timeline.days[np.maximum(position - 1, 0)]
+        back = (position > 0) & (rolled >= next_month) & (previous >= month_start)
+        position = np.where(back, position - 1, position)
+    return position
+
+
+def _replay(inputs, timeline, nav, start_positions, schedule, inflation):
+    """Run the windows starting at ``start_positions`` side by side (months down, windows across)"""
+    withdrawal, amount, fixed = schedule
+    n_months = len(withdrawal)
+    positions = _nav_positions(timeline, start_positions, n_months, inputs.date_convention)
+    valid = positions[-1] < len(timeline.days)
+    positions, start_positions = positions[:, valid], start_positions[valid]
+    starts = timeline.days[start_positions]
+
+    prices = np.concatenate((np.asarray(nav[start_positions])[None], nav[positions]))
+    growth = prices[1:] / prices[:-1]
+    if inputs.expense_ratio:
+        growth *= (1 - inputs.expense_ratio / 100) ** (1/12)
+    load_rate = np.where(timeline.days[positions] < starts + 365, inputs.exit_load / 100, 0.0)
+
+    size = len(starts)
+    balance = np.full(size, float(inputs.initial_amount))
+    invested = balance.copy()
+    active = balance > 0
+    months = np.zeros(size, dtype=np.int64)
+    withdrawn = np.zeros(size)
+    policy = PolicyPaths(inputs, size) if inputs.withdrawal_policy in PATH_DEPENDENT else None
+    for t in range(n_months):
+        months += active
+        after_growth = balance * growth[t]
+        due = amount[t]
+        if policy is not None:
+            policy_amount = policy.step(t, balance, after_growth)
+            if not fixed[t]:
+                due = policy_amount
+        if withdrawal[t]:
+            balance, invested, active, paid = withdraw(inputs, after_growth, balance, invested,
+                                                       active, due, load_rate[t])
+            withdrawn += paid
+        else:
+            balance = np.where(active, after_growth, balance)
+    real = balance / inflation[months]
+    return (starts.astype('datetime64[D]'), months, withdrawn, balance, real, active,
+            bool(valid.all()))
+
+
+def run_backtest(inputs, store, fund, stride=1, chunk_size=2048):
+    """Replay ``inputs`` from every ``stride``-th NAV date of ``fund`` in ``store``.
+
+    Windows are as long as the plan (its SWP start to end date); only start
+    dates whose whole window has NAVs are used.
+    """
+    if stride < 1 or chunk_size < 1:
+        raise ValueError("Stride and chunk size must be positive")
+    nav_days, nav = store.series(fund)
+    calendar = calendar_for(inputs)
+    schedule = withdrawal_schedule(inputs, calendar)
+    # inflation[m] deflates the balance after m months (the engine's factor for month m)
+    inflation = np.array([1.0] + calendar.inflation_factors(inputs.monthly_inflation))
+
+    parts = []
+    if len(calendar) and len(nav_days):
+        timeline = _timeline(nav_days, len(calendar))
+        candidates = np.arange(0, len(nav_days), stride)
+        for first in range(0, len(candidates), chunk_size):
+            part = _replay(inputs, timeline, nav, candidates[first:first + chunk_size],
+                           schedule, inflation)
+            parts.append(part)
+            if not part[-1]:
+                break # later start dates run past the end of the history too
+    if not parts:
+        empty = np.empty(0)
+        return BacktestResult(fund, len(calendar), np.empty(0, dtype='datetime64[D]'),
+                              np.empty(0, dtype=np.int64), empty, empty, empty,
+                              np.empty(0, dtype=bool))
+    columns = [np.concatenate(column) for column in list(zip(*parts))[:-1]]
+    return BacktestResult(fund, len(calendar), *columns)
+
+
+def _backtest_worker(inputs, store_path, fund, stride, chunk_size):
+    return run_backtest(inputs, open_store(store_path), fund, stride, chunk_size)
+
+
+def backtest_funds(inputs, store_path, funds=None, stride=1, chunk_size=2048, workers=1):
+    """Yield a BacktestResult for each fund (every fund in the store by default), in order.
+
+    With ``workers`` > 1 funds are spread over a process pool; each worker
+    maps the store itself, so only the plan and fund names are pickled.
+    """
+    store = open_store(store_path)
+    funds = store.funds if funds is None else list(funds)
+    for fund in funds:
+        if fund not in store:
+            raise ValueError(f"Unknown fund: {fund!r}")
+    if workers <= 1:
+        for fund in funds:
+            yield run_backtest(inputs, store, fund, stride, chunk_size)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        count = len(funds)
+        yield from pool.map(_backtest_worker, [inputs] * count, [store_path] * count, funds,
+                            [stride] * count, [chunk_size] * count)
+
+
+def summarize_backtests(results):
+    """Summary columns (SUMMARY_FIELDS) with one row per BacktestResult"""
+    rows = []
+    for result in results:
+        balance = result.percentiles('final_balance')
+        withdrawn = result.percentiles('total_withdrawn', (50,))
+        dates = [str(result.start_dates[i]) if len(result) else '' for i in (0, -1)]
+        minimum = int(result.months_sustainable.min()) if len(result) else 0
+        rows.append((result.fund, len(result), *dates, result.success_rate, minimum,
+                     balance[5], balance[50], balance[95], withdrawn[50]))
+    columns = list(zip(*rows)) or [()] * len(SUMMARY_FIELDS)
+    summary = {}
+    for name, values in zip(SUMMARY_FIELDS, columns):
+        if name in ('fund', 'first_start', 'last_start'):
+            summary[name] = np.array(values, dtype=object)
+        else:
+            dtype = np.int64 if name in ('windows', 'min_months_sustainable') else float
+            summary[name] = np.array(values, dtype=dtype)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Back-test SWP plans against historical NAVs.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help="convert a NAV history into a NAV store")
+    convert.add_argument('history', help="CSV or Parquet file with fund, date and nav columns")
+    convert.add_argument('store', help="directory to write the NAV store to")
+    backtest = commands.add_parser('backtest', help="replay a plan from every start date")
+    backtest.add_argument('store', help="NAV store directory")
+    backtest.add_argument('plan', help="JSON file of plan inputs (SWPCalculator.get_input_values keys)")
+    backtest.add_argument('summaries', help="output file, one row per fund (.csv or .parquet)")
+    backtest.add_argument('--fund', action='append', help="fund to test (repeatable; default all)")
+    backtest.add_argument('--stride', type=int, default=1,
+                          help="use every Nth NAV date as a start date (default 1)")
+    backtest.add_argument('--workers', type=int, default=1,
+                          help="worker processes; 0 uses every CPU (default 1)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        if args.command == 'convert':
+            count = convert_history(args.history, args.store)
+            print(f"{count:,} funds written to {args.store} in {time.perf_counter() - start:.2f} s",
+                  file=sys.stderr)
+            return 0
+        with open(args.plan, encoding='utf-8') as f:
+            inputs = SWPInputs.from_values(json.load(f))
+        results = backtest_funds(inputs, args.store, args.fund, args.stride,
+                                 workers=args.workers or default_workers())
+        with TableWriter(args.summaries) as writer:
+            summary = summarize_backtests(results)
+            writer.write(summary)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"{len(summary['fund']):,} funds, {int(summary['windows'].sum()):,} windows "
+          f"in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
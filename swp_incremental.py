@@ -0,0 +1,74 @@
+"""Incremental re-projection for interactive editing.
+
+The month-by-month loop is checkpointed every ``checkpoint_interval``
+months. When the next projection differs from the previous one only in
+late-horizon parameters (the SWP end date or individual month overrides),
+it resumes from the last checkpoint that the change cannot have affected,
+so extending a plan or editing a late override costs only the months after
+that checkpoint. Any other change falls back to a full run.
+"""
+from dataclasses import fields
+
+from swp_calendar import calendar_for
+from swp_engine import SWPResult, advance, initial_state
+
+# Fields whose changes only affect months from some point onwards
+LATE_FIELDS = {'swp_end_date', 'withdrawal_overrides'}
+
+
+def first_changed_override(old, new):
+    """Earliest month whose override differs, or None"""
+    months = [m for m in set(old) | set(new) if old.get(m) != new.get(m)]
+    return min(months) if months else None
+
+
+class IncrementalProjector:
+    """Drop-in for run_projection that reuses work from the previous call"""
+
+    def __init__(self, checkpoint_interval=12):
+        self.checkpoint_interval = checkpoint_interval
+        self.inputs = None
+        self.rows = []
+        self.checkpoints = []
+        self.final_state = None
+        # Month the last projection resumed from (0 = full run), for diagnostics
+        self.resumed_from = 0
+
+    def _resume_point(self, inputs):
+        """Latest saved state that is still valid for ``inputs``"""
+        if self.inputs is None:
+            return None
+        changed = {f.name for f in fields(inputs) if getattr(inputs, f.name) != getattr(self.inputs, f.name)}
+        if changed - LATE_FIELDS:
+            return None
+
+        limit = first_changed_override(self.inputs.withdrawal_overrides, inputs.withdrawal_overrides)
+        candidates = self.checkpoints + [self.final_state]
+        for state in reversed(candidates):
+            # Months up to state.month must be unaffected by override edits...
+            if limit is not None and state.month >= limit:
+                continue
+            # ...and must all fall inside the new horizon
+            if state.month > len(calendar_for(inputs)):
+                continue
+            return state
+        return None
+
+    def project(self, inputs):
+        state = self._resume_point(inputs)
+        if state is None:
+            state = initial_state(inputs)
+            checkpoints = []
+        else:
+            checkpoints = [c for c in self.checkpoints if c.month <= state.month]
+
+        rows = self.rows[:state.month]
+        self.resumed_from = state.month
+        final_state = advance(inputs, state, rows, checkpoints, self.checkpoint_interval)
+
+        self.inputs = inputs
+        self.rows = rows
+        self.checkpoints = checkpoints
+        self.final_state = final_state
+        return SWPResult.from_rows(rows, inputs.swp_start_date.day, final_state.total_withdrawn,
+                                   final_state.balance, final_state.month, inputs.date_convention)
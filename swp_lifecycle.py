@@ -0,0 +1,192 @@
+"""SIP-then-SWP lifecycle: a dated cash-flow schedule, the balance path and its XIRR.
+
+Money goes in before the SWP starts: the lump sum (``initial_amount`` at
+``investment_date``, which may be zero), a monthly SIP and any dated
+top-ups. Dated one-off withdrawals may come out at any time. Until the SWP
+start the corpus grows at the plan's return net of expense ratio, each flow
+earning from the month after the one it is made in, so the accumulation
+path is a closed form over the months (``G[k] * cumsum(flow / G)[k]``).
+Flows in the SWP's first month but before its start date, and a lump sum
+dated on or after the start, simply join the starting corpus. A plain lump
+sum invested in the month before the SWP start or later is therefore
+projected exactly as run_projection does; one invested earlier has grown by
+the time the SWP starts, where run_projection ignores that interval.
+
+The SWP phase is then the usual projection (swp_engine) of the accumulated
+corpus, with the cost basis carried over for tax and each one-off
+withdrawal added to its month's payout as an override. Exit load keeps the
+engine's single window from ``investment_date``; SIP instalments do not
+get windows of their own.
+
+From the investor's side, investments are outflows and SWP payouts,
+one-off withdrawals and the corpus left at the end are inflows, on their
+dates; the XIRR of those flows is solved with swp_xirr. lifecycle_xirrs
+solves many lifecycles in one vectorized call.
+"""
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+import numpy as np
+
+from swp_calendar import calendar_for, month_ordinal, withdrawal_calendar
+from swp_engine import SWPResult, advance, initial_state, parse_date, project
+from swp_policies import withdrawal_schedule
+from swp_xirr import xirr, xirr_series
+
+
+@dataclass
+class LifecycleResult:
+    """Accumulation months, the SWP projection that follows and the investor's cash flows"""
+    month_ordinal: np.ndarray       # int64, accumulation months before the SWP start
+    opening_balance: np.ndarray
+    growth: np.ndarray
+    contribution: np.ndarray        # lump sum, SIP and top-ups made in the month
+    withdrawal: np.ndarray          # one-off withdrawals in the month
+    closing_balance: np.ndarray
+    starting_corpus: float          # balance the SWP starts from
+    cost_basis: float               # of the starting corpus, for tax
+    schedule: SWPResult             # the SWP phase
+    flow_dates: np.ndarray          # datetime64[D], investor's cash flows in date order
+    flow_amounts: np.ndarray        # investments negative, money received positive
+
+    @property
+    def total_invested(self):
+        return float(-self.flow_amounts[self.flow_amounts < 0].sum())
+
+    @property
+    def xirr(self):
+        """Yearly XIRR of the whole lifecycle, NaN if there is none"""
+        return xirr(self.flow_dates, self.flow_amounts)
+
+
+def _dated(flows):
+    """(dates as datetime64[D], amounts) from (date, amount) pairs"""
+    flows = list(flows)
+    dates = np.array([np.datetime64(parse_date(d).date(), 'D') for d, _ in flows], dtype='datetime64[D]')
+    amounts = np.array([float(a) for _, a in flows], dtype=float)
+    if not np.all(np.isfinite(amounts)):
+        raise ValueError("Cash flow amounts must be finite")
+    return dates, amounts
+
+
+def _day(date):
+    return np.datetime64(date.date(), 'D')
+
+
+def _month_of(dates):
+    return dates.astype('datetime64[M]').astype(np.int64) + 1970 * 12
+
+
+def _swp_phase(inputs, corpus, cost_basis):
+    """Project the SWP from ``corpus``, whose purchase cost is ``cost_basis``"""
+    inputs = replace(inputs, initial_amount=corpus)
+    if not inputs.tax_rate or cost_basis == corpus:
+        return project(inputs)
+    # Tax depends on the cost basis, which the closed form and initial_state do not carry
+    rows = []
+    state = advance(inputs, replace(initial_state(inputs), invested=cost_basis), rows)
+    return SWPResult.from_rows(rows, inputs.swp_start_date.day, state.total_withdrawn, state.balance,
+                               state.month, inputs.date_convention)
+
+
+def _overrides(inputs, dates, amounts):
+    """inputs.withdrawal_overrides with one-off withdrawals added to their month's payout"""
+    calendar = calendar_for(inputs)
+    scheduled, amount, fixed = withdrawal_schedule(inputs, calendar)
+    overrides = dict(inputs.withdrawal_overrides)
+    months = _month_of(dates) - month_ordinal(inputs.swp_start_date) + 1
+    for date, month, value in zip(dates.tolist(), months.tolist(), amounts.tolist()):
+        if month > len(calendar):
+            raise ValueError(f"One-off withdrawal on {date:%d/%m/%Y} falls after the SWP end date")
+        if scheduled[month - 1] and not fixed[month - 1]:
+            raise ValueError(f"One-off withdrawals cannot be combined with {inputs.withdrawal_policy} "
+                             f"withdrawals in the same month ({date:%d/%m/%Y})")
+        base = overrides.get(month, amount[month - 1] if scheduled[month - 1] else 0.0)
+        overrides[month] = base + value
+    return overrides
+
+
+def run_lifecycle(inputs, sip_amount=0.0, sip_start_date=None, sip_end_date=None, cash_flows=()):
+    """Accumulate, then withdraw; returns a LifecycleResult.
+
+    The SIP invests ``sip_amount`` every month from ``sip_start_date``
+    (default: the investment date) up to ``sip_end_date`` (default: the
+    day before the SWP start), on the plan's date convention.
+    ``cash_flows`` are (date, amount) pairs: positive amounts are top-ups,
+    which must come before the SWP start, negative ones one-off
+    withdrawals. Dates may be datetimes or DD/MM/YYYY strings.
+    """
+    if sip_amount < 0:
+        raise ValueError("SIP amount cannot be negative")
+    start = _day(inputs.swp_start_date)
+    investment = _day(inputs.investment_date)
+    flow_dates, flow_amounts = _dated(cash_flows)
+    if np.any((flow_amounts > 0) & (flow_dates >= start)):
+        raise ValueError("Top-ups must be dated before the SWP start date")
+
+    # Investments: lump sum, SIP instalments and top-ups
+    in_dates = [np.array([investment]), flow_dates[flow_amounts > 0]]
+    in_amounts = [np.array([float(inputs.initial_amount)]), flow_amounts[flow_amounts > 0]]
+    if sip_amount:
+        sip_start = parse_date(sip_start_date) if sip_start_date is not None else inputs.investment_date
+        sip_end = parse_date(sip_end_date) if sip_end_date is not None else None
+        sip_dates = withdrawal_calendar(sip_start, sip_end or inputs.swp_start_date, 1,
+                                        inputs.date_convention).dates
+        sip_dates = sip_dates[sip_dates < start] if sip_end is None else sip_dates
+        if np.any(sip_dates >= start):
+            raise ValueError("SIP instalments must end before the SWP start date")
+        in_dates.append(sip_dates)
+        in_amounts.append(np.full(len(sip_dates), float(sip_amount)))
+    in_dates, in_amounts = np.concatenate(in_dates), np.concatenate(in_amounts)
+    in_dates, in_amounts = in_dates[in_amounts > 0], in_amounts[in_amounts > 0]
+    # One-off withdrawals before the SWP start come out of the accumulation, later ones out of the SWP
+    taken = flow_amounts < 0
+    before = flow_dates < start
+    out_dates, out_amounts = flow_dates[taken & before], -flow_amounts[taken & before]
+    later_dates, later_amounts = flow_dates[taken & ~before], -flow_amounts[taken & ~before]
+
+    # Accumulation: months from the first flow to the one before the SWP start
+    first_swp_month = month_ordinal(inputs.swp_start_date)
+    in_months = np.minimum(_month_of(in_dates), first_swp_month)
+    out_months = _month_of(out_dates)
+    first = int(min(in_months.min(initial=first_swp_month), out_months.min(initial=first_swp_month)))
+    ordinals = np.arange(first, first_swp_month + 1, dtype=np.int64)
+    contribution = np.bincount(in_months - first, in_amounts, minlength=len(ordinals))
+    withdrawal = np.bincount(out_months - first, out_amounts, minlength=len(ordinals))
+    net = contribution - withdrawal
+
+    rate = inputs.monthly_return
+    growth_factor = np.power(1 + rate, np.arange(len(ordinals) - 1, dtype=float))
+    closing = growth_factor * np.cumsum(net[:-1] / growth_factor)
+    negative = np.flatnonzero(closing < -1e-6 * max(1.0, float(in_amounts.sum())))
+    if len(negative):
+        month = (ordinals[negative[0]] - 1970 * 12).astype('datetime64[M]')
+        raise ValueError(f"One-off withdrawals in {month.astype(datetime):%m/%Y} exceed the balance")
+    closing = np.maximum(closing, 0.0)
+    opening = np.concatenate(([0.0], closing[:-1]))
+    corpus = (float(closing[-1]) if len(closing) else 0.0) + float(net[-1])
+    if corpus < 0:
+        raise ValueError("One-off withdrawals before the SWP start exceed the balance")
+    # As in the projection loop, withdrawals reduce the invested amount one for one
+    cost_basis = float(in_amounts.sum() - out_amounts.sum())
+
+    swp_inputs = inputs
+    if len(later_dates):
+        swp_inputs = replace(inputs, withdrawal_overrides=_overrides(inputs, later_dates, later_amounts))
+    schedule = _swp_phase(swp_inputs, corpus, cost_basis)
+
+    # The investor's view: money in negative, money out positive, the remaining corpus at the end
+    paid = schedule.swp_amount > 0
+    end = schedule.dates()[-1:] if len(schedule) else np.array([_day(inputs.swp_end_date)])
+    dates = np.concatenate((in_dates, out_dates, schedule.dates()[paid], end))
+    amounts = np.concatenate((-in_amounts, out_amounts, schedule.swp_amount[paid],
+                              [schedule.remaining_corpus]))
+    keep = amounts != 0
+    order = np.argsort(dates[keep], kind='stable')
+    return LifecycleResult(ordinals[:-1], opening, opening * rate, contribution[:-1], withdrawal[:-1],
+                           closing, corpus, cost_basis, schedule, dates[keep][order], amounts[keep][order])
+
+
+def lifecycle_xirrs(results):
+    """XIRR of every LifecycleResult in ``results``, solved together"""
+    return xirr_series((r.flow_dates, r.flow_amounts) for r in results)
@@ -0,0 +1,223 @@
+"""NAV and unit based SWP projection with FIFO lots and capital gains tax.
+
+The main engine approximates tax with a pro-rata gain ratio and charges
+exit load on everything redeemed in the first year. This module follows
+what a fund house does instead:
+
+* every purchase (the initial investment and each top-up) is a lot of
+  units bought at that month's NAV;
+* a withdrawal redeems units at the month's NAV, oldest lots first (FIFO);
+* exit load is charged per lot, on units held for less than
+  ``exit_load_days``, and is deducted from the redemption proceeds;
+* each lot's gain (sale value net of load minus cost) is short or long term
+  by its own holding period, and tax is worked out per financial year
+  (April to March): short-term losses offset long-term gains, and long-term
+  gains above the yearly exemption are taxed.
+
+Tax is the investor's liability on realised gains and is reported month by
+month (as the change in the year's liability so far); it is not redeemed
+from the fund, so the closing balance is simply units held times NAV.
+
+The lot queue is array backed and never walked one redemption at a time.
+Lots and redemptions are both intervals on the axis of cumulative units
+(bought, and sold), so FIFO matching is a merge of two sorted boundary
+arrays: every (lot, month) piece of a redemption comes out of one
+searchsorted pass, however many lots and withdrawals there are.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from swp_calendar import calendar_for
+from swp_engine import SWPResult
+from swp_policies import PATH_DEPENDENT, withdrawal_schedule
+
+# Initial NAV of the fund; results do not depend on it, only the unit counts do
+DEFAULT_NAV = 10.0
+
+# Redemption pieces shorter than this many units are rounding noise from the merge
+UNIT_EPSILON = 1e-9
+
+
+@dataclass
+class TaxRules:
+    """Capital gains rules. Rates are percentages; the defaults are for Indian equity funds."""
+    short_term_rate: float = 20.0
+    long_term_rate: float = 12.5
+    long_term_days: int = 365       # held for more than this many days: long term
+    long_term_exemption: float = 125000.0   # long-term gains tax free per financial year
+    exit_load_days: int = 365       # exit load applies to units held for fewer days
+
+    def __post_init__(self):
+        if self.long_term_days < 0 or self.exit_load_days < 0:
+            raise ValueError("Holding periods cannot be negative")
+        if self.long_term_exemption < 0:
+            raise ValueError("Long-term exemption cannot be negative")
+
+
+@dataclass
+class LotResult:
+    """An SWPResult schedule plus the unit, lot and gains detail behind it.
+
+    In ``schedule`` the SWP Amount column is the gross redemption value (the
+    payout is that minus ``exit_load``) and Tax is the month's change in tax
+    liability.
+    """
+    schedule: SWPResult
+    nav: np.ndarray                 # NAV on each withdrawal date
+    units: np.ndarray               # units held at the end of each month
+    top_up: np.ndarray              # amount invested each month
+    exit_load: np.ndarray
+    short_term_gain: np.ndarray
+    long_term_gain: np.ndarray
+    lot_units: np.ndarray           # units left in each lot at the end, in purchase order
+    lot_cost: np.ndarray            # purchase NAV of each lot
+    redemptions: int                # (lot, month) pieces redeemed
+
+    @property
+    def cost_basis(self):
+        """Purchase cost of the units still held"""
+        return float(np.dot(self.lot_units, self.lot_cost))
+
+
+def _lots(inputs, calendar, nav, top_ups):
+    """Per-lot arrays: units, cost NAV, purchase day and the month from which they can be sold"""
+    n = len(calendar)
+    months = np.array(sorted(top_ups), dtype=np.int64)
+    amounts = np.array([top_ups[m] for m in months.tolist()], dtype=float)
+    if len(months) and (months.min() < 1 or months.max() > n):
+        raise ValueError(f"Top-up months must be between 1 and {n}")
+    if np.any(amounts < 0):
+        raise ValueError("Top-up amounts cannot be negative")
+
+    # Top-ups are bought on the month's withdrawal date at its NAV, before the withdrawal
+    cost = np.concatenate(([nav[0]], nav[months]))
+    units = np.concatenate(([inputs.initial_amount], amounts)) / cost
+    day = np.concatenate(([np.datetime64(inputs.investment_date.date(), 'D')],
+                          calendar.dates[months - 1]))
+    available = np.concatenate(([1], months))
+    return units, cost, day, available, months, amounts
+
+
+def _financial_years(dates):
+    """Financial year (April to March) of each date, as the calendar year it starts in"""
+    months = dates.astype('datetime64[M]').astype(np.int64)
+    return (months - 3) // 12
+
+
+def _group_cumsum(values, groups):
+    """Running total of ``values`` restarting whenever ``groups`` changes (groups are sorted)"""
+    total = np.cumsum(values)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    offsets = np.repeat(np.r_[0.0, total[starts[1:] - 1]], np.diff(np.r_[starts, len(values)]))
+    return total - offsets
+
+
+def _tax(short_term, long_term, rules):
+    """Tax on a financial year's cumulative gains"""
+    long_term = long_term + np.minimum(short_term, 0) # Short-term losses offset long-term gains
+    return (rules.short_term_rate / 100 * np.maximum(short_term, 0) +
+            rules.long_term_rate / 100 * np.maximum(long_term - rules.long_term_exemption, 0))
+
+
+def run_lot_projection(inputs, rules=None, top_ups=None, initial_nav=DEFAULT_NAV):
+    """Project ``inputs`` lot by lot; ``top_ups`` maps month number -> amount invested.
+
+    ``inputs.exit_load`` is the load rate; ``inputs.tax_rate`` is not used,
+    ``rules`` decides the tax instead. Withdrawals follow a fixed schedule,
+    so policies that depend on the balance are not supported.
+    """
+    if inputs.withdrawal_policy in PATH_DEPENDENT:
+        raise ValueError(f"Lot projection does not support the {inputs.withdrawal_policy} policy")
+    rules = rules or TaxRules()
+    top_ups = top_ups or {}
+    calendar = calendar_for(inputs)
+    n = len(calendar)
+    if inputs.initial_amount <= 0 or n == 0:
+        if top_ups:
+            raise ValueError("Top-ups need a positive initial investment and SWP period")
+        empty = np.empty(0)
+        return LotResult(SWPResult.from_rows([], inputs.swp_start_date.day, 0,
+                                             inputs.initial_amount, 0, inputs.date_convention),
+                         empty, empty, empty, empty, empty, empty, empty, empty, 0)
+
+    # nav[k] is the NAV after k months of growth; month k is withdrawn at nav[k]
+    nav = initial_nav * np.power(1 + inputs.monthly_return, np.arange(n + 1))
+    lot_units, lot_cost, lot_day, lot_available, top_up_months, top_up_amounts = \
+        _lots(inputs, calendar, nav, top_ups)
+    top_up = np.zeros(n)
+    np.add.at(top_up, top_up_months - 1, top_up_amounts)
+
+    withdrawal, amount, _ = withdrawal_schedule(inputs, calendar)
+    wanted = np.where(withdrawal, amount / nav[1:], 0.0)
+
+    # Units bought by the end of each month, and units sold: selling is capped
+    # at what is held, i.e. sold[k] = min(sold[k-1] + wanted[k], bought[k])
+    bought = np.cumsum(np.bincount(lot_available - 1, weights=lot_units, minlength=n))
+    wanted_total = np.cumsum(wanted)
+    sold = wanted_total + np.minimum(np.minimum.accumulate(bought - wanted_total), 0)
+    units = bought - sold
+    closing = units * nav[1:]
+
+    # Stop rule of the main engine: a withdrawal leaving less than 10% of an
+    # SWP ends the plan, unless a later top-up refills it
+    last_top_up = top_up_months.max() if len(top_up_months) else 0
+    month = np.arange(1, n + 1)
+    stops = np.flatnonzero(withdrawal & (closing < inputs.swp_amount * 0.1) & (month >= last_top_up))
+    if len(stops):
+        n = int(stops[0]) + 1
+        month, withdrawal, nav, top_up = month[:n], withdrawal[:n], nav[:n + 1], top_up[:n]
+        bought, sold, units, closing = bought[:n], sold[:n], units[:n], closing[:n]
+        keep = lot_available <= n
+        lot_units, lot_cost, lot_day, lot_available = (
+            lot_units[keep], lot_cost[keep], lot_day[keep], lot_available[keep])
+
+    # FIFO: lot i covers units [lot_start[i], lot_start[i + 1]) of everything
+    # bought, month k's sale covers [sold[k - 1], sold[k]) of everything sold
+    lot_start = np.concatenate(([0.0], np.cumsum(lot_units)))
+    bounds = np.union1d(lot_start[lot_start < sold[-1]], np.concatenate(([0.0], sold)))
+    piece_start, piece_units = bounds[:-1], np.diff(bounds)
+    real = piece_units > UNIT_EPSILON
+    piece_start, piece_units = piece_start[real], piece_units[real]
+    lot = np.searchsorted(lot_start, piece_start, side='right') - 1
+    sale = np.searchsorted(sold, piece_start, side='right') # month index, 0-based
+
+    value = piece_units * nav[1:][sale]
+    held = (calendar.dates[sale] - lot_day[lot]).astype(np.int64)
+    load = np.where(held < rules.exit_load_days, value * inputs.exit_load / 100, 0.0)
+    gain = value - load - piece_units * lot_cost[lot]
+    long_term = held > rules.long_term_days
+    exit_load = np.bincount(sale, weights=load, minlength=n)
+    short_term_gain = np.bincount(sale, weights=np.where(long_term, 0.0, gain), minlength=n)
+    long_term_gain = np.bincount(sale, weights=np.where(long_term, gain, 0.0), minlength=n)
+    redeemed = np.bincount(sale, weights=value, minlength=n)
+
+    # Tax owed on the financial year so far, as a monthly change
+    year = _financial_years(calendar.dates[:n])
+    owed = _tax(_group_cumsum(short_term_gain, year), _group_cumsum(long_term_gain, year), rules)
+    tax = owed - np.where(np.r_[True, year[1:] != year[:-1]], 0.0, np.r_[0.0, owed[:-1]])
+
+    # Top-ups are bought after the month's growth, so only earlier units grow
+    bought_now = np.bincount(lot_available[1:] - 1, weights=lot_units[1:], minlength=n)
+    held_before = bought - bought_now - np.r_[0.0, sold[:-1]]
+    opening = held_before * nav[:-1]
+    real_value = closing / np.array(calendar.inflation_factors(inputs.monthly_inflation)[:n])
+    lot_left = np.clip(lot_start[1:] - sold[-1], 0, lot_units)
+
+    schedule = SWPResult(
+        month=month,
+        month_ordinal=calendar.month_ordinal[:n],
+        opening_balance=opening,
+        growth=held_before * (nav[1:] - nav[:-1]),
+        swp_amount=redeemed,
+        tax=tax,
+        closing_balance=closing,
+        real_value=real_value,
+        start_day=inputs.swp_start_date.day,
+        total_withdrawn=float(redeemed.sum()),
+        remaining_corpus=float(closing[-1]),
+        months_sustainable=n,
+        date_convention=inputs.date_convention,
+    )
+    return LotResult(schedule, nav[1:], units, top_up, exit_load, short_term_gain,
+                     long_term_gain, lot_left, lot_cost, int(len(piece_units)))
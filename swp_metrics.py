@@ -0,0 +1,123 @@
+"""Stage timings for calculations and exports.
+
+Each calculation (or export) is one run. The code that handles it times
+its stages with ``run.span(name)``, wherever they execute: input parsing on
+the GUI thread, the simulation on the worker thread, then the summary,
+table and chart back on the GUI thread. When the run is finished the
+recorder keeps it in a bounded history and, if a trace file is set,
+appends it as one JSON line.
+
+With ``profile_next`` set, the next run is also captured with cProfile: the
+profiler is switched on inside each span (cProfile only sees the thread it
+is enabled on), the stats are dumped to a .prof file when the run finishes,
+and the flag is cleared again.
+
+Only the standard library is used; nothing here imports Qt.
+"""
+import cProfile
+import io
+import itertools
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Functions listed in a run's profile summary
+PROFILE_LINES = 25
+
+
+class RunMetrics:
+    """Stage timings (seconds) and counters of one run"""
+
+    def __init__(self, run_id, kind, profiler=None):
+        self.run_id = run_id
+        self.kind = kind
+        self.started = time.time()
+        self.stages = {}
+        self.counters = {}
+        self.wall = None                # start to finish, including time spent waiting
+        self.profile_path = None
+        self.profile_summary = None
+        self._start = time.perf_counter()
+        self._profiler = profiler
+
+    @contextmanager
+    def span(self, name):
+        """Time the block as stage ``name``; repeated stages add up"""
+        if self._profiler is not None:
+            self._profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+            if self._profiler is not None:
+                self._profiler.disable()
+
+    def count(self, **counters):
+        self.counters.update(counters)
+
+    def to_dict(self):
+        return {
+            'run_id': self.run_id,
+            'kind': self.kind,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'wall': self.wall,
+            'stages': dict(self.stages),
+            'counters': dict(self.counters),
+            'profile': self.profile_path,
+        }
+
+
+class MetricsRecorder:
+    """Hands out RunMetrics and keeps the last ``history`` finished runs.
+
+    ``trace_path``, if given, receives one JSON object per finished run.
+    Profiles are written to ``profile_dir`` (the temporary directory by
+    default).
+    """
+
+    def __init__(self, history=50, trace_path=None, profile_next=False, profile_dir=None):
+        self.trace_path = trace_path
+        self.profile_next = profile_next
+        self.profile_dir = profile_dir or tempfile.gettempdir()
+        self._runs = deque(maxlen=history)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, kind):
+        profiler = None
+        if self.profile_next:
+            self.profile_next = False
+            profiler = cProfile.Profile()
+        return RunMetrics(next(self._ids), kind, profiler)
+
+    def finish(self, run, **counters):
+        """Record a completed run; returns it"""
+        run.wall = time.perf_counter() - run._start
+        run.count(**counters)
+        if run._profiler is not None:
+            self._save_profile(run)
+        with self._lock:
+            self._runs.append(run)
+            if self.trace_path:
+                with open(self.trace_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(run.to_dict()) + '\n')
+        return run
+
+    def runs(self):
+        """Finished runs, oldest first"""
+        with self._lock:
+            return list(self._runs)
+
+    def _save_profile(self, run):
+        profiler, run._profiler = run._profiler, None
+        run.profile_path = os.path.join(self.profile_dir, f"swp_profile_{os.getpid()}_{run.run_id}.prof")
+        profiler.dump_stats(run.profile_path)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        run.profile_summary = text.getvalue()
@@ -0,0 +1,298 @@
+"""Monte Carlo sequence-of-returns analysis for SWP plans.
+
+Instead of a constant monthly return, each path draws a return every month
+(normal, lognormal, or bootstrapped from a supplied series) and runs through
+the same withdrawal rules as swp_engine.run_projection. Paths are simulated
+in fixed-size chunks, month by month across the chunk, and each month's
+balances are folded into a log-spaced histogram. Percentile bands come from
+the histograms, so memory stays bounded by the chunk size and the number of
+bins, not the number of paths.
+
+Withdrawal policies that follow the balance (see swp_policies) are stepped
+across the chunk's paths together with the balances. compare_policies runs
+several policies on the same return paths.
+"""
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+
+from swp_calendar import calendar_for
+from swp_policies import PATH_DEPENDENT, PolicyPaths, withdrawal_schedule
+
+DISTRIBUTIONS = ("normal", "lognormal", "bootstrap")
+
+# Histogram layout: balances between scale * 1e-4 and scale * 1e4 on a log grid
+HISTOGRAM_BINS = 2048
+HISTOGRAM_RANGE = (1e-4, 1e4)
+
+
+@dataclass
+class MonteCarloSettings:
+    """How paths are generated. Rates are percentages, like SWPInputs."""
+    paths: int = 10000
+    distribution: str = "normal"
+    volatility: float = 15.0        # annualised, for normal/lognormal
+    return_series: object = None    # monthly returns in % to resample, for bootstrap
+    seed: object = None
+    chunk_size: int = 65536
+    percentiles: tuple = (5, 50, 95)
+
+    def __post_init__(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown return distribution: {self.distribution!r}")
+        if self.paths <= 0:
+            raise ValueError("Number of Monte Carlo paths must be positive")
+        if self.distribution == "bootstrap" and (self.return_series is None or len(self.return_series) == 0):
+            raise ValueError("Bootstrap sampling needs a return series")
+
+
+@dataclass
+class MonteCarloResult:
+    """Percentile bands of the closing balance, one value per month"""
+    months: np.ndarray
+    bands: dict
+    survival: np.ndarray            # fraction of paths still withdrawing after each month
+    success_probability: float
+    paths: int
+    seed: int
+
+
+class BalanceHistogram:
+    """Per-month histogram of balances on a log grid; mergeable across chunks"""
+
+    def __init__(self, n_months, scale, bins=HISTOGRAM_BINS):
+        lo, hi = HISTOGRAM_RANGE
+        self.lo = scale * lo
+        self.log_step = np.log(hi / lo) / bins
+        self.bins = bins
+        # Bin 0 holds balances below lo (including depleted paths), the last bin those above hi
+        self.counts = np.zeros((n_months, bins + 2), dtype=np.int64)
+
+    def add(self, month_index, balances):
+        with np.errstate(divide='ignore'):
+            position = np.floor(np.log(np.maximum(balances, self.lo * 0.5) / self.lo) / self.log_step)
+        index = np.clip(position + 1, 0, self.bins + 1).astype(np.intp)
+        self.counts[month_index] += np.bincount(index, minlength=self.bins + 2)
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    def quantile(self, q):
+        """Balance at percentile ``q`` for every month, interpolated within a bin"""
+        cumulative = np.cumsum(self.counts, axis=1)
+        target = cumulative[:, -1:] * (q / 100)
+        b = np.minimum((cumulative < target).sum(axis=1), self.bins + 1)
+        rows = np.arange(len(b))
+        before = np.where(b > 0, cumulative[rows, np.maximum(b - 1, 0)], 0)
+        in_bin = np.maximum(self.counts[rows, b], 1)
+        fraction = np.clip((target[:, 0] - before) / in_bin, 0, 1)
+        inner = np.clip(b - 1, 0, self.bins - 1)
+        values = self.lo * np.exp((inner + fraction) * self.log_step)
+        values[b == 0] = 0.0
+        values[b == self.bins + 1] = self.lo * np.exp(self.bins * self.log_step)
+        return values
+
+
+@dataclass
+class MonteCarloAccumulator:
+    """Partial aggregates from one or more chunks of paths"""
+    histogram: BalanceHistogram
+    active: np.ndarray
+    paths: int = 0
+    successes: int = 0
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.active += other.active
+        self.paths += other.paths
+        self.successes += other.successes
+
+
+@dataclass
+class MonteCarloPlan:
+    """Per-run constants shared by every chunk"""
+    inputs: object
+    settings: MonteCarloSettings
+    entropy: int
+    n_months: int
+    withdrawal: np.ndarray
+    amount: np.ndarray
+    fixed: np.ndarray               # False where a path-dependent policy decides the amount
+    load_rate: np.ndarray
+    scale: float
+    series: np.ndarray = field(default=None)
+
+    @property
+    def chunk_count(self):
+        return -(-self.settings.paths // self.settings.chunk_size)
+
+    def chunk_paths(self, chunk_index):
+        start = chunk_index * self.settings.chunk_size
+        return min(self.settings.chunk_size, self.settings.paths - start)
+
+    def new_accumulator(self):
+        return MonteCarloAccumulator(BalanceHistogram(self.n_months, self.scale),
+                                     np.zeros(self.n_months, dtype=np.int64))
+
+
+def plan_monte_carlo(inputs, settings):
+    """Precompute everything the chunks share"""
+    calendar = calendar_for(inputs)
+    n_months = len(calendar)
+    withdrawal, amount, fixed = withdrawal_schedule(inputs, calendar)
+    load_rate = np.zeros(n_months)
+    if inputs.exit_load:
+        load_rate[:calendar.exit_load_months(inputs.investment_date)] = inputs.exit_load / 100
+
+    series = None
+    if settings.distribution == "bootstrap":
+        # Expense ratio is charged as a constant monthly fraction on resampled returns
+        fee = (1 - inputs.expense_ratio / 100) ** (1/12)
+        series = (1 + np.asarray(settings.return_series, dtype=float) / 100) * fee - 1
+
+    entropy = settings.seed
+    if entropy is None:
+        entropy = np.random.SeedSequence().entropy
+    scale = max(inputs.initial_amount, inputs.swp_amount * 12, 1.0)
+    return MonteCarloPlan(inputs, settings, entropy, n_months, withdrawal, amount, fixed,
+                          load_rate, scale, series)
+
+
+def _return_sampler(plan, rng, size):
+    """Callable drawing one month of returns for ``size`` paths"""
+    settings = plan.settings
+    mean = plan.inputs.monthly_return
+    if settings.distribution == "bootstrap":
+        series = plan.series
+        return lambda: series[rng.integers(0, len(series), size)]
+
+    sigma = settings.volatility / 100 / np.sqrt(12)
+    if settings.distribution == "lognormal":
+        # Log-returns chosen so that 1 + r has the deterministic mean and volatility
+        log_sigma = np.sqrt(np.log1p((sigma / (1 + mean)) ** 2))
+        log_mean = np.log1p(mean) - log_sigma ** 2 / 2
+        return lambda: np.expm1(rng.normal(log_mean, log_sigma, size))
+    return lambda: np.maximum(rng.normal(mean, sigma, size), -0.99)
+
+
+def withdraw(inputs, after_growth, balance, invested, active, amount, load_rate):
+    """One withdrawal month of the projection loop for many paths at once.
+
+    ``load_rate`` is a fraction, per path or shared. Paths that are no
+    longer ``active`` keep their balance. Returns the new (balance,
+    invested, active) and the amount paid out on each path.
+    """
+    tax_rate = inputs.tax_rate / 100
+    actual = np.minimum(amount, after_growth)
+    deductions = actual * (1 + load_rate)
+    if tax_rate:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gain_ratio = np.where(after_growth > 0, (after_growth - invested) / after_growth, 0)
+        gain_ratio = np.where(invested > 0, gain_ratio, 1)
+        deductions += actual * gain_ratio * tax_rate
+    covered = after_growth >= deductions
+    # As in the projection loop, a balance that cannot cover the charges is
+    # paid out net of tax and the full exit load rate
+    short = after_growth / (1 + tax_rate + inputs.exit_load / 100)
+    paid = np.where(active, np.where(covered, actual, short), 0.0)
+    new_balance = np.where(covered, after_growth - deductions, 0.0)
+    invested = invested - paid
+    balance = np.where(active, new_balance, balance)
+    # Same stopping rule as the projection loop
+    active = active & (balance >= inputs.swp_amount * 0.1) & (balance > 0)
+    return balance, invested, active, paid
+
+
+def simulate_chunk(plan, chunk_index):
+    """Run one chunk of paths and return its MonteCarloAccumulator.
+
+    Chunk ``i`` always draws from the seed sequence child ``(entropy, i)``,
+    so results do not depend on how chunks are scheduled.
+    """
+    inputs = plan.inputs
+    size = plan.chunk_paths(chunk_index)
+    rng = np.random.default_rng(np.random.SeedSequence(plan.entropy, spawn_key=(chunk_index,)))
+    draw = _return_sampler(plan, rng, size)
+
+    accumulator = plan.new_accumulator()
+
+    balance = np.full(size, float(inputs.initial_amount))
+    invested = balance.copy() # Initial investment remaining, for capital gain calculation
+    active = balance > 0
+    policy = PolicyPaths(inputs, size) if inputs.withdrawal_policy in PATH_DEPENDENT else None
+
+    for t in range(plan.n_months):
+        after_growth = balance * (1 + draw())
+        amount = plan.amount[t]
+        if policy is not None:
+            due = policy.step(t, balance, after_growth)
+            if not plan.fixed[t]:
+                amount = due
+
+        if plan.withdrawal[t]:
+            balance, invested, active, _ = withdraw(inputs, after_growth, balance, invested, active,
+                                                    amount, plan.load_rate[t])
+        else:
+            balance = np.where(active, after_growth, balance)
+
+        accumulator.histogram.add(t, balance)
+        accumulator.active[t] = np.count_nonzero(active)
+
+    accumulator.paths = size
+    accumulator.successes = int(np.count_nonzero(active))
+    return accumulator
+
+
+def summarize(plan, accumulator):
+    """Turn merged aggregates into a MonteCarloResult"""
+    paths = max(accumulator.paths, 1)
+    bands = {q: accumulator.histogram.quantile(q) for q in plan.settings.percentiles}
+    return MonteCarloResult(
+        months=np.arange(1, plan.n_months + 1),
+        bands=bands,
+        survival=accumulator.active / paths,
+        success_probability=accumulator.successes / paths,
+        paths=accumulator.paths,
+        seed=plan.entropy,
+    )
+
+
+def run_monte_carlo(inputs, settings=None, progress=None):
+    """Simulate ``settings.paths`` return sequences for ``inputs``.
+
+    ``progress(done, total)``, if given, is called after every chunk.
+    """
+    settings = settings or MonteCarloSettings()
+    plan = plan_monte_carlo(inputs, settings)
+    total = plan.new_accumulator()
+    if plan.n_months:
+        for chunk_index in range(plan.chunk_count):
+            total.merge(simulate_chunk(plan, chunk_index))
+            if progress is not None:
+                progress(chunk_index + 1, plan.chunk_count)
+    else:
+        total.paths = total.successes = settings.paths
+    return summarize(plan, total)
+
+
+def compare_policies(inputs, policies, settings=None, progress=None):
+    """Monte Carlo results for variants of ``inputs``, keyed like ``policies``.
+
+    ``policies`` maps a label to the fields to change, e.g.
+    ``{'fixed': {}, 'guardrails': {'withdrawal_policy': "Guardrails"}}``.
+    Every variant runs on the same seed, so all of them see the same
+    return paths and differ only by their withdrawals.
+    ``progress(done, total)`` counts chunks over all variants.
+    """
+    settings = settings or MonteCarloSettings()
+    if settings.seed is None:
+        settings = replace(settings, seed=np.random.SeedSequence().entropy)
+    variants = {label: replace(inputs, **changes) for label, changes in policies.items()}
+    chunks = -(-settings.paths // settings.chunk_size)
+    results = {}
+    for i, (label, variant) in enumerate(variants.items()):
+        chunk_progress = None
+        if progress is not None:
+            chunk_progress = lambda done, _, offset=i * chunks: progress(offset + done, len(variants) * chunks)
+        results[label] = run_monte_carlo(variant, settings, chunk_progress)
+    return results
@@ -0,0 +1,132 @@
+"""Multi-process execution of scenario batches and Monte Carlo runs.
+
+Work is split into contiguous shards, one per task, and run in a process
+pool. Workers write their output straight into shared-memory arrays owned
+by the parent, so only the inputs and a shard descriptor are pickled. Shard
+results are merged in shard order, and Monte Carlo chunks keep their seed
+from the chunk index, so a parallel run returns exactly what the serial one
+does regardless of the worker count.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from swp_batch import BatchSummary, INPUT_KEYS, _broadcast_inputs, evaluate_batch
+from swp_montecarlo import (MonteCarloSettings, plan_monte_carlo, simulate_chunk,
+                            summarize)
+
+BATCH_FIELDS = (('total_withdrawn', np.float64), ('remaining_corpus', np.float64),
+                ('months_sustainable', np.int64), ('real_remaining_corpus', np.float64))
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def shard_bounds(count, shards):
+    """Split range(count) into at most ``shards`` contiguous (start, stop) pairs"""
+    shards = max(1, min(shards, count))
+    edges = np.linspace(0, count, shards + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+@contextmanager
+def shared_array(shape, dtype):
+    """Allocate a zeroed array in shared memory; yields (name, array)"""
+    dtype = np.dtype(dtype)
+    size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        array[...] = 0
+        yield block.name, array
+        del array
+    finally:
+        block.close()
+        block.unlink()
+
+
+@contextmanager
+def attach_array(name, shape, dtype):
+    """Map an existing shared-memory array inside a worker"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        yield array
+        del array
+    finally:
+        block.close()
+
+
+def _batch_worker(flat_slice, start, stop, count, buffers):
+    summary = evaluate_batch(flat_slice)
+    for (field, dtype), name in zip(BATCH_FIELDS, buffers):
+        with attach_array(name, (count,), dtype) as out:
+            out[start:stop] = getattr(summary, field)
+
+
+def run_batch_parallel(values, workers=None):
+    """Parallel evaluate_batch: same inputs, same BatchSummary"""
+    workers = workers or default_workers()
+    shape, flat = _broadcast_inputs(values)
+    count = flat['initial_amount'].size
+    shards = shard_bounds(count, workers)
+
+    with ExitStack() as stack:
+        blocks = [stack.enter_context(shared_array((count,), dtype)) for _, dtype in BATCH_FIELDS]
+        names = [name for name, _ in blocks]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_batch_worker, {k: flat[k][a:b] for k in INPUT_KEYS},
+                                   a, b, count, names)
+                       for a, b in shards]
+            for future in futures:
+                future.result()
+        results = [array.reshape(shape).copy() for _, array in blocks]
+    return BatchSummary(*results)
+
+
+def _monte_carlo_worker(plan, chunks, slot, counts_name, counts_shape, totals_name, totals_shape):
+    merged = plan.new_accumulator()
+    for chunk_index in chunks:
+        merged.merge(simulate_chunk(plan, chunk_index))
+    with attach_array(counts_name, counts_shape, np.int64) as counts:
+        counts[slot] = merged.histogram.counts
+    with attach_array(totals_name, totals_shape, np.int64) as totals:
+        totals[slot, 0] = merged.paths
+        totals[slot, 1] = merged.successes
+        totals[slot, 2:] = merged.active
+
+
+def run_monte_carlo_parallel(inputs, settings=None, workers=None):
+    """Parallel run_monte_carlo; identical output for the same seed"""
+    settings = settings or MonteCarloSettings()
+    workers = workers or default_workers()
+    plan = plan_monte_carlo(inputs, settings)
+    total = plan.new_accumulator()
+    if not plan.n_months:
+        total.paths = total.successes = settings.paths
+        return summarize(plan, total)
+
+    shards = shard_bounds(plan.chunk_count, workers)
+    counts_shape = (len(shards),) + total.histogram.counts.shape
+    totals_shape = (len(shards), 2 + plan.n_months)
+
+    with shared_array(counts_shape, np.int64) as (counts_name, counts), \
+            shared_array(totals_shape, np.int64) as (totals_name, totals):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_monte_carlo_worker, plan, range(a, b), slot,
+                                   counts_name, counts_shape, totals_name, totals_shape)
+                       for slot, (a, b) in enumerate(shards)]
+            for future in futures:
+                future.result()
+
+        # Merge shard aggregates in shard order
+        for slot in range(len(shards)):
+            total.histogram.counts += counts[slot]
+            total.paths += int(totals[slot, 0])
+            total.successes += int(totals[slot, 1])
+            total.active += totals[slot, 2:]
+    return summarize(plan, total)
@@ -0,0 +1,140 @@
+"""Withdrawal policies: how much each withdrawal takes.
+
+    Fixed              the SWP amount every time
+    Inflation Indexed  the SWP amount, raised by the inflation rate on every
+                       anniversary of the SWP start
+    Annual Step-Up     the SWP amount, raised by ``step_up`` % on every
+                       anniversary
+    Percent of Corpus  ``corpus_rate`` % a year of the balance after that
+                       month's growth, spread evenly over the year's
+                       withdrawals
+    Guardrails         Guyton-Klinger: starts at the SWP amount. On every
+                       anniversary it rises with inflation (unless the year's
+                       returns were negative and the withdrawal rate is above
+                       the initial one), then it is cut by
+                       ``guardrail_step`` % if the withdrawal rate is more
+                       than ``guardrail_band`` % above the initial rate, or
+                       raised by as much if it is that far below
+
+A month override still replaces the policy's amount in its month. The stop
+rule is unchanged: a withdrawal that leaves less than 10% of the SWP amount
+ends the plan.
+
+The first three policies do not depend on the balance. Their amounts are a
+fixed schedule (withdrawal_schedule), so the closed forms still apply. The
+last two have to follow the balance. Guardrails.apply works on a scalar or an
+array, and PolicyPaths carries the state of many paths of one plan. The
+loop, the closed form, Monte Carlo, backtests and the batch engine therefore
+all make the same decisions.
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+WITHDRAWAL_POLICIES = ("Fixed", "Inflation Indexed", "Annual Step-Up", "Percent of Corpus",
+                       "Guardrails")
+
+# Policies whose amounts depend on the balance rather than on a fixed schedule
+PATH_DEPENDENT = ("Percent of Corpus", "Guardrails")
+
+# Months between policy anniversaries
+POLICY_YEAR = 12
+
+
+def check_policy(inputs):
+    if inputs.withdrawal_policy not in WITHDRAWAL_POLICIES:
+        raise ValueError(f"Unknown withdrawal policy: {inputs.withdrawal_policy!r}")
+    if 1 + inputs.step_up / 100 <= 0:
+        raise ValueError("Annual step-up must be above -100%")
+    if not 0 <= inputs.corpus_rate <= 100 * inputs.freq_factor:
+        raise ValueError("Percent of corpus must be between 0% and 100% of the balance per withdrawal")
+    if not 0 <= inputs.guardrail_band < 100 or not 0 <= inputs.guardrail_step < 100:
+        raise ValueError("Guardrail band and adjustment must be between 0% and 100%")
+
+
+def annual_factor(inputs):
+    """Yearly growth of a scheduled withdrawal amount"""
+    if inputs.withdrawal_policy == "Inflation Indexed":
+        return 1 + inputs.inflation_rate / 100
+    if inputs.withdrawal_policy == "Annual Step-Up":
+        return 1 + inputs.step_up / 100
+    return 1.0
+
+
+def withdrawal_schedule(inputs, calendar):
+    """(withdrawal month mask, amount due each month, fixed mask), overrides included.
+
+    Where ``fixed`` is False the amount is decided by a path-dependent
+    policy (PolicyPaths) and ``amount`` only holds the SWP amount.
+    """
+    n_months = len(calendar)
+    withdrawal = calendar.withdrawal.copy()
+    amount = np.full(n_months, float(inputs.swp_amount))
+    factor = annual_factor(inputs)
+    if factor != 1:
+        amount *= np.power(factor, np.arange(n_months) // POLICY_YEAR)
+    fixed = np.full(n_months, inputs.withdrawal_policy not in PATH_DEPENDENT)
+    for month, value in inputs.withdrawal_overrides.items():
+        if 1 <= month <= n_months:
+            withdrawal[month - 1] = True
+            amount[month - 1] = value
+            fixed[month - 1] = True
+    return withdrawal, amount, fixed
+
+
+@dataclass
+class Guardrails:
+    """Guyton-Klinger decision rules. Fields are fractions, scalars or one per path."""
+    initial_rate: object            # annual withdrawals / initial investment
+    inflation: object
+    band: object
+    adjustment: object
+    per_year: object                # withdrawals per year
+
+    @classmethod
+    def from_inputs(cls, inputs):
+        per_year = inputs.freq_factor
+        initial_rate = (inputs.swp_amount * per_year / inputs.initial_amount
+                        if inputs.initial_amount > 0 else 0.0)
+        return cls(initial_rate, inputs.inflation_rate / 100, inputs.guardrail_band / 100,
+                   inputs.guardrail_step / 100, per_year)
+
+    def take(self, index):
+        """The rules of the paths at ``index`` (fields must be arrays)"""
+        return Guardrails(*(np.asarray(getattr(self, f.name))[index] for f in fields(self)))
+
+    def apply(self, amount, opening, year_growth):
+        """Amount for the policy year that starts with balance ``opening``.
+
+        ``year_growth`` is the growth earned over the year that just ended.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = amount * self.per_year / opening
+            # Inflation rule: no raise after a losing year while above the initial rate
+            held = (year_growth < 0) & (rate > self.initial_rate)
+            amount = np.where(held, amount, amount * (1 + self.inflation))
+            rate = amount * self.per_year / opening
+        cut = rate > self.initial_rate * (1 + self.band)
+        raised = rate < self.initial_rate * (1 - self.band)
+        return np.where(cut, amount * (1 - self.adjustment),
+                        np.where(raised, amount * (1 + self.adjustment), amount))
+
+
+class PolicyPaths:
+    """State of a path-dependent policy across many paths of one plan"""
+
+    def __init__(self, inputs, size):
+        self.corpus_rate = inputs.corpus_rate / 100 / inputs.freq_factor
+        self.rules = Guardrails.from_inputs(inputs) if inputs.withdrawal_policy == "Guardrails" else None
+        self.amount = np.full(size, float(inputs.swp_amount))
+        self.year_growth = np.zeros(size)
+
+    def step(self, t, opening, after_growth):
+        """Policy amount on every path in month index ``t``; call every month, in order"""
+        if self.rules is None:
+            return self.corpus_rate * after_growth
+        if t and t % POLICY_YEAR == 0:
+            self.amount = self.rules.apply(self.amount, opening, self.year_growth)
+            self.year_growth = np.zeros(len(self.amount))
+        self.year_growth += after_growth - opening
+        return self.amount
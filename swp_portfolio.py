@@ -0,0 +1,280 @@
+"""Multi-fund portfolios: per-fund returns and charges, withdrawal order and rebalancing.
+
+The plan (amount, dates, frequency, tax, inflation, withdrawal policy)
+comes from SWPInputs; its annual_return, expense_ratio and exit_load are
+replaced by the funds' own. The corpus is split across the funds by
+target allocation. Each fund grows at its own return net of its expense
+ratio and charges its own exit load inside the plan's exit-load window.
+
+Each withdrawal the policy asks for (see swp_policies) is taken from the
+funds in one of WITHDRAWAL_ORDERS:
+
+    Waterfall  the first fund until it is empty, then the next, in the
+               order the funds are given (e.g. liquid, debt, equity)
+    Pro Rata   from every fund in proportion to its balance
+
+Tax is the projection loop's pro-rata gain rule, applied per fund with the
+fund's own cost basis. If the whole portfolio cannot cover a withdrawal and
+its charges, every fund is paid out as the loop pays out a single corpus
+and the plan ends; the stop rule is the loop's too, on the total balance.
+A one-fund portfolio therefore reproduces run_projection.
+
+At the end of every rebalancing month (counted from the SWP start) the funds
+are reset to their target allocation. Switches are not charged tax or exit
+load; the cost basis follows the units sold and bought.
+
+Balances are (portfolio, fund) arrays stepped month by month: a batch of
+thousands of portfolios takes the same number of NumPy calls as one, and
+the waterfall is a cumulative sum along the fund axis rather than a loop
+over funds. run_portfolio keeps the (fund, month) schedule of one portfolio,
+evaluate_portfolios only the summaries of many.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from swp_batch import BatchSummary
+from swp_calendar import calendar_for
+from swp_engine import SWPResult
+from swp_policies import PATH_DEPENDENT, PolicyPaths, withdrawal_schedule
+
+WITHDRAWAL_ORDERS = ("Waterfall", "Pro Rata")
+
+# Months between rebalances; "Never" keeps the funds drifting
+REBALANCE_INTERVALS = {"Never": 0, "Monthly": 1, "Quarterly": 3, "Half-Yearly": 6, "Yearly": 12}
+
+# Smallest charge per unit used to size what a fund can pay out. A fund deep
+# in loss earns a tax credit (negative gain ratio) that can make its charge
+# zero or negative; it is then never short, and is charged as the loop does.
+MIN_CHARGE = 1e-9
+
+
+@dataclass
+class Fund:
+    """One fund of a portfolio. Rates are percentages, like SWPInputs."""
+    name: str
+    allocation: float               # target weight; weights are scaled to add up to 100%
+    annual_return: float
+    expense_ratio: float = 0.0
+    exit_load: float = 0.0
+
+    def __post_init__(self):
+        if self.allocation < 0:
+            raise ValueError(f"Allocation of {self.name} cannot be negative")
+        if 1 + (self.annual_return - self.expense_ratio) / 100 <= 0:
+            raise ValueError(f"Annual return of {self.name} net of expense ratio must be above -100%")
+
+
+@dataclass
+class PortfolioResult:
+    """Portfolio totals as an SWPResult plus (fund, month) detail.
+
+    ``schedule`` has the usual columns summed over the funds; its SWP Amount
+    and Tax are what the waterfall took from all of them.
+    """
+    schedule: SWPResult
+    fund_names: list
+    fund_closing: np.ndarray        # (fund, month) closing balances, after any rebalance
+    fund_withdrawn: np.ndarray      # (fund, month) amounts paid out of each fund
+    fund_tax: np.ndarray            # (fund, month)
+
+    @property
+    def fund_remaining(self):
+        """Closing balance of each fund at the end"""
+        if self.fund_closing.shape[1] == 0:
+            return np.zeros(len(self.fund_names))
+        return self.fund_closing[:, -1]
+
+
+@dataclass
+class PortfolioSummary(BatchSummary):
+    """BatchSummary plus the closing balance of each fund, shaped (..., fund)"""
+    fund_remaining: np.ndarray
+
+
+def _fund_arrays(allocation, annual_return, expense_ratio, exit_load):
+    """Broadcast per-fund inputs to (..., fund): normalised weights, monthly return, load fraction"""
+    allocation, annual_return, expense_ratio, exit_load = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (allocation, annual_return, expense_ratio, exit_load)))
+    if allocation.ndim == 0 or allocation.shape[-1] == 0:
+        raise ValueError("A portfolio needs at least one fund")
+    if np.any(allocation < 0):
+        raise ValueError("Fund allocations cannot be negative")
+    weight = allocation.sum(axis=-1, keepdims=True)
+    if np.any(weight <= 0):
+        raise ValueError("Fund allocations must add up to more than zero")
+    if np.any(1 + (annual_return - expense_ratio) / 100 <= 0):
+        raise ValueError("Fund returns net of expense ratio must be above -100%")
+    if np.any(exit_load < 0):
+        raise ValueError("Exit loads cannot be negative")
+    # Same expression as SWPInputs.monthly_return, so one fund matches the loop exactly
+    monthly_return = (1 + annual_return / 100 - expense_ratio / 100) ** (1/12) - 1
+    return allocation / weight, monthly_return, exit_load / 100
+
+
+def _portfolio_options(rebalance, withdrawal_order, shape):
+    """Rebalance intervals and the pro-rata mask, broadcast to the portfolio shape"""
+    rebalance = np.broadcast_to(np.asarray(rebalance, dtype=object), shape)
+    order = np.broadcast_to(np.asarray(withdrawal_order, dtype=object), shape)
+    unknown = set(rebalance.ravel().tolist()) - set(REBALANCE_INTERVALS)
+    if unknown:
+        raise ValueError(f"Unknown rebalancing frequency: {sorted(map(str, unknown))[0]!r}")
+    unknown = set(order.ravel().tolist()) - set(WITHDRAWAL_ORDERS)
+    if unknown:
+        raise ValueError(f"Unknown withdrawal order: {sorted(map(str, unknown))[0]!r}")
+    interval = np.array([REBALANCE_INTERVALS[r] for r in rebalance.ravel().tolist()], dtype=np.int64)
+    return interval, order.ravel() == "Pro Rata"
+
+
+def _simulate(inputs, allocation, monthly_return, exit_load, interval, pro_rata, schedule=None):
+    """Step balances through the plan; fund inputs are (fund, portfolio) arrays.
+
+    Funds come first so that totals and the waterfall's running sum add up
+    whole rows, and per-portfolio vectors broadcast against them as they
+    are. Returns per-portfolio (total withdrawn, months sustained) and the
+    (fund, portfolio) balances. If ``schedule`` is a list, one tuple per
+    month of the first portfolio is appended to it: the SWPResult row
+    followed by that month's fund closing balances, withdrawals and tax.
+    """
+    calendar = calendar_for(inputs)
+    withdrawal, amount, fixed = withdrawal_schedule(inputs, calendar)
+    month_ordinals = calendar.month_ordinal.tolist()
+    load_months = calendar.exit_load_months(inputs.investment_date)
+    inflation_factors = calendar.inflation_factors(inputs.monthly_inflation)
+    tax_rate = inputs.tax_rate / 100
+    floor = inputs.swp_amount * 0.1
+    size = allocation.shape[1]
+
+    balance = inputs.initial_amount * allocation
+    invested = balance.copy() # Cost basis of each fund, for capital gain calculation
+    active = np.full(size, inputs.initial_amount > 0)
+    total_withdrawn = np.zeros(size)
+    months = np.zeros(size, dtype=np.int64)
+    policy = PolicyPaths(inputs, size) if inputs.withdrawal_policy in PATH_DEPENDENT else None
+    any_pro_rata, all_pro_rata = pro_rata.any(), pro_rata.all()
+    rebalancing = interval > 0
+    no_funds = np.zeros_like(balance)
+    never_stopped = np.zeros(size, dtype=bool)
+
+    for t in range(len(calendar)):
+        if not active.any():
+            break
+        everyone = active.all()
+        months += active
+        opening = balance
+        growth = opening * monthly_return
+        after_growth = opening + growth
+        opening_total = opening.sum(axis=0)
+        after_total = after_growth.sum(axis=0)
+        due = policy.step(t, opening_total, after_total) if policy is not None else None
+
+        paid = tax = no_funds
+        closing = after_growth
+        stopped = never_stopped
+        if withdrawal[t]:
+            wanted = np.minimum(amount[t] if fixed[t] else due, after_total)
+            load = exit_load if t < load_months else 0.0
+            if tax_rate:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    gain = np.where(after_growth > 0, (after_growth - invested) / after_growth, 0.0)
+                gain = np.where(invested > 0, gain, 1.0)
+                charge = 1 + load + gain * tax_rate
+                capacity = after_growth / np.maximum(charge, MIN_CHARGE)
+            else:
+                gain = 0.0
+                charge = 1 + load
+                capacity = after_growth / charge if t < load_months else after_growth
+            # capacity is what each fund can pay out net of its charges
+            available = capacity.sum(axis=0)
+            covered = wanted <= available
+
+            if any_pro_rata:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    paid = capacity * np.where(available > 0, wanted / available, 0.0)
+            if not all_pro_rata:
+                # Each fund pays what is still wanted after the funds before it, up to its capacity
+                drawn_before = np.cumsum(capacity, axis=0) - capacity
+                drained = np.minimum(np.maximum(wanted - drawn_before, 0.0), capacity)
+                paid = np.where(pro_rata, paid, drained) if any_pro_rata else drained
+            closing = np.maximum(after_growth - paid * charge, 0.0)
+            if not covered.all():
+                # As in the projection loop, a portfolio that cannot cover the charges
+                # is paid out net of tax and the full exit load rate
+                paid = np.where(covered, paid, after_growth / (1 + tax_rate + exit_load))
+                closing = np.where(covered, closing, 0.0)
+            if not everyone:
+                paid = np.where(active, paid, 0.0)
+            if tax_rate:
+                tax = paid * np.where(covered, gain, 1.0) * tax_rate
+            invested = invested - paid
+            total_withdrawn += paid.sum(axis=0)
+
+        balance = closing if everyone else np.where(active, closing, balance)
+        closing_total = balance.sum(axis=0)
+        if withdrawal[t]:
+            # Same stopping rule as the projection loop
+            stopped = active & ((closing_total < floor) | (closing_total <= 0))
+
+        due_rebalance = rebalancing & ((t + 1) % np.maximum(interval, 1) == 0) & active & ~stopped
+        if due_rebalance.any():
+            target = closing_total * allocation
+            with np.errstate(divide='ignore', invalid='ignore'):
+                kept = np.where(balance > 0, np.minimum(target / balance, 1.0), 1.0)
+            bought = np.maximum(target - balance, 0.0)
+            invested = np.where(due_rebalance, invested * kept + bought, invested)
+            balance = np.where(due_rebalance, target, balance)
+
+        if schedule is not None and active[0]:
+            schedule.append((t + 1, month_ordinals[t], opening_total[0], growth[:, 0].sum(),
+                             paid[:, 0].sum(), tax[:, 0].sum(), closing_total[0],
+                             closing_total[0] / inflation_factors[t],
+                             balance[:, 0].copy(), paid[:, 0].copy(), tax[:, 0].copy()))
+        active = active & ~stopped
+
+    return total_withdrawn, months, balance
+
+
+def run_portfolio(inputs, funds, rebalance="Yearly", withdrawal_order="Waterfall"):
+    """Project one portfolio of ``funds`` (a list of Fund) and return a PortfolioResult"""
+    fund_inputs = _fund_arrays([[f.allocation for f in funds]], [[f.annual_return for f in funds]],
+                               [[f.expense_ratio for f in funds]], [[f.exit_load for f in funds]])
+    interval, pro_rata = _portfolio_options(rebalance, withdrawal_order, (1,))
+    rows = []
+    total_withdrawn, months, balance = _simulate(inputs, *(a.T for a in fund_inputs),
+                                                 interval, pro_rata, rows)
+    schedule = SWPResult.from_rows([row[:8] for row in rows], inputs.swp_start_date.day,
+                                   float(total_withdrawn[0]), float(balance[:, 0].sum()),
+                                   int(months[0]), inputs.date_convention)
+    detail = [np.array([row[i] for row in rows]).reshape(len(rows), len(funds)).T for i in (8, 9, 10)]
+    return PortfolioResult(schedule, [f.name for f in funds], *detail)
+
+
+def evaluate_portfolios(inputs, allocation, annual_return, expense_ratio=0.0, exit_load=0.0,
+                        rebalance="Yearly", withdrawal_order="Waterfall"):
+    """Project many portfolios of the same plan and return a PortfolioSummary.
+
+    Fund inputs broadcast to (..., fund): the last axis is the funds, in
+    waterfall order, the leading axes the portfolios. ``rebalance`` and
+    ``withdrawal_order`` are names, or arrays of names shaped like the
+    portfolios.
+
+    >>> summary = evaluate_portfolios(inputs, allocation=[[10, 30, 60], [10, 50, 40]],
+    ...                               annual_return=[6.5, 7.5, 12], exit_load=[0, 0, 1])
+    """
+    allocation, monthly_return, exit_load = _fund_arrays(allocation, annual_return, expense_ratio,
+                                                         exit_load)
+    shape = allocation.shape[:-1]
+    n_funds = allocation.shape[-1]
+    interval, pro_rata = _portfolio_options(rebalance, withdrawal_order, shape)
+    fund_major = [np.ascontiguousarray(a.reshape(-1, n_funds).T)
+                  for a in (allocation, monthly_return, exit_load)]
+    total_withdrawn, months, balance = _simulate(inputs, *fund_major, interval, pro_rata)
+
+    remaining = balance.sum(axis=0)
+    # Inflation factor of each portfolio's last month, 1 if it never started
+    inflation_factors = np.concatenate(
+        ([1.0], calendar_for(inputs).inflation_factors(inputs.monthly_inflation)))
+    real_remaining = remaining / inflation_factors[months]
+    return PortfolioSummary(total_withdrawn.reshape(shape), remaining.reshape(shape),
+                            months.reshape(shape), real_remaining.reshape(shape),
+                            balance.T.reshape(shape + (n_funds,)))
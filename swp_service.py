@@ -0,0 +1,342 @@
+"""Local HTTP/JSON service over the projection engine.
+
+    python swp_service.py [--host 127.0.0.1] [--port 8765] [--workers 4]
+
+Endpoints (request and response bodies are JSON; inputs use the
+SWPCalculator.get_input_values keys, dates as DD/MM/YYYY):
+
+    POST /projection  inputs [+ "schedule": true]  -> summary [+ "rows"]
+    POST /solve       inputs + "solve_for" (swp_amount | initial_amount |
+                      annual_return) [+ "target_balance"] -> {"value": ...}
+    POST /batch       {"plans": [inputs, ...]}      -> {"results": [summary, ...]}
+    GET  /health      -> status and cache statistics
+
+Summary-only projections that arrive within ``batch_delay`` of each other
+are coalesced and evaluated together by swp_batch.evaluate_batch. All
+engine work runs in a thread pool with at most ``workers`` jobs at a time,
+and finished projections and solves are kept in a ProjectionCache. Built on
+asyncio streams from the standard library; no Qt or matplotlib imports.
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from swp_batch import INPUT_KEYS, evaluate_batch
+from swp_cache import ProjectionCache, cache_key
+from swp_cli import SUMMARY_FIELDS, process_chunk
+from swp_engine import SWPInputs, project
+from swp_solver import solve_max_withdrawal, solve_min_corpus, solve_required_return
+
+SOLVERS = {
+    'swp_amount': solve_max_withdrawal,
+    'initial_amount': solve_min_corpus,
+    'annual_return': solve_required_return,
+}
+
+MAX_BODY = 16 * 1024 * 1024
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    """Turned into an error response with the given HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _inputs(body):
+    if not isinstance(body, dict):
+        raise RequestError(400, "Expected a JSON object")
+    if not isinstance(body.get('withdrawal_overrides', {}), dict):
+        raise RequestError(400, "withdrawal_overrides must be an object of month: amount")
+    try:
+        return SWPInputs.from_values(body)
+    except KeyError as e:
+        raise RequestError(400, f"Missing input: {e.args[0]}") from None
+    except (TypeError, ValueError) as e:
+        raise RequestError(400, str(e)) from None
+
+
+def _summary(total_withdrawn, remaining_corpus, months_sustainable, real_remaining_corpus):
+    return {'total_withdrawn': float(total_withdrawn), 'remaining_corpus': float(remaining_corpus),
+            'months_sustainable': int(months_sustainable),
+            'real_remaining_corpus': float(real_remaining_corpus)}
+
+
+def _project_summaries(inputs_list):
+    """One evaluate_batch call for many plans; list of summary dicts"""
+    values = {k: np.array([getattr(i, k) for i in inputs_list], dtype=object) for k in INPUT_KEYS}
+    result = evaluate_batch(values)
+    return [_summary(*(getattr(result, name)[i] for name in SUMMARY_FIELDS))
+            for i in range(len(inputs_list))]
+
+
+def _project_one(inputs, schedule):
+    result = project(inputs)
+    summary = _summary(result.total_withdrawn, result.remaining_corpus, result.months_sustainable,
+                       result.real_value[-1] if len(result) else result.remaining_corpus)
+    if schedule:
+        summary['rows'] = result.rows
+    return summary
+
+
+class Coalescer:
+    """Collects single requests and hands them to ``run_batch`` as one list.
+
+    A batch is flushed ``delay`` seconds after its first request arrives, or
+    as soon as it holds ``max_batch`` requests. ``run_batch`` is a coroutine
+    function returning one result per item.
+    """
+
+    def __init__(self, run_batch, max_batch=1024, delay=0.002):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.delay = delay
+        self.batches = 0
+        self.items = 0
+        self._pending = []
+        self._timer = None
+
+    def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self._flush)
+        return future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if pending:
+            self.batches += 1
+            self.items += len(pending)
+            asyncio.ensure_future(self._run(pending))
+
+    async def _run(self, pending):
+        try:
+            results = await self.run_batch([item for item, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class ProjectionService:
+    def __init__(self, workers=4, max_batch=1024, batch_delay=0.002, cache_size=4096):
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.cache = ProjectionCache(maxsize=cache_size)
+        self.coalescer = Coalescer(self._run_summaries, max_batch, batch_delay)
+        self.requests = 0
+        self._slots = None
+        self._inflight = {}
+
+    async def run_job(self, func, *args):
+        """Run ``func(*args)`` in the pool, never more than ``workers`` at once"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _run_summaries(self, inputs_list):
+        try:
+            return await self.run_job(_project_summaries, inputs_list)
+        except ValueError:
+            # One bad plan must not fail the whole batch; evaluate one by one
+            results = []
+            for inputs in inputs_list:
+                try:
+                    results.append(await self.run_job(_project_summaries, [inputs]))
+                except ValueError as e:
+                    results.append(RequestError(400, str(e)))
+            return [r if isinstance(r, RequestError) else r[0] for r in results]
+
+    async def cached(self, inputs, compute, *extra):
+        """Cached result, or ``compute()`` shared by identical requests already in flight.
+
+        The cache is only touched from the event loop thread.
+        """
+        key = cache_key(inputs, *extra)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        if key not in self._inflight:
+            self._inflight[key] = asyncio.ensure_future(compute())
+        task = self._inflight[key]
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            if task.done() and self._inflight.get(key) is task:
+                del self._inflight[key]
+        # Rejections are cheap to recompute and must not evict real results
+        if not isinstance(result, RequestError):
+            self.cache.put(key, result)
+        return result
+
+    async def projection(self, body):
+        inputs = _inputs(body)
+        schedule = bool(body.get('schedule'))
+        if schedule or inputs.withdrawal_overrides:
+            compute = lambda: self.run_job(_project_one, inputs, schedule)
+        else:
+            compute = lambda: self.coalescer.submit(inputs)
+        result = await self.cached(inputs, compute, 'projection', schedule)
+        if isinstance(result, RequestError):
+            raise result
+        return result
+
+    async def solve(self, body):
+        inputs = _inputs(body)
+        solve_for = body.get('solve_for')
+        if solve_for not in SOLVERS:
+            raise RequestError(400, f"solve_for must be one of: {', '.join(SOLVERS)}")
+        try:
+            target = float(body.get('target_balance', 0.0))
+        except (TypeError, ValueError):
+            raise RequestError(400, "target_balance must be a number") from None
+
+        async def compute():
+            try:
+                value = await self.run_job(SOLVERS[solve_for], inputs, target)
+            except ValueError as e:
+                return RequestError(400, str(e))
+            return {'solve_for': solve_for, 'target_balance': target, 'value': value}
+        result = await self.cached(inputs, compute, 'solve', solve_for, target)
+        if isinstance(result, RequestError):
+            raise result
+        return result
+
+    async def batch(self, body):
+        plans = body.get('plans') if isinstance(body, dict) else None
+        if not isinstance(plans, list) or not all(isinstance(p, dict) for p in plans):
+            raise RequestError(400, "Expected {\"plans\": [...]} with one object per plan")
+        summary, _ = await self.run_job(process_chunk, plans, 0)
+        results = []
+        for i in range(len(plans)):
+            if summary['error'][i]:
+                results.append({'error': summary['error'][i]})
+            else:
+                results.append(_summary(*(summary[name][i] for name in SUMMARY_FIELDS)))
+        return {'results': results}
+
+    def health(self):
+        return {'status': 'ok', 'requests': self.requests, 'cache': self.cache.stats(),
+                'batches': self.coalescer.batches, 'batched_requests': self.coalescer.items}
+
+    async def dispatch(self, method, path, body):
+        routes = {'/projection': self.projection, '/solve': self.solve, '/batch': self.batch}
+        if path == '/health':
+            if method != 'GET':
+                raise RequestError(405, "Use GET")
+            return self.health()
+        if path not in routes:
+            raise RequestError(404, f"No such endpoint: {path}")
+        if method != 'POST':
+            raise RequestError(405, "Use POST")
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise RequestError(400, "Body is not valid JSON") from None
+        return await routes[path](payload)
+
+    async def handle_connection(self, reader, writer):
+        """HTTP/1.1 with keep-alive; one request at a time per connection"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                status, payload = 200, None
+                try:
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY:
+                        raise RequestError(413, "Request body too large")
+                    body = await reader.readexactly(length) if length else b''
+                    self.requests += 1
+                    payload = await self.dispatch(method, target.split('?', 1)[0], body)
+                except RequestError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                             .encode() + data)
+                await writer.drain()
+                if not keep_alive or status == 413:
+                    break
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """Start listening; returns the asyncio server (port 0 picks a free port)"""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+async def serve(host, port, **options):
+    service = ProjectionService(**options)
+    server = await service.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Serving SWP projections on http://{address[0]}:{address[1]}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve SWP projections over HTTP/JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=4, help="concurrent engine jobs (default 4)")
+    parser.add_argument('--max-batch', type=int, default=1024,
+                        help="most projections evaluated together (default 1024)")
+    parser.add_argument('--batch-delay-ms', type=float, default=2.0,
+                        help="how long to wait for more projections to coalesce (default 2)")
+    parser.add_argument('--cache-size', type=int, default=4096)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, max_batch=args.max_batch,
+                          batch_delay=args.batch_delay_ms / 1000, cache_size=args.cache_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
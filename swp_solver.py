@@ -0,0 +1,206 @@
+"""Solve SWP plans for a target instead of trial and error.
+
+A plan is *sustainable* when the projection runs to the SWP end date without
+hitting the stop rule (a withdrawal leaving less than 10% of an SWP) and the
+final balance is at least the target. Without tax on gains the balance
+recurrence is linear, so the largest withdrawal and the smallest corpus
+have closed forms; everything else is found with Brent's method on the
+sustainability slack, evaluated through the projection engine. Amounts
+come out in whole paise, rounded to the sustainable side.
+"""
+from dataclasses import replace
+
+import numpy as np
+
+from swp_calendar import calendar_for
+from swp_engine import run_projection
+from swp_policies import withdrawal_schedule
+from swp_vectorized import run_projection_array, supports
+
+# Bracket search and convergence limits
+MAX_EXPANSIONS = 60
+XTOL = 1e-6
+AMOUNT_XTOL = 0.005 # Half a paisa
+MAX_ITERATIONS = 200
+PAISA = 0.01
+MAX_NUDGES = 100
+
+
+def _horizon(inputs):
+    calendar = calendar_for(inputs)
+    if len(calendar) == 0:
+        raise ValueError("SWP end date is before the SWP start date")
+    return calendar
+
+
+def _closed_form(inputs):
+    """Closed forms assume every withdrawal is the same SWP amount"""
+    return supports(inputs) and not inputs.withdrawal_overrides and inputs.withdrawal_policy == "Fixed"
+
+
+def _withdrawal_terms(inputs):
+    """Growth factors G[k] and C[k] = sum of (1 + load) / G over withdrawal months <= k"""
+    calendar = _horizon(inputs)
+    month = np.arange(1, len(calendar) + 1)
+    withdrawal = calendar.withdrawal
+    load_rate = np.zeros(len(month))
+    if inputs.exit_load:
+        load_rate[:calendar.exit_load_months(inputs.investment_date)] = inputs.exit_load / 100
+    growth = np.power(1 + inputs.monthly_return, month)
+    cumulative = np.cumsum(np.where(withdrawal, 1 + load_rate, 0.0) / growth)
+    return withdrawal, growth, cumulative
+
+
+def slack(inputs, target_balance=0.0):
+    """Non-negative exactly when the plan is sustainable; grows with the margin"""
+    calendar = _horizon(inputs)
+    horizon = len(calendar)
+    if inputs.initial_amount <= 0:
+        return inputs.initial_amount - 1.0
+
+    result = run_projection_array(inputs) if supports(inputs) else run_projection(inputs)
+    month, closing = result.month, result.closing_balance
+
+    # The engines' stop rule applies on every withdrawal month, overrides included
+    withdrawal = withdrawal_schedule(inputs, calendar)[0][:len(month)]
+    margins = closing[withdrawal] - inputs.swp_amount * 0.1
+    worst = margins.min() if len(margins) else np.inf
+    if len(month) < horizon:
+        worst = min(worst, -1.0)
+    return float(min(worst, closing[-1] - target_balance))
+
+
+def _feasible(func, value, step):
+    """Round a boundary amount to whole paise on the safe side, then move it
+    by ``step`` until ``func`` is non-negative.
+
+    The closed forms land exactly on the stop rule (Brent's method to within
+    AMOUNT_XTOL of it), where rounding in the projection engines can fall on
+    either side.
+    """
+    value = float((np.floor if step < 0 else np.ceil)(value / PAISA) * PAISA)
+    for _ in range(MAX_NUDGES):
+        if func(value) >= 0:
+            return value
+        value += step
+    raise ValueError("Could not find a sustainable solution")
+
+
+def brent(func, lo, hi, xtol=XTOL, max_iterations=MAX_ITERATIONS):
+    """Root of ``func`` in [lo, hi] by Brent's method; the bracket must change sign.
+
+    Returns the end of the final bracket where ``func`` is non-negative, so a
+    solution always satisfies the constraint rather than overshooting it.
+    """
+    f_lo, f_hi = func(lo), func(hi)
+    if f_lo == 0:
+        return lo
+    if f_hi == 0:
+        return hi
+    if (f_lo > 0) == (f_hi > 0):
+        raise ValueError("Root is not bracketed")
+
+    a, b, fa, fb = lo, hi, f_lo, f_hi
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(max_iterations):
+        if (fb > 0) == (fc > 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol = 2 * np.finfo(float).eps * abs(b) + xtol / 2
+        m = (c - b) / 2
+        if abs(m) <= tol or fb == 0:
+            return b if fb >= 0 else c
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            # Inverse quadratic interpolation (secant when only two points)
+            s = fb / fa
+            if a == c:
+                p, q = 2 * m * s, 1 - s
+            else:
+                q, r = fa / fc, fb / fc
+                p = s * (2 * m * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+        a, fa = b, fb
+        b += d if abs(d) > tol else (tol if m > 0 else -tol)
+        fb = func(b)
+    return b if fb >= 0 else c
+
+
+def _bracket_up(func, lo, hi):
+    """Grow ``hi`` until func changes sign relative to func(lo)"""
+    sign = func(lo) >= 0
+    for _ in range(MAX_EXPANSIONS):
+        if (func(hi) >= 0) != sign:
+            return hi
+        lo, hi = hi, hi * 2 if hi > 0 else 1.0
+    raise ValueError("Could not bracket a solution")
+
+
+def solve_max_withdrawal(inputs, target_balance=0.0):
+    """Largest SWP amount that lasts to the end date leaving ``target_balance``"""
+    if inputs.initial_amount <= 0:
+        raise ValueError("Initial investment must be positive")
+    if inputs.withdrawal_policy == "Percent of Corpus":
+        raise ValueError("Percent of Corpus withdrawals do not depend on the SWP amount")
+    if slack(replace(inputs, swp_amount=0.0), target_balance) < 0:
+        raise ValueError("Target balance is not reachable even without withdrawals")
+
+    if _closed_form(inputs):
+        withdrawal, growth, cumulative = _withdrawal_terms(inputs)
+        if not withdrawal.any():
+            raise ValueError("No withdrawals fall within the SWP period")
+        b0 = inputs.initial_amount
+        # Each withdrawal must leave 10% of an SWP, and the end balance must meet the target
+        limits = b0 * growth[withdrawal] / (growth[withdrawal] * cumulative[withdrawal] + 0.1)
+        end_limit = (b0 - target_balance / growth[-1]) / cumulative[-1]
+        func = lambda amount: slack(replace(inputs, swp_amount=amount), target_balance)
+        return _feasible(func, float(min(limits.min(), end_limit)), -PAISA)
+
+    func = lambda amount: slack(replace(inputs, swp_amount=amount), target_balance)
+    hi = _bracket_up(func, 0.0, inputs.initial_amount)
+    return _feasible(func, brent(func, 0.0, hi, xtol=AMOUNT_XTOL), -PAISA)
+
+
+def solve_min_corpus(inputs, target_balance=0.0):
+    """Smallest initial investment that sustains the SWP to the end date"""
+    if _closed_form(inputs):
+        withdrawal, growth, cumulative = _withdrawal_terms(inputs)
+        s = inputs.swp_amount
+        needs = [target_balance / growth[-1] + s * cumulative[-1]]
+        if withdrawal.any():
+            needs.append((s * cumulative[withdrawal] + 0.1 * s / growth[withdrawal]).max())
+        func = lambda amount: slack(replace(inputs, initial_amount=amount), target_balance)
+        return _feasible(func, float(max(max(needs), 0.0)), PAISA)
+
+    func = lambda amount: slack(replace(inputs, initial_amount=amount), target_balance)
+    start = max(inputs.swp_amount, target_balance, 1.0)
+    hi = _bracket_up(func, 0.0, start)
+    return _feasible(func, brent(func, 0.0, hi, xtol=AMOUNT_XTOL), PAISA)
+
+
+def solve_required_return(inputs, target_balance=0.0):
+    """Lowest expected annual return (%) that sustains the SWP to the end date"""
+    _horizon(inputs)
+    func = lambda rate: slack(replace(inputs, annual_return=rate), target_balance)
+    # Net return must stay above -100%
+    lo = inputs.expense_ratio - 99.0
+    if func(lo) >= 0:
+        return lo
+    hi = 10.0
+    for _ in range(MAX_EXPANSIONS):
+        if func(hi) >= 0:
+            return brent(func, lo, hi)
+        lo, hi = hi, hi * 2
+    raise ValueError("No return sustains this plan")
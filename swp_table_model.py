@@ -0,0 +1,100 @@
+"""Table model for the "Monthly Analysis" tab.
+
+The model reads the NumPy columns of an SWPResult in place and formats a
+cell only when the view asks for it, so no per-cell items are created and
+memory does not grow with what is on screen. Sorting and filtering only
+rearrange an index array over the rows; the columns themselves are never
+copied.
+"""
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from swp_engine import RESULT_COLUMNS, RESULT_FIELDS
+
+MONEY_COLUMNS = {'Opening Balance', 'Growth', 'SWP Amount', 'Tax', 'Closing Balance', 'Real Value'}
+
+
+class ResultsTableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._result = None
+        self._days = None                           # day of month per row, for 'Date'
+        self._count = 0
+        self._order = np.empty(0, dtype=np.intp)    # visible row -> underlying row
+        self._sort = None                           # (column name, descending)
+        self._filter = None                         # boolean mask over underlying rows
+
+    def set_result(self, result):
+        """Show the schedule of ``result`` (an SWPResult; None shows nothing)"""
+        self.beginResetModel()
+        self._result = result
+        self._days = result.days() if result is not None else None
+        self._count = len(result) if result is not None else 0
+        self._filter = None
+        self._rebuild_order()
+        self.endResetModel()
+
+    def clear(self):
+        self.set_result(None)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(RESULT_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return RESULT_COLUMNS[section]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role != Qt.DisplayRole:
+            return None
+
+        name = RESULT_COLUMNS[index.column()]
+        row = self._order[index.row()]
+        value = self.column(name)[row]
+        if name == 'Date':
+            year, month = divmod(int(value), 12)
+            return f"{self._days[row]:02d}/{month + 1:02d}/{year}"
+        if name in MONEY_COLUMNS:
+            return f"₹{value:,.2f}"
+        return str(value)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self._sort = (RESULT_COLUMNS[column], order == Qt.DescendingOrder)
+        self._rebuild_order()
+        self.layoutChanged.emit()
+
+    def set_row_filter(self, mask):
+        """Show only rows where ``mask`` (a boolean array per month) is True; None shows all"""
+        self.beginResetModel()
+        self._filter = None if mask is None else np.asarray(mask, dtype=bool)
+        self._rebuild_order()
+        self.endResetModel()
+
+    def column(self, name):
+        """Stored array behind a column; 'Date' gives the month ordinals"""
+        return getattr(self._result, RESULT_FIELDS[name])
+
+    def _rebuild_order(self):
+        if self._sort is None or not self._count:
+            order = np.arange(self._count)
+        else:
+            name, descending = self._sort
+            # Dates are chronological in month order
+            keys = self.column('Month' if name == 'Date' else name)
+            order = np.argsort(keys, kind='stable')
+            if descending:
+                order = order[::-1]
+        if self._filter is not None:
+            order = order[self._filter[order]]
+        self._order = order
@@ -0,0 +1,140 @@
+"""Array-backed SWP projection.
+
+For fixed withdrawals without tax the monthly balance follows the linear
+recurrence ``b[k] = b[k-1] * (1 + r) - d[k]``, which has the closed form
+``b[k] = G[k] * (b0 - cumsum(d / G)[k])`` with ``G[k] = (1 + r) ** k``. This
+module evaluates that form with NumPy instead of stepping through the months
+one at a time, and fills the columns of an SWPResult directly.
+
+Withdrawal policies keep the recurrence linear: indexed and stepped-up
+amounts are just a different ``d``, and a percentage of the corpus scales
+the balance instead, so it folds into ``G`` as ``(1 + r) * (1 - p)`` in its
+months. Guardrails only change the amount on anniversaries, so their plans
+are evaluated a policy year at a time.
+"""
+import numpy as np
+
+from swp_calendar import calendar_for
+from swp_engine import SWPResult
+from swp_policies import POLICY_YEAR, Guardrails, withdrawal_schedule
+
+
+def supports(inputs):
+    """True if the closed-form path reproduces run_projection for these inputs"""
+    if inputs.tax_rate != 0:
+        return False
+    # A percentage that (with exit load) takes the whole balance would make G zero
+    share = inputs.corpus_rate / 100 / inputs.freq_factor
+    return inputs.withdrawal_policy != "Percent of Corpus" or share * (1 + inputs.exit_load / 100) < 1
+
+
+def _closing(opening, r, withdrawal, amount, proportional, share, load_rate):
+    """Closing balances of consecutive months starting from balance ``opening``"""
+    growth_factor = np.power(1 + r, np.arange(1, len(withdrawal) + 1))
+    if proportional.any():
+        growth_factor = growth_factor * np.cumprod(np.where(proportional, 1 - share * (1 + load_rate), 1.0))
+    deduction = np.where(withdrawal & ~proportional, amount * (1 + load_rate), 0.0)
+    return growth_factor * (opening - np.cumsum(deduction / growth_factor))
+
+
+def _guardrail_closing(inputs, r, withdrawal, amount, fixed, load_rate):
+    """Closing balances under Guardrails; fills the guardrail amounts into ``amount``.
+
+    The amount is constant within a policy year, so with ``U[k]`` the
+    discounted (1 + load) of its withdrawal months up to k, a year's
+    balances are ``G[k] * (b0 - fixed[k] - taken - a * (U[k] - U[s - 1]))``.
+    Only the rules run once a year; months after the plan stops are
+    computed too and then cut off by the caller.
+    """
+    n = len(withdrawal)
+    rules = Guardrails.from_inputs(inputs)
+    growth_factor = np.power(1 + r, np.arange(1, n + 1))
+    policy_months = withdrawal & ~fixed
+    unit = np.cumsum(np.where(policy_months, 1 + load_rate, 0.0) / growth_factor)
+    remaining = inputs.initial_amount - np.cumsum(
+        np.where(withdrawal & fixed, amount * (1 + load_rate), 0.0) / growth_factor)
+    closing = np.empty(n)
+    currents = []
+    current, taken = float(inputs.swp_amount), 0.0
+    for start in range(0, n, POLICY_YEAR):
+        end = min(start + POLICY_YEAR, n)
+        before = 0.0
+        if start:
+            before = unit[start - 1]
+            year_opening = closing[start - POLICY_YEAR - 1] if start > POLICY_YEAR else inputs.initial_amount
+            year_growth = r * (year_opening + closing[start - POLICY_YEAR:start - 1].sum())
+            current = float(rules.apply(current, closing[start - 1], year_growth))
+        closing[start:end] = growth_factor[start:end] * (remaining[start:end] - taken -
+                                                         current * (unit[start:end] - before))
+        taken += current * (unit[end - 1] - before)
+        currents.append(current)
+    amount[policy_months] = np.repeat(currents, POLICY_YEAR)[:n][policy_months]
+    return closing
+
+
+def run_projection_array(inputs):
+    """Evaluate the projection in closed form; see supports() for eligibility"""
+    if not supports(inputs):
+        raise ValueError("Vectorized projection does not model tax on gains or take the whole balance")
+
+    calendar = calendar_for(inputs)
+    if inputs.initial_amount <= 0 or len(calendar) == 0:
+        return SWPResult.from_rows([], inputs.swp_start_date.day, 0, inputs.initial_amount, 0,
+                                   inputs.date_convention)
+
+    n = len(calendar)
+    month = np.arange(1, n + 1, dtype=np.int64)
+    swp_amount = inputs.swp_amount
+    r = inputs.monthly_return
+
+    # Deduction on withdrawal months: SWP plus exit load inside the first year
+    withdrawal, amount, fixed = withdrawal_schedule(inputs, calendar)
+    load_rate = np.zeros(n)
+    if inputs.exit_load:
+        load_rate[:calendar.exit_load_months(inputs.investment_date)] = inputs.exit_load / 100
+    share = inputs.corpus_rate / 100 / inputs.freq_factor
+    proportional = withdrawal & ~fixed & (inputs.withdrawal_policy == "Percent of Corpus")
+
+    if inputs.withdrawal_policy == "Guardrails":
+        closing = _guardrail_closing(inputs, r, withdrawal, amount, fixed, load_rate)
+    else:
+        closing = _closing(inputs.initial_amount, r, withdrawal, amount, proportional, share, load_rate)
+    opening = np.empty(n)
+    opening[0] = inputs.initial_amount
+    opening[1:] = closing[:-1]
+    after_growth = opening + opening * r
+
+    # The loop stops at the first withdrawal that leaves less than 10% of an SWP
+    stops = np.flatnonzero(withdrawal & (closing < swp_amount * 0.1))
+    if len(stops):
+        n = stops[0] + 1
+        month, withdrawal, load_rate = month[:n], withdrawal[:n], load_rate[:n]
+        amount, proportional = amount[:n], proportional[:n]
+        opening, after_growth, closing = opening[:n], after_growth[:n], closing[:n]
+
+    swp_paid = np.where(withdrawal, np.where(proportional, share * after_growth, amount), 0.0)
+    if len(stops):
+        # Final withdrawal is capped at what the balance can cover net of exit load
+        last = n - 1
+        if after_growth[last] < swp_paid[last] * (1 + load_rate[last]):
+            swp_paid[last] = after_growth[last] / (1 + load_rate[last])
+            closing[last] = 0.0
+
+    real_value = closing / np.array(calendar.inflation_factors(inputs.monthly_inflation)[:n])
+
+    return SWPResult(
+        month=month,
+        month_ordinal=calendar.month_ordinal[:n],
+        opening_balance=opening,
+        growth=opening * r,
+        swp_amount=swp_paid,
+        tax=np.zeros(n),
+        closing_balance=closing,
+        real_value=real_value,
+        start_day=inputs.swp_start_date.day,
+        total_withdrawn=float(swp_paid.sum()),
+        remaining_corpus=float(closing[-1]),
+        months_sustainable=int(n),
+        date_convention=inputs.date_convention,
+    )
+
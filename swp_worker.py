@@ -0,0 +1,134 @@
+"""Background jobs for the GUI.
+
+Calculations and exports run on a QThreadPool so the window stays
+responsive. A JobRunner keeps at most one job alive: submitting a new job
+cancels the previous one (latest wins), and results of a cancelled job are
+never delivered. Jobs receive a progress callback, which is also where
+cancellation is noticed, so long-running work should call it regularly.
+Results and errors are re-emitted on the runner's signals, which are
+delivered on the GUI thread. A job may be submitted with a context (e.g.
+its metrics run), which ``failed`` and ``cancelled`` hand back since they
+have no result to carry it.
+"""
+import itertools
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class Cancelled(Exception):
+    """Raised inside a job once it has been superseded or cancelled"""
+
+
+class CancelToken:
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+
+class JobSignals(QObject):
+    # Emitted from the worker thread; every signal carries the job id
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+
+
+class Job(QRunnable):
+    def __init__(self, job_id, func, token, signals):
+        super().__init__()
+        self.job_id = job_id
+        self.func = func
+        self.token = token
+        self.signals = signals
+
+    def report(self, done, total=100):
+        """Progress callback handed to ``func``; raises Cancelled once superseded"""
+        self.token.check()
+        percent = int(100 * done / total) if total else 100
+        self.signals.progress.emit(self.job_id, percent)
+
+    def run(self):
+        try:
+            self.token.check() # Superseded while still queued
+            result = self.func(self.report)
+            self.token.check()
+        except Cancelled:
+            return
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, e)
+            return
+        self.signals.finished.emit(self.job_id, result)
+
+
+class JobRunner(QObject):
+    """Runs ``func(progress)`` callables one at a time off the GUI thread"""
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object, object)     # error, context
+    cancelled = pyqtSignal(object)          # context
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        # Jobs share state (cache, incremental projector), so they never overlap
+        self.pool.setMaxThreadCount(1)
+        self.signals = JobSignals(self)
+        self.signals.progress.connect(self._on_progress)
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+        self._ids = itertools.count(1)
+        self._current = None
+        self._token = None
+        self._context = None
+
+    def is_running(self):
+        return self._token is not None
+
+    def submit(self, func, context=None):
+        """Start ``func``, cancelling whatever this runner was doing"""
+        self.cancel()
+        self.pool.clear() # Drop superseded jobs that have not started yet
+        self._current = next(self._ids)
+        self._token = CancelToken()
+        self._context = context
+        self.pool.start(Job(self._current, func, self._token, self.signals))
+        return self._current
+
+    def cancel(self):
+        """Cancel the running job, if any; emits ``cancelled``"""
+        context = self._context
+        if self._cancel():
+            self.cancelled.emit(context)
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def _cancel(self):
+        if self._token is None:
+            return False
+        self._token.cancel()
+        self._token = self._context = None
+        return True
+
+    def _is_current(self, job_id):
+        return job_id == self._current and self._token is not None
+
+    def _on_progress(self, job_id, percent):
+        if self._is_current(job_id):
+            self.progress.emit(percent)
+
+    def _on_finished(self, job_id, result):
+        if self._is_current(job_id):
+            self._token = self._context = None
+            self.finished.emit(result)
+
+    def _on_failed(self, job_id, error):
+        if self._is_current(job_id):
+            context = self._context
+            self._token = self._context = None
+            self.failed.emit(error, context)
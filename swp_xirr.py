@@ -0,0 +1,136 @@
+"""XIRR: the yearly rate at which dated cash flows have zero net present value.
+
+Flows are seen from the investor, as in a spreadsheet's XIRR: money put in
+is negative, money received positive. With ``t`` the years of 365 days
+since the first flow and ``y = log(1 + rate)``,
+
+    NPV(y) = sum(amount[i] * exp(-y * t[i]))
+
+is solved for y by Newton's method inside a bracket that always holds a
+sign change (Numerical Recipes' rtsafe): a Newton step that would leave the
+bracket, or that shrinks slower than bisection would, is replaced by a
+bisection step, so every series converges even where plain Newton would
+overshoot. Working in y keeps 1 + rate positive.
+
+xirr_many solves many series at once from (series, flow) arrays: each
+iteration is one exp and two row dot products over the series that have
+not converged yet, and converged series drop out. A series whose NPV does
+not change sign between the ends of RATE_RANGE (e.g. one with no inflow or
+no outflow) has no XIRR and gets NaN.
+"""
+import numpy as np
+
+# Lowest and highest yearly rates searched
+RATE_RANGE = (-0.9999, 100.0)
+
+# Convergence on log(1 + rate), relative; rates come out to about 1e-10
+TOLERANCE = 1e-10
+MAX_ITERATIONS = 100
+
+DAYS_PER_YEAR = 365.0
+
+
+def _npv(y, times, amounts, weighted):
+    """NPV and its derivative in y for every row"""
+    discount = np.exp(-y[:, None] * times)
+    return (np.einsum('ij,ij->i', amounts, discount),
+            -np.einsum('ij,ij->i', weighted, discount))
+
+
+def _first_guess(times, amounts, guess):
+    """log(1 + rate) that turns the money multiple into the gap between the
+    amount-weighted mean times of inflows and outflows; ``guess`` where that fails"""
+    inflow = np.maximum(amounts, 0.0)
+    outflow = np.maximum(-amounts, 0.0)
+    received, paid = inflow.sum(axis=1), outflow.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gap = (np.einsum('ij,ij->i', inflow, times) / received -
+               np.einsum('ij,ij->i', outflow, times) / paid)
+        y = np.log(received / paid) / gap
+    return np.where(np.isfinite(y), y, np.log1p(guess))
+
+
+def xirr_many(times, amounts, guess=0.1):
+    """XIRR of every row of (series, flow) arrays; NaN where there is none.
+
+    ``times`` are in years from any origin, ``amounts`` investor flows.
+    Rows of different lengths are padded with zero amounts (their times
+    are then ignored). ``guess`` is the starting rate for series where
+    the estimate from the flows' mean timing fails.
+    """
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+    times = np.broadcast_to(np.asarray(times, dtype=float), amounts.shape)
+    if not np.all(np.isfinite(amounts)):
+        raise ValueError("Cash flow amounts must be finite")
+    # Measure from each series' first flow so the discount factors stay in range
+    present = amounts != 0
+    first = np.where(present, times, np.inf).min(axis=1, keepdims=True)
+    times = np.where(present, times - np.where(np.isfinite(first), first, 0.0), 0.0)
+
+    rates = np.full(len(amounts), np.nan)
+    lo_rate, hi_rate = np.log1p(RATE_RANGE)
+    lo = np.full(len(amounts), lo_rate)
+    hi = np.full(len(amounts), hi_rate)
+    weighted = amounts * times
+    f_lo, _ = _npv(lo, times, amounts, weighted)
+    f_hi, _ = _npv(hi, times, amounts, weighted)
+    rates[f_lo == 0] = RATE_RANGE[0]
+    rates[(f_hi == 0) & (f_lo != 0)] = RATE_RANGE[1]
+    index = np.flatnonzero(f_lo * f_hi < 0)
+
+    # Orient every bracket so that NPV(low) < 0 < NPV(high)
+    low = np.where(f_lo[index] < 0, lo[index], hi[index])
+    high = np.where(f_lo[index] < 0, hi[index], lo[index])
+    times, amounts, weighted = times[index], amounts[index], weighted[index]
+    y = np.clip(_first_guess(times, amounts, guess), lo_rate, hi_rate)
+    step = last_step = np.abs(high - low)
+
+    for _ in range(MAX_ITERATIONS):
+        if not len(index):
+            break
+        f, df = _npv(y, times, amounts, weighted)
+        negative = f < 0
+        low = np.where(negative, y, low)
+        high = np.where(negative, high, y)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = y - f / df
+        # Bisect when Newton would leave the bracket or is not converging twice as
+        # fast as the step before last
+        bisect = (~np.isfinite(newton) | ((newton - low) * (newton - high) > 0) |
+                  (np.abs(2 * f) > np.abs(last_step * df)))
+        target = np.where(bisect, 0.5 * (low + high), newton)
+        last_step, step = step, np.abs(target - y)
+        done = ((~bisect & (step <= TOLERANCE * (1 + np.abs(y)))) | (f == 0) |
+                (np.abs(high - low) <= TOLERANCE * (1 + np.abs(y))))
+        y = target
+
+        if done.any():
+            rates[index[done]] = np.expm1(y[done])
+            keep = ~done
+            index, y, low, high = index[keep], y[keep], low[keep], high[keep]
+            step, last_step = step[keep], last_step[keep]
+            times, amounts, weighted = times[keep], amounts[keep], weighted[keep]
+    # Whatever is left after MAX_ITERATIONS is within its (tiny) bracket
+    rates[index] = np.expm1(y)
+    return rates
+
+
+def xirr_series(series):
+    """XIRR of each (dates, amounts) pair in ``series``, solved together"""
+    series = list(series)
+    length = max((len(amounts) for _, amounts in series), default=0)
+    times = np.zeros((len(series), length))
+    amounts = np.zeros((len(series), length))
+    for row, (dates, values) in enumerate(series):
+        days = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+        times[row, :len(days)] = days / DAYS_PER_YEAR
+        amounts[row, :len(days)] = values
+    return xirr_many(times, amounts)
+
+
+def xirr(dates, amounts):
+    """XIRR of one series of dated flows, NaN if there is none"""
+    if len(dates) != len(amounts):
+        raise ValueError("Each cash flow needs a date")
+    return float(xirr_series([(dates, amounts)])[0])
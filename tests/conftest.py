@@ -0,0 +1,23 @@
+"""Shared plans for the unit tests: a 10-year monthly SWP, as typed into the GUI"""
+import pytest
+
+from swp_engine import SWPInputs
+
+BASE_VALUES = {
+    'initial_amount': 10000000.0,
+    'investment_date': '01/06/2025',
+    'swp_amount': 75000.0,
+    'swp_start_date': '01/07/2025',
+    'swp_end_date': '30/06/2035',
+    'annual_return': 12.0,
+    'frequency': 'Monthly',
+}
+
+
+def make_inputs(**changes):
+    return SWPInputs.from_values(dict(BASE_VALUES, **changes))
+
+
+@pytest.fixture
+def base_values():
+    return dict(BASE_VALUES)
@@ -0,0 +1,83 @@
+import numpy as np
+
+import swp_cache
+from swp_cache import ProjectionCache, cache_key
+from swp_engine import SWPInputs, SWPResult, project
+
+from .conftest import make_inputs
+
+
+def test_equal_plans_typed_differently_share_a_key(base_values):
+    typed = SWPInputs.from_values(dict(base_values, annual_return='12', swp_amount='75000.00'))
+    assert cache_key(typed) == cache_key(make_inputs())
+
+
+def test_negative_zero_and_integers_normalise():
+    assert cache_key(make_inputs(expense_ratio=-0.0)) == cache_key(make_inputs(expense_ratio=0))
+
+
+def test_different_plans_and_context_get_different_keys():
+    inputs = make_inputs()
+    assert cache_key(inputs) != cache_key(make_inputs(annual_return=12.0001))
+    assert cache_key(inputs) != cache_key(inputs, 'solve')
+    assert cache_key(inputs, np.arange(3)) != cache_key(inputs, np.arange(4))
+
+
+def test_overrides_key_ignores_insertion_order():
+    first = make_inputs(withdrawal_overrides={3: 1000.0, 12: 0.0})
+    second = make_inputs(withdrawal_overrides={12: 0.0, 3: 1000.0})
+    assert cache_key(first) == cache_key(second)
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = ProjectionCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.stats()['hits'] == 1
+
+
+def test_saved_results_round_trip(tmp_path):
+    path = str(tmp_path / 'cache.npz')
+    cache = ProjectionCache(path=path, types=(SWPResult,))
+    inputs = make_inputs()
+    result = cache.get_or_compute(inputs, project)
+    cache.put('unsaved', object())
+    cache.save()
+
+    loaded = ProjectionCache(path=path, types=(SWPResult,))
+    assert len(loaded) == 1
+    again = loaded.get(cache_key(inputs))
+    assert isinstance(again, SWPResult)
+    assert np.array_equal(again.closing_balance, result.closing_balance)
+    assert again.month_ordinal.dtype == np.int64
+    assert again.months_sustainable == result.months_sustainable
+
+
+def test_cache_version_change_discards_saved_entries(tmp_path, monkeypatch):
+    path = str(tmp_path / 'cache.npz')
+    cache = ProjectionCache(path=path, types=(SWPResult,))
+    cache.get_or_compute(make_inputs(), project)
+    cache.save()
+    monkeypatch.setattr(swp_cache, 'CACHE_VERSION', swp_cache.CACHE_VERSION + 1)
+    assert len(ProjectionCache(path=path, types=(SWPResult,))) == 0
+
+
+def test_unknown_types_are_not_rebuilt(tmp_path):
+    path = str(tmp_path / 'cache.npz')
+    cache = ProjectionCache(path=path, types=(SWPResult,))
+    cache.get_or_compute(make_inputs(), project)
+    cache.save()
+    assert len(ProjectionCache(path=path)) == 0
+
+
+def test_damaged_and_pickled_files_are_ignored(tmp_path):
+    path = tmp_path / 'cache.npz'
+    path.write_bytes(b'not a cache')
+    assert len(ProjectionCache(path=str(path), types=(SWPResult,))) == 0
+    # A pickle is never unpickled, so it cannot run code
+    path.write_bytes(b"cos\nsystem\n(S'exit 1'\ntR.")
+    assert len(ProjectionCache(path=str(path), types=(SWPResult,))) == 0
+    assert len(ProjectionCache(path=str(tmp_path / 'missing.npz'), types=(SWPResult,))) == 0
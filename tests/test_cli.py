@@ -0,0 +1,75 @@
+import csv
+from unittest import mock
+
+import pytest
+
+import swp_cli
+from swp_cli import process_chunk, read_plans, run
+
+
+def test_bad_rows_get_an_error_and_the_rest_are_evaluated(base_values):
+    records = [
+        dict(base_values, plan_id='good'),
+        dict(base_values, plan_id='number', annual_return='12%'),
+        dict(base_values, plan_id='date', swp_start_date='2025-07-01'),
+        dict(base_values, plan_id='missing', swp_end_date=''),
+        dict(base_values, plan_id='frequency', frequency='Weekly'),
+        dict(base_values, plan_id='return', annual_return='-150'),
+    ]
+    summary, _ = process_chunk(records, 0)
+    errors = dict(zip(summary['plan_id'], summary['error']))
+    assert errors['good'] == ''
+    assert errors['number'] == "annual_return: not a number: '12%'"
+    assert errors['date'].startswith('swp_start_date:')
+    assert errors['missing'] == 'swp_end_date: missing date'
+    assert errors['frequency'] == "Unknown SWP frequency: 'Weekly'"
+    assert 'above -100%' in errors['return']
+    assert summary['months_sustainable'].tolist() == [120, 0, 0, 0, 0, 0]
+
+
+def test_out_of_range_plans_do_not_split_the_batch(base_values):
+    records = [dict(base_values, swp_amount=50000 + i) for i in range(20)]
+    records[3]['frequency'] = 'Weekly'
+    records[11]['corpus_rate'] = '-1'
+    with mock.patch.object(swp_cli, 'evaluate_batch', wraps=swp_cli.evaluate_batch) as evaluate:
+        summary, _ = process_chunk(records, 0)
+    assert evaluate.call_count == 1
+    assert [i for i, error in enumerate(summary['error']) if error] == [3, 11]
+    assert summary['error'][11].startswith("Percent of corpus")
+    assert summary['months_sustainable'][[0, 19]].tolist() == [120, 120]
+
+
+def test_plan_ids_default_to_row_numbers(base_values):
+    summary, _ = process_chunk([base_values, base_values], 10)
+    assert summary['plan_id'].tolist() == ['11', '12']
+
+
+def test_schedules_skip_bad_rows(base_values):
+    _, schedule = process_chunk([dict(base_values, plan_id='a'),
+                                 dict(base_values, plan_id='b', frequency='Weekly')], 0, schedules=True)
+    assert set(schedule['plan_id']) == {'a'}
+    assert len(schedule['month']) == 120
+
+
+def write_plans(path, rows, columns):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_plans_file_missing_columns(tmp_path, base_values):
+    path = tmp_path / 'plans.csv'
+    columns = [k for k in base_values if k != 'swp_amount']
+    write_plans(path, [{k: base_values[k] for k in columns}], columns)
+    with pytest.raises(ValueError, match="missing columns: swp_amount"):
+        next(read_plans(str(path), 100))
+
+
+def test_run_counts_failed_plans(tmp_path, base_values):
+    plans, summaries = tmp_path / 'plans.csv', tmp_path / 'summaries.csv'
+    write_plans(plans, [base_values, dict(base_values, swp_start_date='bad')], list(base_values))
+    assert run(str(plans), str(summaries)) == (2, 1)
+    with open(summaries, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [bool(row['error']) for row in rows] == [False, True]
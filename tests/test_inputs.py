@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from swp_batch import evaluate_batch
+from swp_engine import SWPInputs, parse_date
+from swp_portfolio import Fund, evaluate_portfolios
+
+from .conftest import make_inputs
+
+
+@pytest.mark.parametrize('changes, message', [
+    ({'frequency': 'Weekly'}, "Unknown SWP frequency: 'Weekly'"),
+    ({'date_convention': 'Whenever'}, "Unknown date convention: 'Whenever'"),
+    ({'withdrawal_policy': 'Everything'}, "Unknown withdrawal policy: 'Everything'"),
+    ({'annual_return': -100.0}, "above -100%"),
+    ({'inflation_rate': -100.0}, "Inflation rate must be above -100%"),
+])
+def test_invalid_inputs(changes, message):
+    with pytest.raises(ValueError, match=message):
+        make_inputs(**changes)
+
+
+@pytest.mark.parametrize('text', ['2025-07-01', '31/02/2025', '', '1/13/2025'])
+def test_invalid_dates(text):
+    with pytest.raises(ValueError):
+        parse_date(text)
+
+
+@pytest.mark.parametrize('changes, message', [
+    ({'frequency': ['Monthly', 'Weekly']}, "Unknown SWP frequency: 'Weekly'$"),
+    ({'date_convention': ['Same Day', 'Whenever']}, "Unknown date convention: 'Whenever'$"),
+    ({'withdrawal_policy': ['Fixed', 'Everything']}, "Unknown withdrawal policy: 'Everything'$"),
+    ({'annual_return': [12.0, -101.0]}, "above -100%"),
+])
+def test_invalid_batch_inputs_name_the_plain_value(base_values, changes, message):
+    with pytest.raises(ValueError, match=message):
+        evaluate_batch(dict(base_values, **changes))
+
+
+def test_missing_batch_inputs(base_values):
+    del base_values['swp_amount']
+    with pytest.raises(ValueError, match="Missing batch inputs: swp_amount"):
+        evaluate_batch(base_values)
+
+
+def test_invalid_funds_and_portfolio_options():
+    with pytest.raises(ValueError):
+        Fund('debt', -10.0, 7.0)
+    with pytest.raises(ValueError, match="Unknown rebalancing frequency: 'Weekly'"):
+        evaluate_portfolios(make_inputs(), [[60, 40]], [[12, 7]], rebalance=np.array(['Weekly']))
+
+
+def test_from_values_parses_typed_fields(base_values):
+    inputs = SWPInputs.from_values(dict(base_values, annual_return='8.5'))
+    assert inputs.annual_return == 8.5
+    assert inputs.swp_start_date.day == 1
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from swp_engine import run_projection
+from swp_portfolio import Fund, run_portfolio
+
+from .conftest import make_inputs
+
+
+@pytest.mark.parametrize('changes', [
+    {},
+    {'tax_rate': 10.0, 'exit_load': 1.0, 'investment_date': '01/01/2025'},
+    # Deep in loss the tax credit makes the charge per rupee paid out negative
+    {'annual_return': -90.0, 'swp_amount': 1000.0, 'tax_rate': 10.0, 'exit_load': 1.0},
+])
+def test_one_fund_portfolio_matches_the_projection_loop(changes):
+    inputs = make_inputs(**changes)
+    fund = Fund('only', 100.0, inputs.annual_return, inputs.expense_ratio, inputs.exit_load)
+    expected = run_projection(inputs)
+    result = run_portfolio(inputs, [fund]).schedule
+    assert result.months_sustainable == expected.months_sustainable
+    assert result.total_withdrawn == pytest.approx(expected.total_withdrawn, rel=1e-12)
+    assert np.allclose(result.closing_balance, expected.closing_balance, rtol=1e-9, atol=1e-6)
@@ -0,0 +1,103 @@
+import asyncio
+import json
+from dataclasses import replace
+
+import pytest
+
+from swp_calendar import calendar_for
+from swp_engine import SWPInputs, run_projection
+from swp_service import ProjectionService, RequestError
+
+
+def call(method, path, body=None, raw=None):
+    """Dispatch one request on a fresh service; the response payload"""
+    async def run():
+        service = ProjectionService(workers=2, batch_delay=0.0)
+        try:
+            data = raw if raw is not None else json.dumps(body).encode() if body is not None else b''
+            return await service.dispatch(method, path, data)
+        finally:
+            service.close()
+    return asyncio.run(run())
+
+
+def status_of(method, path, body=None, raw=None):
+    with pytest.raises(RequestError) as error:
+        call(method, path, body, raw)
+    return error.value.status, str(error.value)
+
+
+def test_projection(base_values):
+    summary = call('POST', '/projection', base_values)
+    assert summary['months_sustainable'] == 120
+    assert summary['total_withdrawn'] == pytest.approx(120 * 75000.0)
+
+
+@pytest.mark.parametrize('changes, message', [
+    ({'frequency': 'Weekly'}, "Unknown SWP frequency"),
+    ({'swp_start_date': '2025-07-01'}, "does not match format"),
+    ({'annual_return': 'twelve'}, "could not convert"),
+    ({'swp_amount': None}, ""),
+    ({'withdrawal_overrides': [[12, 100000]]}, "withdrawal_overrides must be an object"),
+])
+def test_bad_projection_inputs_are_400(base_values, changes, message):
+    status, text = status_of('POST', '/projection', dict(base_values, **changes))
+    assert status == 400 and message in text
+
+
+def test_missing_input_is_400(base_values):
+    del base_values['swp_end_date']
+    assert status_of('POST', '/projection', base_values) == (400, "Missing input: swp_end_date")
+
+
+def test_bad_bodies_are_400():
+    assert status_of('POST', '/projection', raw=b'{not json')[0] == 400
+    assert status_of('POST', '/projection', body=[1, 2])[0] == 400
+    assert status_of('POST', '/batch', body={'plans': 'all'})[0] == 400
+
+
+def test_unknown_routes_and_methods():
+    assert status_of('GET', '/nowhere')[0] == 404
+    assert status_of('GET', '/projection')[0] == 405
+    assert status_of('POST', '/health')[0] == 405
+
+
+def test_solve_returns_a_sustainable_amount(base_values):
+    response = call('POST', '/solve', dict(base_values, solve_for='swp_amount', target_balance=1000000))
+    inputs = replace(SWPInputs.from_values(base_values), swp_amount=response['value'])
+    result = run_projection(inputs)
+    assert result.months_sustainable == len(calendar_for(inputs))
+    assert result.remaining_corpus >= 1000000
+
+
+@pytest.mark.parametrize('changes, message', [
+    ({'solve_for': 'swp_frequency'}, "solve_for must be one of"),
+    ({'solve_for': 'swp_amount', 'target_balance': 'a lot'}, "target_balance must be a number"),
+    ({'solve_for': 'swp_amount', 'target_balance': 1e12}, "not reachable"),
+    ({'solve_for': 'swp_amount', 'withdrawal_policy': 'Percent of Corpus', 'corpus_rate': 4.0},
+     "Percent of Corpus"),
+])
+def test_bad_solves_are_400(base_values, changes, message):
+    status, text = status_of('POST', '/solve', dict(base_values, **changes))
+    assert status == 400 and message in text
+
+
+def test_rejected_solves_are_not_cached(base_values):
+    async def run():
+        service = ProjectionService(workers=2, batch_delay=0.0)
+        try:
+            body = json.dumps(dict(base_values, solve_for='swp_amount', target_balance=1e12)).encode()
+            with pytest.raises(RequestError):
+                await service.dispatch('POST', '/solve', body)
+            return len(service.cache)
+        finally:
+            service.close()
+    assert asyncio.run(run()) == 0
+
+
+def test_batch_reports_bad_plans_per_plan(base_values):
+    plans = [base_values, dict(base_values, frequency='Weekly'), dict(base_values, initial_amount='x')]
+    results = call('POST', '/batch', {'plans': plans})['results']
+    assert results[0]['months_sustainable'] == 120
+    assert results[1] == {'error': "Unknown SWP frequency: 'Weekly'"}
+    assert 'initial_amount' in results[2]['error']
@@ -0,0 +1,108 @@
+from dataclasses import replace
+
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from swp_calendar import calendar_for
+from swp_engine import run_projection
+from swp_solver import (brent, slack, solve_max_withdrawal, solve_min_corpus,
+                        solve_required_return)
+
+from .conftest import make_inputs
+
+# Tax-free plans take the closed forms, taxed ones go through Brent's method
+PLANS = [
+    {},
+    {'frequency': 'Quarterly', 'annual_return': 7.5},
+    {'frequency': 'Yearly', 'swp_end_date': '30/06/2055'},
+    {'exit_load': 1.0, 'investment_date': '15/01/2025', 'swp_start_date': '20/02/2025'},
+    {'annual_return': 0.0, 'expense_ratio': 0.5},
+    {'withdrawal_policy': 'Inflation Indexed', 'inflation_rate': 6.0},
+    {'tax_rate': 10.0, 'exit_load': 1.0},
+    {'withdrawal_policy': 'Guardrails', 'inflation_rate': 6.0},
+]
+
+
+def sustains(inputs, target=0.0):
+    """The projection reaches the SWP end date with at least ``target`` left"""
+    result = run_projection(inputs)
+    return (result.months_sustainable == len(calendar_for(inputs))
+            and result.remaining_corpus >= target and slack(inputs, target) >= 0)
+
+
+@pytest.mark.parametrize('changes', PLANS)
+@pytest.mark.parametrize('target', [0.0, 2500000.0])
+def test_max_withdrawal_lasts_to_the_end_date(changes, target):
+    inputs = make_inputs(**changes)
+    amount = solve_max_withdrawal(inputs, target)
+    assert sustains(replace(inputs, swp_amount=amount), target)
+    # ... and is the largest such amount, to within a few paise
+    assert not sustains(replace(inputs, swp_amount=amount + 0.05), target)
+
+
+@pytest.mark.parametrize('changes', PLANS)
+@pytest.mark.parametrize('target', [0.0, 2500000.0])
+def test_min_corpus_lasts_to_the_end_date(changes, target):
+    inputs = make_inputs(**changes)
+    corpus = solve_min_corpus(inputs, target)
+    assert sustains(replace(inputs, initial_amount=corpus), target)
+    assert not sustains(replace(inputs, initial_amount=corpus - 0.05), target)
+
+
+def test_closed_form_results_are_feasible_for_many_plans():
+    """The closed forms land on the stop rule; the solver must stay on the safe side of it"""
+    base = make_inputs()
+    for months in range(12, 361, 29):
+        for rate in (0.0, 4.0, 9.0, 15.0):
+            inputs = replace(base, annual_return=rate,
+                             swp_end_date=base.swp_start_date + relativedelta(months=months, days=-1))
+            amount = solve_max_withdrawal(inputs)
+            assert slack(replace(inputs, swp_amount=amount)) >= 0
+            corpus = solve_min_corpus(inputs)
+            assert slack(replace(inputs, initial_amount=corpus)) >= 0
+
+
+def test_required_return_lasts_to_the_end_date():
+    inputs = make_inputs(swp_amount=120000.0, tax_rate=10.0)
+    rate = solve_required_return(inputs)
+    assert sustains(replace(inputs, annual_return=rate))
+    assert not sustains(replace(inputs, annual_return=rate - 0.01))
+
+
+def test_unreachable_target_has_no_solution():
+    inputs = make_inputs(annual_return=0.0)
+    with pytest.raises(ValueError, match="not reachable"):
+        solve_max_withdrawal(inputs, target_balance=inputs.initial_amount * 2)
+
+
+def test_percent_of_corpus_has_no_withdrawal_to_solve():
+    with pytest.raises(ValueError, match="Percent of Corpus"):
+        solve_max_withdrawal(make_inputs(withdrawal_policy='Percent of Corpus', corpus_rate=4.0))
+
+
+def test_empty_plans_are_rejected():
+    with pytest.raises(ValueError, match="Initial investment must be positive"):
+        solve_max_withdrawal(make_inputs(initial_amount=0.0))
+    with pytest.raises(ValueError, match="end date is before"):
+        solve_min_corpus(make_inputs(swp_end_date='01/01/2025'))
+
+
+def test_brent_needs_a_bracket():
+    with pytest.raises(ValueError, match="not bracketed"):
+        brent(lambda x: x * x + 1, -1.0, 1.0)
+
+
+def test_brent_returns_the_feasible_end():
+    root = brent(lambda x: 2.0 - x, 0.0, 5.0, xtol=1e-9)
+    assert 2.0 - root >= 0 and root == pytest.approx(2.0, abs=1e-9)
+
+
+def test_override_in_the_last_month_is_held_to_the_stop_rule():
+    """An override outside the SWP schedule still has to leave 10% of an SWP"""
+    inputs = make_inputs(frequency='Yearly', swp_amount=900000.0, swp_end_date='31/05/2035', tax_rate=10.0)
+    last = run_projection(inputs)
+    taken = last.closing_balance[-2] * (1 + inputs.monthly_return) * 0.8
+    inputs = replace(inputs, withdrawal_overrides={len(last): taken})
+    amount = solve_max_withdrawal(inputs)
+    result = run_projection(replace(inputs, swp_amount=amount))
+    assert result.remaining_corpus >= amount * 0.1